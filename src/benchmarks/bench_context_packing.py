@@ -0,0 +1,78 @@
+"""Measure RAG prompt context size before and after packing retrieved chunks.
+
+Chunks the Markdown documents in the data directory with the ingestion splitter settings, uses
+their bold FAQ question lines as queries, retrieves the top-k chunks per query with the BM25
+index and compares the plain "---"-joined chunks with the packed context. Run from the project root:
+    python -m src.benchmarks.bench_context_packing --top-k 3 5 --budget 1500
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.chatbot.modules.memory.long_term.vector_store import Memory
+from src.chatbot.modules.rag.bm25 import BM25Index
+from src.chatbot.modules.rag.context_packer import CONTEXT_SEPARATOR, estimate_tokens, pack_context
+from src.chatbot.settings import settings
+
+DATA_DIR = Path(__file__).parent.parent / "chatbot" / "data"
+QUESTION_PATTERN = re.compile(r"^\*\*(?:\d+\.\s*)?(.+\?)\*\*$", re.MULTILINE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--top-k", type=int, nargs="+", default=[settings.RAG_TOP_K, 5])
+    parser.add_argument("--budget", type=int, default=settings.RAG_CONTEXT_TOKEN_BUDGET)
+    args = parser.parse_args()
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=settings.CHUNK_SIZE, chunk_overlap=settings.CHUNK_OVERLAP, add_start_index=True
+    )
+    chunks, queries = {}, []
+    for path in sorted(args.data_dir.glob("*.md")):
+        text = path.read_text(encoding="utf-8")
+        queries.extend(QUESTION_PATTERN.findall(text))
+        documents = [Document(page_content=text, metadata={"source": str(path)})]
+        for index, chunk in enumerate(splitter.split_documents(documents)):
+            point_id = f"{path.name}:{index}"
+            chunks[point_id] = Memory(
+                text=chunk.page_content,
+                metadata={"id": point_id, "document_name": str(path), "start_index": chunk.metadata["start_index"]},
+            )
+    if not queries:
+        sys.exit(f"No FAQ questions found in {args.data_dir}")
+
+    bm25 = BM25Index(Path(tempfile.mkdtemp(prefix="bench_bm25_")) / "bm25_index.jsonl")
+    bm25.add_many([(point_id, memory.text, memory.metadata) for point_id, memory in chunks.items()])
+    print(f"{len(chunks)} chunks, {len(queries)} queries, budget {args.budget} tokens")
+
+    print(f"{'top-k':>6} {'raw tokens':>11} {'packed tokens':>14} {'saved':>7} {'passages':>9} {'pack ms':>8}")
+    for top_k in args.top_k:
+        raw_tokens, packed_tokens, passages, seconds = [], [], [], 0.0
+        for query in queries:
+            retrieved = [chunks[point_id] for point_id, _ in bm25.search(query, top_k)]
+            raw_tokens.append(estimate_tokens(CONTEXT_SEPARATOR.join(memory.text for memory in retrieved)))
+            start = time.perf_counter()
+            packed = pack_context(retrieved, args.budget)
+            seconds += time.perf_counter() - start
+            packed_tokens.append(estimate_tokens(CONTEXT_SEPARATOR.join(packed)))
+            passages.append(len(packed))
+        raw, packed = statistics.mean(raw_tokens), statistics.mean(packed_tokens)
+        print(
+            f"{top_k:>6} {raw:>11.0f} {packed:>14.0f} {1 - packed / raw:>7.0%} "
+            f"{statistics.mean(passages):>9.1f} {1000 * seconds / len(queries):>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Measure encoding throughput with and without the micro-batching EncodingService.
+
+Each of N concurrent callers (threads, like concurrent websocket sessions) encodes its own
+queries one at a time. Run from the project root:
+    python -m src.benchmarks.bench_encoding_service --callers 1 8 64 --queries 32
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from sentence_transformers import SentenceTransformer
+
+from src.chatbot.modules.memory.long_term.encoding_service import EncodingService
+
+
+def run(callers: int, queries: int, encode) -> float:
+    """Return texts/sec for `callers` threads each encoding `queries` distinct texts."""
+
+    def caller(index: int) -> None:
+        for query in range(queries):
+            encode(f"caller {index} asks question number {query} about invoices and refunds")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as executor:
+        list(executor.map(caller, range(callers)))
+    return callers * queries / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callers", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--queries", type=int, default=32)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    model = SentenceTransformer("all-MiniLM-L6-v2", device="cpu")
+    model.encode("warm up")
+    service = EncodingService(
+        lambda texts: model.encode(texts, batch_size=len(texts)),
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+    )
+
+    print(f"{'callers':>8} {'direct texts/s':>16} {'batched texts/s':>16} {'speedup':>8}")
+    for callers in args.callers:
+        direct = run(callers, args.queries, model.encode)
+        batched = run(callers, args.queries, service.encode)
+        print(f"{callers:>8} {direct:>16.1f} {batched:>16.1f} {batched / direct:>7.2f}x")
+    print(f"service stats: {service.stats()}")
+    service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Compare the start-of-turn critical path with sequential and parallel pre-processing.
+
+Builds the pre-processing part of the workflow graph (memory injection and the RAG routing check,
+joined before routing) with `add_preprocessing_edges`, in both modes, and times turns until the
+router's decision is taken. By default the two nodes sleep for latencies drawn around the given
+medians, which stand in for the memory vector search and the router LLM call; with --live they
+are the real nodes, which needs the vector store and the Google API key of the .env file.
+Run from the project root:
+    python -m src.benchmarks.bench_graph_preprocessing --turns 50 --memory-ms 60 --router-ms 450
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from langchain_core.messages import HumanMessage
+from langgraph.graph import END, StateGraph
+
+from src.chatbot.graph.graph import add_preprocessing_edges
+from src.chatbot.graph.nodes import initial_check_node, memory_injection_node, preprocessing_join_node
+from src.chatbot.graph.state import AICompanionState
+from src.chatbot.graph.utils.timing import get_node_timings, timed
+
+QUESTIONS = [
+    "What is the refund policy for annual plans?",
+    "I prefer short answers, by the way.",
+    "How do I reset my password?",
+    "Tell me a joke about databases.",
+]
+
+
+def simulated(median_ms: float):
+    async def node(state: AICompanionState):
+        await asyncio.sleep(random.lognormvariate(0, 0.25) * median_ms / 1000)
+        return {}
+
+    return node
+
+
+async def finish(state: AICompanionState):
+    return {}
+
+
+def build(parallel: bool, nodes: dict):
+    graph_builder = StateGraph(AICompanionState)
+    for name, node in nodes.items():
+        graph_builder.add_node(name, timed(name, node))
+    for name in ("rag_node", "conversation_node"):
+        graph_builder.add_node(name, finish)
+        graph_builder.add_edge(name, END)
+    add_preprocessing_edges(graph_builder, parallel)
+    return graph_builder.compile()
+
+
+async def run(args):
+    if args.live:
+        nodes = {"memory_injection_node": memory_injection_node, "initial_check_node": initial_check_node}
+    else:
+        nodes = {
+            "memory_injection_node": simulated(args.memory_ms),
+            "initial_check_node": simulated(args.router_ms),
+        }
+    nodes["preprocessing_join_node"] = preprocessing_join_node
+
+    print(f"{'mode':>10} {'p50 ms':>8} {'p95 ms':>8} {'memory p50':>11} {'router p50':>11}")
+    for parallel in (False, True):
+        random.seed(0)
+        get_node_timings.cache_clear()
+        graph = build(parallel, nodes)
+        latencies = []
+        for turn in range(args.turns):
+            question = QUESTIONS[turn % len(QUESTIONS)]
+            start = time.time()
+            await graph.ainvoke({"messages": [HumanMessage(content=question)], "turn_started_at": start})
+            latencies.append(1000 * (time.time() - start))
+        stats = get_node_timings().stats()
+        latencies.sort()
+        print(
+            f"{'parallel' if parallel else 'sequential':>10} {statistics.median(latencies):8.1f} "
+            f"{latencies[int(0.95 * (len(latencies) - 1))]:8.1f} "
+            f"{stats['memory_injection_node']['p50_ms']:11.1f} {stats['initial_check_node']['p50_ms']:11.1f}"
+        )
+        print(f"{'':>10} preprocessing as seen by the join node: p50 {stats['preprocessing']['p50_ms']:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--memory-ms", type=float, default=60.0, help="Median simulated memory search latency.")
+    parser.add_argument("--router-ms", type=float, default=450.0, help="Median simulated router LLM latency.")
+    parser.add_argument("--live", action="store_true", help="Time the real nodes instead of simulated ones.")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
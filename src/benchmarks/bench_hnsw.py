@@ -0,0 +1,70 @@
+"""Recall and latency of the local HNSW index against exact search.
+
+By default the vectors are the project's own embeddings, read from the persistent embedding cache
+filled by `ingest_documents.py` (settings.EMBEDDING_CACHE_PATH). Some of them are held out as
+queries. Pass --synthetic N to use N clustered random vectors instead. Run from the project root:
+    python -m src.benchmarks.bench_hnsw --ef 16 32 64 128 256
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import numpy as np
+
+from src.benchmarks.embedding_data import load_embeddings
+from src.chatbot.modules.memory.long_term.backends.hnsw import HNSWIndex
+from src.chatbot.settings import settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cache-path", default=settings.EMBEDDING_CACHE_PATH)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic 384-dim vectors")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--m", type=int, default=settings.HNSW_M)
+    parser.add_argument("--ef-construction", type=int, default=settings.HNSW_EF_CONSTRUCTION)
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    args = parser.parse_args()
+
+    vectors, queries = load_embeddings(args.cache_path, args.model, args.synthetic, args.queries)
+    print(f"{len(vectors)} vectors of dim {vectors.shape[1]}, {len(queries)} held-out queries, k={args.k}")
+
+    index = HNSWIndex(m=args.m, ef_construction=args.ef_construction)
+    start = time.perf_counter()
+    for row in range(len(vectors)):
+        index.add(row, vectors)
+    build = time.perf_counter() - start
+    print(f"HNSW build (M={args.m}, ef_construction={args.ef_construction}): {build:.1f}s, {len(vectors) / build:.0f} vectors/s")
+
+    truth, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        scores = vectors @ query
+        top = np.argpartition(-scores, args.k - 1)[: args.k]
+        latencies.append((time.perf_counter() - start) * 1000)
+        truth.append(set(top.tolist()))
+    print(f"\n{'search':>10} {'recall@k':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    print(f"{'exact':>10} {1.0:>9.3f} {statistics.median(latencies):>8.2f} {sorted(latencies)[int(len(latencies) * 0.95) - 1]:>8.2f}")
+
+    for ef in args.ef:
+        recalls, latencies = [], []
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            rows, _ = index.search(query, args.k, vectors, ef=ef)
+            latencies.append((time.perf_counter() - start) * 1000)
+            recalls.append(len(expected & set(rows.tolist())) / args.k)
+        latencies.sort()
+        print(
+            f"{'ef=' + str(ef):>10} {statistics.mean(recalls):>9.3f} {statistics.median(latencies):>8.2f}"
+            f" {latencies[int(len(latencies) * 0.95) - 1]:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Count RAG rewrite loops with dense-only and hybrid (dense + BM25, rank-fused) retrieval.
+
+Uses the fixture corpus in fixtures/rag_corpus.json: each query lists the chunk that answers it
+and the successive rewrites the answer evaluator would produce. A turn's loop count is the number
+of rewrites needed before the answering chunk is among the top-k retrieved (capped at the number
+of variants); every attempt costs a candidate-answer and an evaluation LLM call. Embeddings come
+from the project's SentenceTransformer model. Run from the project root:
+    python -m src.benchmarks.bench_hybrid_retrieval --top-k 3
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from src.chatbot.modules.rag.bm25 import BM25Index
+from src.chatbot.modules.rag.fusion import reciprocal_rank_fusion
+
+FIXTURE = Path(__file__).parent / "fixtures" / "rag_corpus.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--rrf-k", type=int, default=60)
+    args = parser.parse_args()
+
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        fixture = json.load(f)
+    ids = [chunk["id"] for chunk in fixture["chunks"]]
+
+    model = SentenceTransformer("all-MiniLM-L6-v2", device="cpu")
+    vectors = model.encode([chunk["text"] for chunk in fixture["chunks"]], normalize_embeddings=True)
+    bm25 = BM25Index(Path(tempfile.mkdtemp(prefix="bench_bm25_")) / "bm25_index.jsonl")
+    bm25.add_many([(chunk["id"], chunk["text"], {}) for chunk in fixture["chunks"]])
+
+    def dense(query: str, k: int):
+        scores = vectors @ model.encode(query, normalize_embeddings=True)
+        return [ids[i] for i in np.argsort(-scores)[:k]]
+
+    def hybrid(query: str, k: int):
+        keyword = [point_id for point_id, _ in bm25.search(query, args.candidates)]
+        fused = reciprocal_rank_fusion([dense(query, args.candidates), keyword], k=args.rrf_k)
+        return [point_id for point_id, _ in fused[:k]]
+
+    print(f"{'retrieval':>10} {'hit@1st':>8} {'avg loops':>10} {'max loops':>10} {'LLM calls/turn':>15}")
+    for name, retrieve in (("dense", dense), ("hybrid", hybrid)):
+        loops = []
+        for query in fixture["queries"]:
+            for attempt, variant in enumerate(query["variants"]):
+                if query["gold"] in retrieve(variant, args.top_k):
+                    break
+            else:
+                attempt = len(query["variants"])
+            loops.append(attempt)
+        first_hits = sum(loop == 0 for loop in loops) / len(loops)
+        calls = statistics.mean(2 * (loop + 1) for loop in loops)
+        print(f"{name:>10} {first_hits:>8.0%} {statistics.mean(loops):>10.2f} {max(loops):>10} {calls:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Memory footprint and recall@k of quantized local collections with full-precision rescoring.
+
+Vectors are the project's embeddings from the persistent embedding cache (or --synthetic N random
+clustered ones); held-out vectors serve as queries and exact float32 search is the reference.
+Run from the project root:
+    python -m src.benchmarks.bench_quantization --oversampling 1 2 4 8
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import numpy as np
+
+from src.benchmarks.embedding_data import load_embeddings
+from src.chatbot.modules.memory.long_term.backends.base import VectorRecord
+from src.chatbot.modules.memory.long_term.backends.local import LocalBackend
+from src.chatbot.modules.memory.long_term.backends.quantization import bytes_per_vector
+from src.chatbot.settings import settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cache-path", default=settings.EMBEDDING_CACHE_PATH)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic 384-dim vectors")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--oversampling", type=float, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    vectors, queries = load_embeddings(args.cache_path, args.model, args.synthetic, args.queries)
+    dim = vectors.shape[1]
+    truth = [set(np.argsort(-(vectors @ query))[: args.k].tolist()) for query in queries]
+    print(f"{len(vectors)} vectors of dim {dim}, {len(queries)} held-out queries, k={args.k}\n")
+
+    backend = LocalBackend(Path(tempfile.mkdtemp(prefix="bench_quantization_")))
+    records = [VectorRecord(id=row, vector=vector, payload={}) for row, vector in enumerate(vectors)]
+    float_mb = len(vectors) * bytes_per_vector("none", dim) / 2**20
+
+    print(f"{'mode':>7} {'oversampling':>12} {'search MB':>10} {'saved':>7} {'recall@k':>9} {'p50 ms':>8}")
+    for quantization in ("none", "int8", "binary"):
+        backend.create_collection(quantization, dim, quantization=quantization)
+        for offset in range(0, len(records), 1024):
+            backend.upsert(quantization, records[offset : offset + 1024])
+        collection = backend._collection(quantization)
+        index_mb = len(vectors) * bytes_per_vector(quantization, dim) / 2**20
+
+        for oversampling in args.oversampling if quantization != "none" else [1]:
+            collection.oversampling = oversampling
+            recalls, latencies = [], []
+            for query, expected in zip(queries, truth):
+                start = time.perf_counter()
+                hits = backend.search(quantization, query, args.k)
+                latencies.append((time.perf_counter() - start) * 1000)
+                recalls.append(len(expected & {hit.id for hit in hits}) / args.k)
+            print(
+                f"{quantization:>7} {oversampling:>12g} {index_mb:>10.1f} {1 - index_mb / float_mb:>7.0%}"
+                f" {statistics.mean(recalls):>9.3f} {statistics.median(latencies):>8.2f}"
+            )
+    backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Compare search latency of the local (in-process) vector backend with Qdrant.
+
+Random 384-dimensional vectors (the size of all-MiniLM-L6-v2 embeddings) are written to a fresh
+collection in each backend, half tagged as documents and half as conversation memories; queries
+are timed unfiltered and with the `source` filter used by RAG. Qdrant is skipped if unreachable.
+Run from the project root:
+    python -m src.benchmarks.bench_vector_backends --sizes 1000 10000 50000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import numpy as np
+
+from src.chatbot.modules.memory.long_term.backends.base import VectorRecord
+from src.chatbot.modules.memory.long_term.backends.local import LocalBackend
+
+DIM = 384
+DOCUMENT_FILTER = {"must": [{"key": "source", "match": {"value": "document"}}]}
+
+
+def make_records(size: int, rng: np.random.Generator):
+    vectors = rng.standard_normal((size, DIM), dtype=np.float32)
+    return [
+        VectorRecord(
+            id=str(uuid.uuid4()),
+            vector=vector,
+            payload={"text": f"chunk {i}", "source": "document" if i % 2 else "conversation"},
+        )
+        for i, vector in enumerate(vectors)
+    ]
+
+
+def time_searches(backend, collection: str, queries, k: int, filter=None) -> dict:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        backend.search(collection, query, k, filter)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+def qdrant_backend(url: str, port: int):
+    try:
+        from src.chatbot.modules.memory.long_term.backends.qdrant import QdrantBackend
+
+        backend = QdrantBackend(url=url, port=port)
+        backend.client.get_collections()
+        return backend
+    except Exception as e:
+        print(f"Skipping Qdrant ({url}:{port}): {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--qdrant-url", default="localhost")
+    parser.add_argument("--qdrant-port", type=int, default=6333)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    backends = {"local": LocalBackend(Path(tempfile.mkdtemp(prefix="bench_local_index_")))}
+    qdrant = qdrant_backend(args.qdrant_url, args.qdrant_port)
+    if qdrant is not None:
+        backends["qdrant"] = qdrant
+
+    print(f"{'backend':>8} {'vectors':>8} {'p50 ms':>8} {'p95 ms':>8} {'filtered p50':>13} {'filtered p95':>13}")
+    for size in args.sizes:
+        records = make_records(size, rng)
+        queries = rng.standard_normal((args.queries, DIM), dtype=np.float32)
+        for name, backend in backends.items():
+            collection = f"bench_{size}_{uuid.uuid4().hex[:8]}"
+            backend.create_collection(collection, DIM)
+            for offset in range(0, size, 256):
+                backend.upsert(collection, records[offset : offset + 256])
+
+            plain = time_searches(backend, collection, queries, args.k)
+            filtered = time_searches(backend, collection, queries, args.k, DOCUMENT_FILTER)
+            print(
+                f"{name:>8} {size:>8} {plain['p50']:>8.2f} {plain['p95']:>8.2f}"
+                f" {filtered['p50']:>13.2f} {filtered['p95']:>13.2f}"
+            )
+            if name == "qdrant":
+                backend.client.delete_collection(collection)
+
+    backends["local"].close()
+
+
+if __name__ == "__main__":
+    main()
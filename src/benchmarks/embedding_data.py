@@ -0,0 +1,37 @@
+"""Embedding datasets for the vector index benchmarks."""
+import sqlite3
+from typing import Tuple
+
+import numpy as np
+
+
+def cached_embeddings(path: str, model: str) -> np.ndarray:
+    """The project's own embeddings, as stored in the persistent embedding cache."""
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute("SELECT vector FROM embeddings WHERE model = ?", (model,)).fetchall()
+    return np.array([np.frombuffer(vector, dtype=np.float32) for (vector,) in rows])
+
+
+def synthetic_embeddings(size: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    """Clustered random vectors, roughly shaped like sentence embeddings of a document corpus."""
+    centers = rng.standard_normal((max(size // 50, 1), dim))
+    return (centers[rng.integers(0, len(centers), size)] + 0.35 * rng.standard_normal((size, dim))).astype(np.float32)
+
+
+def load_embeddings(
+    cache_path: str, model: str, synthetic: int, queries: int, seed: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (vectors, held-out queries), L2-normalized.
+
+    Uses `synthetic` generated 384-dim vectors when it is non-zero, the embedding cache otherwise.
+    """
+    rng = np.random.default_rng(seed)
+    if synthetic:
+        vectors = synthetic_embeddings(synthetic + queries, 384, rng)
+    else:
+        vectors = cached_embeddings(cache_path, model)
+        if len(vectors) <= queries:
+            raise SystemExit(f"Only {len(vectors)} embeddings in '{cache_path}'; ingest documents or use --synthetic")
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    rng.shuffle(vectors)
+    return np.ascontiguousarray(vectors[queries:]), vectors[:queries]
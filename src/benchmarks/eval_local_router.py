@@ -0,0 +1,83 @@
+"""Evaluate the local embedding RAG router against the LLM router's decisions.
+
+Reads logged LLM router decisions (JSONL lines of {"query", "requires_rag"}; by default the
+server's ROUTER_LOG_PATH if it exists, else fixtures/router_decisions.jsonl) and cross-validates the
+nearest-centroid router on them: for every margin it reports the share of queries decided
+locally, the agreement of those decisions with the LLM router, the end-to-end agreement when the
+undecided queries go to the LLM router, and the local decision time. Embeddings come from the
+project's SentenceTransformer model. Run from the project root:
+    python -m src.benchmarks.eval_local_router --margins 0 0.02 0.05 0.1 --folds 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from src.chatbot.modules.rag.local_router import CentroidRouter
+from src.chatbot.settings import settings
+
+FIXTURE = Path(__file__).parent / "fixtures" / "router_decisions.jsonl"
+
+
+def load_decisions(path: Path):
+    queries, labels = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                queries.append(entry["query"])
+                labels.append(bool(entry["requires_rag"]))
+    return queries, np.array(labels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", type=Path, default=None, help="Logged decisions (JSONL).")
+    parser.add_argument("--margins", type=float, nargs="+", default=[0.0, 0.02, 0.05, 0.1])
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    path = args.log or (Path(settings.ROUTER_LOG_PATH) if Path(settings.ROUTER_LOG_PATH).exists() else FIXTURE)
+    queries, labels = load_decisions(path)
+    print(f"{len(queries)} decisions from {path} ({labels.sum()} RAG, {(~labels).sum()} conversational)")
+
+    model = SentenceTransformer("all-MiniLM-L6-v2", device="cpu")
+    embeddings = model.encode(queries, normalize_embeddings=True)
+    folds = np.array_split(np.random.default_rng(args.seed).permutation(len(queries)), args.folds)
+
+    print(f"{'margin':>7} {'local':>7} {'local acc':>10} {'end-to-end':>11} {'false skip':>11} {'decide us':>10}")
+    for margin in args.margins:
+        decided = correct = false_skips = 0
+        elapsed = 0.0
+        for fold in folds:
+            train = np.setdiff1d(np.arange(len(queries)), fold)
+            # min_examples=1: the folds are small, and the threshold only delays routing in production
+            router = CentroidRouter(margin, min_examples=1)
+            router.add(embeddings[train], labels[train])
+            for i in fold:
+                start = time.perf_counter()
+                decision = router.decide(embeddings[i])
+                elapsed += time.perf_counter() - start
+                if decision is None:
+                    continue
+                decided += 1
+                correct += decision == labels[i]
+                # RAG needed but skipped: the costly mistake, the answer misses the documents
+                false_skips += labels[i] and not decision
+        total = len(queries)
+        print(
+            f"{margin:7.2f} {decided / total:7.1%} {correct / decided if decided else 0:10.1%} "
+            f"{(correct + total - decided) / total:11.1%} {false_skips:11d} {1e6 * elapsed / total:10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
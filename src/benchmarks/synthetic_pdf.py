@@ -0,0 +1,60 @@
+import random
+from pathlib import Path
+from typing import List
+
+WORDS = (
+    "brahmware invoice service project cloud support contract payment schedule refund consulting "
+    "deployment migration security license renewal account manager onboarding training ticket"
+).split()
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: Path, pages: List[List[str]]) -> None:
+    """Write a minimal, valid PDF with one text line per entry of each page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for lines in pages:
+        stream = "BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(f"({_escape(line)}) '" for line in lines) + " ET"
+        stream_bytes = stream.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream_bytes) + stream_bytes + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    path.write_bytes(bytes(out))
+
+
+def make_corpus(directory: Path, files: int, pages: int, lines_per_page: int = 50, seed: int = 0) -> List[Path]:
+    """Generate a synthetic corpus of text PDFs."""
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index in range(files):
+        path = directory / f"synthetic_{index:03d}.pdf"
+        write_pdf(
+            path,
+            [
+                [" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(lines_per_page)]
+                for _ in range(pages)
+            ],
+        )
+        paths.append(path)
+    return paths
@@ -20,3 +20,9 @@ class ImageToTextError(Exception):
     """Custom exception for Image-to-text conversion errors."""
 
     pass
+
+
+class IngestionCancelledError(Exception):
+    """Custom exception raised when a running document ingestion job is cancelled."""
+
+    pass
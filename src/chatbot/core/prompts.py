@@ -17,8 +17,24 @@ You need to determine if the candidate answer is sufficient to answer the user's
 
 - If the candidate answer is sufficient, you should set "is_sufficient" to True.
 - If the candidate answer is not sufficient, you should set "is_sufficient" to False and provide a corrected query to improve the retrieval results.
+- Set "confidence" to a number between 0 and 1 expressing how well the candidate answer answers the query.
 
-Respond with a JSON object with two keys: "is_sufficient" and "corrected_query".
+Respond with a JSON object with three keys: "is_sufficient", "corrected_query" and "confidence".
+"""
+
+STYLE_ANSWER_PROMPT = """
+You are Raj, a Customer Support Specialist at Brahmware, replying to a customer on WhatsApp.
+
+Rewrite the answer below as your reply to the customer's question: polite, warm and professional,
+clear and under 100 words. Keep every fact, number, name and step of the answer exactly as it is;
+do not add information, do not mention documents or sources, and never say you are a bot.
+
+What you know about the customer:
+{memory_context}
+
+Customer's question: {question}
+
+Answer: {answer}
 """
 
 IMAGE_SCENARIO_PROMPT = """
@@ -30,12 +30,17 @@ def route_to_rag(
 
 def evaluate_answer(
     state: AICompanionState,
-) -> Literal["rewrite_query_node", "conversation_node"]:
+) -> Literal["rewrite_query_node", "rag_answer_node", "conversation_node"]:
     """
-    Evaluates the candidate answer and routes to the rewrite_query_node if the answer needs refinement,
-    otherwise to the conversation_node.
+    Evaluates the candidate answer and routes to the rewrite_query_node if the answer needs refinement
+    and the loop has not hit its limits. Once the loop is done, the turn's best candidate is the
+    basis of the reply: the conversation_node regenerates the reply from it when RAG_ANSWER_MODE is
+    "regenerate" or when a limit was hit before a sufficient answer (an insufficient candidate is
+    never sent as is), otherwise the rag_answer_node sends it.
     """
     print("---EVALUATING ANSWER---")
-    if state.get("is_sufficient"):
+    if not (state.get("rag_done") or state.get("is_sufficient")):
+        return "rewrite_query_node"
+    if settings.RAG_ANSWER_MODE == "regenerate" or not state.get("is_sufficient"):
         return "conversation_node"
-    return "rewrite_query_node"
+    return "rag_answer_node"
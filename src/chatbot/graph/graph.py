@@ -9,40 +9,69 @@ from src.chatbot.graph.edges import (
 )
 from src.chatbot.graph.nodes import (
     conversation_node,
+    rag_answer_node,
     memory_extraction_node,
     memory_injection_node,
     summarize_conversation_node,
     initial_check_node,
+    preprocessing_join_node,
     rag_node,
     generate_candidate_answer_node,
     evaluate_answer_node,
     rewrite_query_node,
 )
 from src.chatbot.graph.state import AICompanionState
+from src.chatbot.graph.utils.timing import timed
+from src.chatbot.settings import settings
+
+PREPROCESSING_NODES = ["memory_injection_node", "initial_check_node"]
+
+
+def add_preprocessing_edges(graph_builder: StateGraph, parallel: bool) -> None:
+    """Wire the start of a turn: memory injection and the RAG routing check, joined before `route_to_rag`.
+
+    Neither node reads what the other writes, so in parallel mode both start from START in the
+    same superstep and `preprocessing_join_node` waits for the two of them. A turn then pays the
+    slower of the vector search and the router LLM call instead of their sum. In sequential mode
+    they run one after the other; the join node is kept so both modes report the same timing.
+    """
+    if parallel:
+        for node in PREPROCESSING_NODES:
+            graph_builder.add_edge(START, node)
+        graph_builder.add_edge(PREPROCESSING_NODES, "preprocessing_join_node")
+    else:
+        graph_builder.add_edge(START, PREPROCESSING_NODES[0])
+        for previous, node in zip(PREPROCESSING_NODES, PREPROCESSING_NODES[1:]):
+            graph_builder.add_edge(previous, node)
+        graph_builder.add_edge(PREPROCESSING_NODES[-1], "preprocessing_join_node")
+    graph_builder.add_conditional_edges("preprocessing_join_node", route_to_rag)
 
 
 @lru_cache(maxsize=1)
 def create_workflow_graph():
     graph_builder = StateGraph(AICompanionState)
 
-    # Add all nodes
-    graph_builder.add_node("memory_extraction_node", memory_extraction_node)
-    graph_builder.add_node("memory_injection_node", memory_injection_node)
-    graph_builder.add_node("summarize_conversation_node", summarize_conversation_node)
-    graph_builder.add_node("initial_check_node", initial_check_node)
-    graph_builder.add_node("rag_node", rag_node)
-    graph_builder.add_node("generate_candidate_answer_node", generate_candidate_answer_node)
-    graph_builder.add_node("evaluate_answer_node", evaluate_answer_node)
-    graph_builder.add_node("rewrite_query_node", rewrite_query_node)
-    graph_builder.add_node("conversation_node", conversation_node)
-
+    # Add all nodes, timed for /api/metrics
+    nodes = {
+        "memory_extraction_node": memory_extraction_node,
+        "memory_injection_node": memory_injection_node,
+        "summarize_conversation_node": summarize_conversation_node,
+        "initial_check_node": initial_check_node,
+        "preprocessing_join_node": preprocessing_join_node,
+        "rag_node": rag_node,
+        "generate_candidate_answer_node": generate_candidate_answer_node,
+        "evaluate_answer_node": evaluate_answer_node,
+        "rewrite_query_node": rewrite_query_node,
+        "conversation_node": conversation_node,
+        "rag_answer_node": rag_answer_node,
+    }
+    for name, node in nodes.items():
+        graph_builder.add_node(name, timed(name, node))
 
     # Define the flow
-    graph_builder.add_edge(START, "memory_injection_node")
-    graph_builder.add_edge("memory_injection_node", "initial_check_node")
+    add_preprocessing_edges(graph_builder, settings.PARALLEL_PREPROCESSING)
 
     # RAG loop
-    graph_builder.add_conditional_edges("initial_check_node", route_to_rag)
     graph_builder.add_edge("rag_node", "generate_candidate_answer_node")
     graph_builder.add_edge("generate_candidate_answer_node", "evaluate_answer_node")
     graph_builder.add_conditional_edges("evaluate_answer_node", evaluate_answer)
@@ -50,6 +79,7 @@ def create_workflow_graph():
 
     # Final response
     graph_builder.add_edge("conversation_node", "memory_extraction_node")
+    graph_builder.add_edge("rag_answer_node", "memory_extraction_node")
     graph_builder.add_conditional_edges(
         "memory_extraction_node", should_summarize_conversation
     )
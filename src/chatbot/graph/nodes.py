@@ -1,5 +1,12 @@
+import asyncio
+import logging
+import re
+import time
+from pathlib import Path
+
 from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage
 from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
 
 from src.chatbot.graph.state import AICompanionState
 from src.chatbot.graph.utils.chains import (
@@ -7,30 +14,81 @@ from src.chatbot.graph.utils.chains import (
     get_rag_router_chain,
     get_rag_chain,
     get_answer_evaluator_chain,
+    get_answer_styling_chain,
 )
 from src.chatbot.graph.utils.helpers import (
+    AsteriskStreamFilter,
     get_chat_model,
 )
+from src.chatbot.graph.utils.speculation import get_speculation_stats
+from src.chatbot.graph.utils.streaming import ANSWER_TOKEN
+from src.chatbot.graph.utils.timing import get_node_timings
+from src.chatbot.modules.memory.long_term.embedding_cache import normalize_text
 from src.chatbot.modules.memory.long_term.memory_manager import get_memory_manager
+from src.chatbot.modules.rag.local_router import append_router_decision, get_local_router
 from src.chatbot.modules.rag.rag_manager import get_rag_manager
 from src.chatbot.settings import settings
 
+logger = logging.getLogger(__name__)
+
 
 async def conversation_node(state: AICompanionState, config: RunnableConfig):
     memory_context = state.get("memory_context", "")
+    # On RAG turns the reply is based on the loop's best candidate answer
+    rag_answer = state.get("candidate_answer", "") if state.get("requires_rag") else ""
 
-    chain = get_character_response_chain(state.get("summary", ""))
+    chain = get_character_response_chain(
+        state.get("summary", ""),
+        with_rag_answer=bool(rag_answer),
+        rag_answer_sufficient=state.get("is_sufficient", True),
+    )
 
     response = await chain.ainvoke(
         {
             "messages": state["messages"],
             "memory_context": memory_context,
+            "rag_answer": rag_answer,
         },
         config,
     )
     return {"messages": AIMessage(content=response)}
 
 
+async def rag_answer_node(state: AICompanionState, config: RunnableConfig):
+    """Reply with the turn's best RAG candidate answer instead of generating a new reply.
+
+    In "reuse" mode the candidate is sent as is; in "stylize" mode a short LLM pass rewrites it in
+    the character's voice. Either way the reply tokens are written to the custom stream.
+    """
+    print("---RAG ANSWER---")
+    writer = get_stream_writer()
+    if settings.RAG_ANSWER_MODE != "stylize":
+        answer = state["candidate_answer"]
+        for token in re.findall(r"\S+\s*|\s+", answer):
+            writer({ANSWER_TOKEN: token})
+        return {"messages": AIMessage(content=answer)}
+
+    chain = get_answer_styling_chain()
+    # Filter the stream itself, so the streamed reply matches the stored message
+    asterisks = AsteriskStreamFilter()
+    tokens = []
+    async for chunk in chain.astream(
+        {
+            "answer": state["candidate_answer"],
+            "question": state["messages"][-1].content,
+            "memory_context": state.get("memory_context", ""),
+        },
+        config,
+    ):
+        tokens.append(asterisks.feed(chunk.content))
+        if tokens[-1]:
+            writer({ANSWER_TOKEN: tokens[-1]})
+    tokens.append(asterisks.flush())
+    if tokens[-1]:
+        writer({ANSWER_TOKEN: tokens[-1]})
+    return {"messages": AIMessage(content="".join(tokens))}
+
+
 async def summarize_conversation_node(state: AICompanionState):
     model = get_chat_model()
     summary = state.get("summary", "")
@@ -71,13 +129,13 @@ async def memory_extraction_node(state: AICompanionState):
     return {}
 
 
-def memory_injection_node(state: AICompanionState):
+async def memory_injection_node(state: AICompanionState):
     """Retrieve and inject relevant memories into the character card."""
     memory_manager = get_memory_manager()
 
     # Get relevant memories based on recent conversation
     recent_context = " ".join([m.content for m in state["messages"][-3:]])
-    memories = memory_manager.get_relevant_memories(recent_context)
+    memories = await memory_manager.aget_relevant_memories(recent_context)
 
     # Format memories for the character card
     memory_context = memory_manager.format_memories_for_prompt(memories)
@@ -85,26 +143,116 @@ def memory_injection_node(state: AICompanionState):
     return {"memory_context": memory_context}
 
 
+async def preprocessing_join_node(state: AICompanionState):
+    """Wait for the pre-processing nodes before routing the turn, and reset the RAG loop state.
+
+    Records the time from the start of the turn to here as the "preprocessing" latency, when the
+    caller passed `turn_started_at`. The timestamp is cleared so it does not leak into later turns.
+    """
+    turn_started_at = state.get("turn_started_at")
+    if turn_started_at:
+        get_node_timings().record("preprocessing", time.time() - turn_started_at)
+    return {
+        "turn_started_at": None,
+        "rag_query": None,
+        "query_history": [],
+        "rag_attempts": 0,
+        "rag_started_at": None,
+        "rag_done": False,
+        "best_candidate": None,
+        "best_rag_context": None,
+        "best_score": None,
+    }
+
+
 # RAG-related nodes
+async def _timed_retrieval(query: str):
+    start = time.perf_counter()
+    documents = await get_rag_manager().aget_relevant_documents(query)
+    return documents, time.perf_counter() - start
+
+
+async def _llm_route(state: AICompanionState) -> bool:
+    """Ask the LLM router whether the latest message needs RAG; the local router learns from it."""
+    rag_router_chain = get_rag_router_chain()
+    response = await rag_router_chain.ainvoke({"messages": state["messages"][-1:]})
+    query = state["messages"][-1].content
+    local_router = get_local_router()
+    if local_router is not None:
+        await local_router.arecord(query, response.requires_rag)
+    elif settings.ROUTER_LOG_ENABLED:
+        # Collect the decisions the local router is calibrated on before it is enabled
+        await asyncio.to_thread(append_router_decision, Path(settings.ROUTER_LOG_PATH), query, response.requires_rag)
+    return response.requires_rag
+
+
 async def initial_check_node(state: AICompanionState):
     """
     Determines if RAG is needed to answer the user's query.
+
+    The local embedding router decides first; the LLM router is only called when it is unsure.
+    With SPECULATIVE_RETRIEVAL, the documents for the latest message are retrieved while the
+    LLM router decides and handed to rag_node, or discarded if RAG is not needed.
     """
     print("---INITIAL CHECK---")
-    rag_router_chain = get_rag_router_chain()
-    response = await rag_router_chain.ainvoke({"messages": state["messages"][-1:]})
-    return {"requires_rag": response.requires_rag}
+    query = state["messages"][-1].content
+    local_router = get_local_router()
+    if local_router is not None:
+        requires_rag = await local_router.adecide(query)
+        if requires_rag is not None:
+            return {"requires_rag": requires_rag, "prefetched_query": None}
+
+    if not settings.SPECULATIVE_RETRIEVAL:
+        return {"requires_rag": await _llm_route(state)}
+
+    # Retrieve for the latest message while the router decides; rag_node reuses the result
+    started_at = time.perf_counter()
+    speculation = asyncio.create_task(_timed_retrieval(query))
+    try:
+        requires_rag = await _llm_route(state)
+    except BaseException:
+        speculation.cancel()
+        raise
+
+    stats = get_speculation_stats()
+    if not requires_rag:
+        if speculation.done() and not speculation.exception():
+            stats.record_wasted(speculation.result()[1])
+        else:
+            speculation.cancel()
+            stats.record_wasted(time.perf_counter() - started_at)
+        return {"requires_rag": False, "prefetched_query": None}
+
+    router_done_at = time.perf_counter()
+    try:
+        documents, elapsed = await speculation
+    except Exception as e:
+        logger.warning(f"Speculative retrieval failed, rag_node will retrieve again: {e}")
+        stats.record_failed()
+        return {"requires_rag": True, "prefetched_query": None}
+    stats.record_used(elapsed, time.perf_counter() - router_done_at)
+    return {"requires_rag": True, "rag_context": documents, "prefetched_query": query}
 
 
 async def rag_node(state: AICompanionState):
     """
     Retrieves relevant documents from the vector store.
+
+    Uses the documents prefetched by `initial_check_node` if they were retrieved for this query.
     """
     print("---RAG NODE---")
+    query = state.get("rag_query") or state["messages"][-1].content
+    attempt = {
+        "rag_attempts": state.get("rag_attempts", 0) + 1,
+        "query_history": state.get("query_history", []) + [query],
+        "rag_started_at": state.get("rag_started_at") or time.time(),
+        "prefetched_query": None,
+    }
+    if state.get("prefetched_query") == query:
+        return attempt
     rag_manager = get_rag_manager()
-    query = state["messages"][-1].content
-    documents = rag_manager.get_relevant_documents(query)
-    return {"rag_context": documents}
+    documents = await rag_manager.aget_relevant_documents(query)
+    return {"rag_context": documents, **attempt}
 
 
 async def generate_candidate_answer_node(state: AICompanionState):
@@ -113,20 +261,42 @@ async def generate_candidate_answer_node(state: AICompanionState):
     """
     print("---GENERATE CANDIDATE ANSWER---")
     rag_chain = get_rag_chain()
-    rag_context = "\n\n---\n\n".join(state["rag_context"])
+    rag_context = get_rag_manager().format_context(state["rag_context"])
     response = await rag_chain.ainvoke(
         {"context": rag_context, "question": state["messages"][-1].content}
     )
     return {"candidate_answer": response}
 
 
+def _rag_stop_reason(state: AICompanionState, is_sufficient: bool, corrected_query: str):
+    """Why the RAG loop ends after this attempt, or None to rewrite the query and retry."""
+    if is_sufficient:
+        return "sufficient"
+    attempts = state.get("rag_attempts", 1)
+    if attempts >= settings.RAG_MAX_ATTEMPTS:
+        return "max_attempts"
+    elapsed = time.time() - (state.get("rag_started_at") or time.time())
+    # Do not start an attempt that would likely overrun the budget
+    if elapsed + elapsed / attempts > settings.RAG_LATENCY_BUDGET_SECONDS:
+        return "latency_budget"
+    history = {normalize_text(query).lower() for query in state.get("query_history", [])}
+    if not corrected_query.strip() or normalize_text(corrected_query).lower() in history:
+        return "repeated_query"
+    return None
+
+
 async def evaluate_answer_node(state: AICompanionState):
     """
     Evaluates the candidate answer and decides on the next step.
+
+    Keeps the best candidate of the turn, ranked by the evaluator's confidence. The loop ends when
+    an answer is sufficient, after RAG_MAX_ATTEMPTS attempts, when the next attempt would exceed
+    RAG_LATENCY_BUDGET_SECONDS, or when the rewritten query was already tried; the best candidate
+    and its context are then kept as the turn's answer.
     """
     print("---EVALUATE ANSWER---")
     evaluator_chain = get_answer_evaluator_chain()
-    rag_context = "\n\n---\n\n".join(state["rag_context"])
+    rag_context = get_rag_manager().format_context(state["rag_context"])
     response = await evaluator_chain.ainvoke(
         {
             "context": rag_context,
@@ -134,16 +304,30 @@ async def evaluate_answer_node(state: AICompanionState):
             "answer": state["candidate_answer"],
         }
     )
-    return {
+    update = {
         "is_sufficient": response.is_sufficient,
         "corrected_query": response.corrected_query,
     }
 
+    score = response.confidence if response.confidence is not None else float(response.is_sufficient)
+    best_candidate, best_rag_context = state.get("best_candidate"), state.get("best_rag_context")
+    if state.get("best_score") is None or score > state["best_score"]:
+        best_candidate, best_rag_context = state["candidate_answer"], state["rag_context"]
+        update.update(best_candidate=best_candidate, best_rag_context=best_rag_context, best_score=score)
+
+    reason = _rag_stop_reason(state, response.is_sufficient, response.corrected_query)
+    if reason is not None:
+        logger.info(f"RAG loop finished after {state.get('rag_attempts', 1)} attempts: {reason}")
+        update.update(rag_done=True, candidate_answer=best_candidate, rag_context=best_rag_context)
+    return update
+
 
 async def rewrite_query_node(state: AICompanionState):
     """
     Rewrites the user's query for better retrieval results.
+
+    The corrected query from the evaluator is only used for retrieval; the conversation keeps the
+    user's own question.
     """
     print("---REWRITE QUERY---")
-    # For now, we'll just use the corrected query from the evaluator
-    return {"messages": [HumanMessage(content=state["corrected_query"])]}
+    return {"rag_query": state["corrected_query"]}
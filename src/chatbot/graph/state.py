@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from langgraph.graph import MessagesState
 
 
@@ -11,13 +11,23 @@ class AICompanionState(MessagesState):
         last_message (AnyMessage): The most recent message in the conversation, can be any valid
             LangChain message type (HumanMessage, AIMessage, etc.)
         memory_context (str): The context of the memories to be injected into the character card.
-        rag_context (List[str]): The retrieved documents for RAG.
+        rag_context (List[str]): The retrieved document passages for RAG, packed to the token budget.
         candidate_answer (str): The candidate answer generated by the RAG loop.
         query_history (List[str]): The history of queries used in the RAG loop.
         rag_attempts (int): The number of attempts in the RAG loop.
+        rag_query (Optional[str]): The rewritten query for the next retrieval; None for the user's message.
+        rag_started_at (Optional[float]): Wall-clock time of the turn's first retrieval.
+        rag_done (bool): Whether the RAG loop has finished for this turn.
+        best_candidate (Optional[str]): The best candidate answer of the turn so far.
+        best_rag_context (Optional[List[str]]): The passages the best candidate was generated from.
+        best_score (Optional[float]): The evaluator's confidence in the best candidate.
         requires_rag (bool): Whether the query requires RAG.
         is_sufficient (bool): Whether the candidate answer is sufficient.
         corrected_query (str): The corrected query for the next RAG iteration.
+        prefetched_query (Optional[str]): The query `rag_context` was speculatively retrieved for
+            while the router was deciding, until rag_node consumes it.
+        turn_started_at (Optional[float]): Wall-clock time the caller started the turn, used to
+            measure pre-processing latency.
     """
 
     summary: str
@@ -26,6 +36,14 @@ class AICompanionState(MessagesState):
     candidate_answer: str
     query_history: List[str]
     rag_attempts: int
+    rag_query: Optional[str]
+    rag_started_at: Optional[float]
+    rag_done: bool
+    best_candidate: Optional[str]
+    best_rag_context: Optional[List[str]]
+    best_score: Optional[float]
     requires_rag: bool
     is_sufficient: bool
     corrected_query: str
+    prefetched_query: Optional[str]
+    turn_started_at: Optional[float]
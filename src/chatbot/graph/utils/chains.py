@@ -4,6 +4,7 @@ from src.chatbot.core.prompts import (
     RAG_ROUTER_PROMPT,
     RAG_PROMPT,
     EVALUATE_ANSWER_PROMPT,
+    STYLE_ANSWER_PROMPT,
 )
 from src.chatbot.graph.utils.helpers import AsteriskRemovalParser, get_chat_model
 from src.chatbot.graph.utils.schemas import RagRouter, AnswerEvaluator
@@ -20,13 +21,24 @@ def get_rag_router_chain():
     return prompt | model
 
 
-def get_character_response_chain(summary: str = ''):
+def get_character_response_chain(summary: str = '', with_rag_answer: bool = False, rag_answer_sufficient: bool = True):
     model = get_chat_model()
     system_message = CHARACTER_CARD_PROMPT
 
     if summary:
         system_message += f'\n\nSummary of conversation earlier between the chatbot and the user: {summary}'
 
+    if with_rag_answer and rag_answer_sufficient:
+        system_message += (
+            '\n\nAnswer to the latest message drafted from the Brahmware knowledge base; '
+            'base your reply on it and keep its facts unchanged:\n{rag_answer}'
+        )
+    elif with_rag_answer:
+        system_message += (
+            '\n\nIncomplete draft answer to the latest message from the Brahmware knowledge base; '
+            'keep any facts it states unchanged, but do not repeat its disclaimers:\n{rag_answer}'
+        )
+
     prompt = ChatPromptTemplate.from_messages(
         [
             ('system', system_message),
@@ -51,3 +63,11 @@ def get_answer_evaluator_chain():
     prompt = ChatPromptTemplate.from_template(EVALUATE_ANSWER_PROMPT)
 
     return prompt | model
+
+
+def get_answer_styling_chain():
+    model = get_chat_model()
+
+    prompt = ChatPromptTemplate.from_template(STYLE_ANSWER_PROMPT)
+
+    return prompt | model
@@ -33,6 +33,53 @@ def remove_asterisk_content(text: str) -> str:
     return re.sub(r"\*.*?\*", "", text).strip()
 
 
+class AsteriskStreamFilter:
+    """Streaming counterpart of `remove_asterisk_content`.
+
+    Text after an opening asterisk is held back until the span closes, and then dropped, or until
+    a newline shows the asterisk was literal. Leading whitespace is dropped and trailing whitespace
+    held back until more text follows, so the concatenated output of `feed` and `flush` equals
+    `remove_asterisk_content` of the concatenated input.
+    """
+
+    def __init__(self) -> None:
+        self._span = None
+        self._pending = ""
+        self._started = False
+
+    def feed(self, text: str) -> str:
+        """Filter the next chunk of the stream, returning the text that can be sent now."""
+        visible = []
+        for char in text:
+            if self._span is None:
+                if char == "*":
+                    self._span = char
+                else:
+                    visible.append(char)
+            elif char == "*":
+                self._span = None
+            elif char == "\n":
+                visible.append(self._span + char)
+                self._span = None
+            else:
+                self._span += char
+        return self._release("".join(visible))
+
+    def flush(self) -> str:
+        """The text still held back at the end of the stream: an unclosed span is literal."""
+        span, self._span = self._span or "", None
+        return self._release(span)
+
+    def _release(self, text: str) -> str:
+        text = self._pending + text
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        released = text.rstrip()
+        self._pending = text[len(released):]
+        return released
+
+
 class AsteriskRemovalParser(StrOutputParser):
     def parse(self, text):
         return remove_asterisk_content(super().parse(text))
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel, Field
 
 
@@ -26,3 +28,9 @@ class AnswerEvaluator(BaseModel):
         ...,
         description="The corrected query to be used for the next iteration of the RAG loop.",
     )
+    confidence: Optional[float] = Field(
+        None,
+        ge=0.0,
+        le=1.0,
+        description="How confident you are, from 0 to 1, that the answer correctly answers the query.",
+    )
@@ -0,0 +1,53 @@
+import threading
+from functools import lru_cache
+
+
+class SpeculationStats:
+    """Outcomes of speculative document retrievals started alongside the RAG router.
+
+    A speculation is used when the router asks for RAG, wasted when it does not, and failed when
+    the retrieval raised (rag_node then retrieves again). `hidden_seconds` is the retrieval time
+    that overlapped the router call, i.e. the latency taken off the RAG path; `wasted_seconds` is
+    the retrieval time spent on discarded speculations.
+    """
+
+    def __init__(self) -> None:
+        self.used = 0
+        self.wasted = 0
+        self.failed = 0
+        self.hidden_seconds = 0.0
+        self.wasted_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record_used(self, elapsed: float, waited: float) -> None:
+        """Record a used speculation that took `elapsed` seconds, `waited` of them after the router."""
+        with self._lock:
+            self.used += 1
+            self.hidden_seconds += max(elapsed - waited, 0.0)
+
+    def record_wasted(self, elapsed: float) -> None:
+        with self._lock:
+            self.wasted += 1
+            self.wasted_seconds += elapsed
+
+    def record_failed(self) -> None:
+        with self._lock:
+            self.failed += 1
+
+    def stats(self) -> dict:
+        total = self.used + self.wasted + self.failed
+        return {
+            "used": self.used,
+            "wasted": self.wasted,
+            "failed": self.failed,
+            "use_rate": round(self.used / total, 4) if total else 0.0,
+            "hidden_seconds": round(self.hidden_seconds, 3),
+            "avg_hidden_ms": round(1000 * self.hidden_seconds / self.used, 2) if self.used else 0.0,
+            "wasted_seconds": round(self.wasted_seconds, 3),
+        }
+
+
+@lru_cache
+def get_speculation_stats() -> SpeculationStats:
+    """Get the shared speculative retrieval counters."""
+    return SpeculationStats()
@@ -0,0 +1,22 @@
+from typing import AsyncIterator
+
+from langchain_core.messages import AIMessageChunk
+
+# Key of the custom stream events carrying reply tokens written by nodes
+ANSWER_TOKEN = "answer_token"
+
+
+async def stream_reply(graph, graph_input: dict, config: dict) -> AsyncIterator[str]:
+    """Run a turn through the compiled graph and yield the text of its reply as it is produced.
+
+    The reply comes either from conversation_node, whose model tokens arrive in the "messages"
+    stream, or from rag_answer_node, which writes its tokens as custom events. Tokens of the other
+    LLM calls (router, candidate answers, evaluation) are not part of the reply.
+    """
+    async for mode, chunk in graph.astream(graph_input, config, stream_mode=["messages", "custom"]):
+        if mode == "messages":
+            message, metadata = chunk
+            if metadata["langgraph_node"] == "conversation_node" and isinstance(message, AIMessageChunk):
+                yield message.content
+        elif isinstance(chunk, dict) and ANSWER_TOKEN in chunk:
+            yield chunk[ANSWER_TOKEN]
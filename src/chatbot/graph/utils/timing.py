@@ -0,0 +1,60 @@
+import functools
+import statistics
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Callable, Deque, Dict
+
+
+class NodeTimings:
+    """Rolling wall-clock latencies of graph nodes and whole turns.
+
+    Keeps the last `window` samples per name, so the percentiles follow the current load.
+    """
+
+    def __init__(self, window: int = 500) -> None:
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=self.window)).append(seconds)
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+            counts = dict(self._counts)
+        return {
+            name: {
+                "count": counts[name],
+                "avg_ms": round(1000 * statistics.fmean(values), 2),
+                "p50_ms": round(1000 * values[len(values) // 2], 2),
+                "p95_ms": round(1000 * values[min(len(values) - 1, int(0.95 * len(values)))], 2),
+            }
+            for name, values in samples.items()
+        }
+
+
+@lru_cache
+def get_node_timings() -> NodeTimings:
+    """Get the shared node latency recorder."""
+    return NodeTimings()
+
+
+def timed(name: str, node: Callable) -> Callable:
+    """Wrap an async graph node so every call records its latency under `name`."""
+
+    # functools.wraps keeps the signature visible to LangGraph, which passes `config` by name
+    @functools.wraps(node)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await node(*args, **kwargs)
+        finally:
+            get_node_timings().record(name, time.perf_counter() - start)
+
+    return wrapper
@@ -1,5 +1,6 @@
 import sys
 import os
+import time
 
 # Add the project root directory to the Python path
 # sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
@@ -7,10 +8,11 @@ import os
 from io import BytesIO
 
 import chainlit as cl
-from langchain_core.messages import AIMessageChunk, HumanMessage
+from langchain_core.messages import HumanMessage
 from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 
 from src.chatbot.graph import graph_builder
+from src.chatbot.graph.utils.streaming import stream_reply
 from src.chatbot.modules.image import ImageToText
 from src.chatbot.modules.speech import SpeechToText, TextToSpeech
 from src.chatbot.settings import settings
@@ -59,13 +61,12 @@ async def on_message(message: cl.Message):
     async with cl.Step(type="run"):
         async with AsyncSqliteSaver.from_conn_string(settings.SHORT_TERM_MEMORY_DB_PATH) as short_term_memory:
             graph = graph_builder.compile(checkpointer=short_term_memory)
-            async for chunk in graph.astream(
-                {"messages": [HumanMessage(content=content)]},
+            async for token in stream_reply(
+                graph,
+                {"messages": [HumanMessage(content=content)], "turn_started_at": time.time()},
                 {"configurable": {"thread_id": thread_id}},
-                stream_mode="messages",
             ):
-                if chunk[1]["langgraph_node"] == "conversation_node" and isinstance(chunk[0], AIMessageChunk):
-                    await msg.stream_token(chunk[0].content)
+                await msg.stream_token(token)
 
             output_state = await graph.aget_state(config={"configurable": {"thread_id": thread_id}})
 
@@ -118,7 +119,7 @@ async def on_audio_end(elements):
     async with AsyncSqliteSaver.from_conn_string(settings.SHORT_TERM_MEMORY_DB_PATH) as short_term_memory:
         graph = graph_builder.compile(checkpointer=short_term_memory)
         output_state = await graph.ainvoke(
-            {"messages": [HumanMessage(content=transcription)]},
+            {"messages": [HumanMessage(content=transcription)], "turn_started_at": time.time()},
             {"configurable": {"thread_id": thread_id}},
         )
 
@@ -9,14 +9,16 @@ from pathlib import Path
 import sys
 import os
 import asyncio
+import time
 
 # Add the project root directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
 
-from langchain_core.messages import AIMessageChunk, HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage
 from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 
 from src.chatbot.graph import graph_builder
+from src.chatbot.graph.utils.streaming import stream_reply
 from src.chatbot.settings import settings
 
 
@@ -162,20 +164,19 @@ async def process_input(content: str):
         graph = graph_builder.compile(checkpointer=short_term_memory)
 
         # Include full chat history
-        messages = [HumanMessage(m["content"]) if m["role"] == "user" else AIMessageChunk(m["content"])
+        messages = [HumanMessage(m["content"]) if m["role"] == "user" else AIMessage(m["content"])
                     for m in st.session_state.chat_history]
 
         # Add new user message
         messages.append(HumanMessage(content=content))
 
         collected_chunks = ""
-        async for chunk in graph.astream(
-            {"messages": messages},
+        async for token in stream_reply(
+            graph,
+            {"messages": messages, "turn_started_at": time.time()},
             {"configurable": {"thread_id": st.session_state.thread_id}},
-            stream_mode="messages",
         ):
-            if chunk[1]["langgraph_node"] == "conversation_node" and isinstance(chunk[0], AIMessageChunk):
-                collected_chunks += chunk[0].content
+            collected_chunks += token
 
         output_state = await graph.aget_state(config={"configurable": {"thread_id": st.session_state.thread_id}})
         return output_state, collected_chunks
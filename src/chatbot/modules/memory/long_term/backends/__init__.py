@@ -0,0 +1,38 @@
+from functools import lru_cache
+from pathlib import Path
+
+from src.chatbot.modules.memory.long_term.backends.base import (
+    CollectionNotFoundError,
+    SearchHit,
+    VectorBackend,
+    VectorRecord,
+)
+from src.chatbot.settings import settings
+
+
+@lru_cache
+def get_vector_backend() -> VectorBackend:
+    """Create the vector backend selected by settings.VECTOR_BACKEND ("qdrant" or "local")."""
+    if settings.VECTOR_BACKEND == "local":
+        from src.chatbot.modules.memory.long_term.backends.local import LocalBackend
+
+        return LocalBackend(
+            Path(settings.LOCAL_INDEX_PATH),
+            index_type=settings.LOCAL_INDEX_TYPE,
+            hnsw_m=settings.HNSW_M,
+            hnsw_ef_construction=settings.HNSW_EF_CONSTRUCTION,
+            hnsw_ef_search=settings.HNSW_EF_SEARCH,
+            oversampling=settings.QUANTIZATION_OVERSAMPLING,
+        )
+    if settings.VECTOR_BACKEND == "qdrant":
+        from src.chatbot.modules.memory.long_term.backends.qdrant import QdrantBackend
+
+        return QdrantBackend(
+            url="localhost",  # settings.QDRANT_URL, api_key=settings.QDRANT_API_KEY
+            port=settings.QDRANT_PORT,
+            oversampling=settings.QUANTIZATION_OVERSAMPLING if settings.VECTOR_QUANTIZATION != "none" else None,
+        )
+    raise ValueError(f"Unknown vector backend: {settings.VECTOR_BACKEND}")
+
+
+__all__ = ["CollectionNotFoundError", "SearchHit", "VectorBackend", "VectorRecord", "get_vector_backend"]
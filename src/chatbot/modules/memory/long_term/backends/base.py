@@ -0,0 +1,119 @@
+import asyncio
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class CollectionNotFoundError(Exception):
+    """Raised by a backend when the requested collection does not exist."""
+
+
+@dataclass
+class VectorRecord:
+    """A vector with its id and payload, as written to a backend."""
+
+    id: Any
+    vector: Optional[np.ndarray]
+    payload: dict
+
+
+@dataclass
+class SearchHit:
+    """A search result returned by a backend; `vector` is only set when requested."""
+
+    id: Any
+    score: float
+    payload: dict
+    vector: Optional[np.ndarray] = None
+
+
+class VectorBackend(ABC):
+    """Storage and nearest-neighbour search behind `VectorStore`.
+
+    Vectors are compared by cosine similarity. Filters use the Qdrant filter shape that the rest of
+    the code base already builds, e.g. {"must": [{"key": "source", "match": {"value": "document"}}]}.
+    Operations on a missing collection raise CollectionNotFoundError.
+
+    The async methods default to running the sync ones in a worker thread; backends with a native
+    async client override them.
+    """
+
+    @abstractmethod
+    def collection_exists(self, collection_name: str) -> bool:
+        """Check whether a collection exists."""
+
+    @abstractmethod
+    def create_collection(
+        self,
+        collection_name: str,
+        dim: int,
+        quantization: str = "none",
+        hnsw_m: Optional[int] = None,
+        hnsw_ef_construction: Optional[int] = None,
+        on_disk: bool = False,
+        payload_indexes: Sequence[str] = (),
+    ) -> None:
+        """Create a collection for vectors of size `dim`.
+
+        With `quantization` "int8" or "binary", searches run on compact codes and the best
+        candidates are rescored against the full-precision vectors. `hnsw_m` and
+        `hnsw_ef_construction` override the backend's graph defaults for this collection,
+        `on_disk` keeps the full-precision vectors on disk instead of in RAM, and
+        `payload_indexes` lists keyword payload fields to index for filtering.
+        """
+
+    @abstractmethod
+    def create_payload_index(self, collection_name: str, field_name: str) -> None:
+        """Index a keyword payload field for filtering; indexing an indexed field is a no-op."""
+
+    @abstractmethod
+    def upsert(self, collection_name: str, records: Sequence[VectorRecord]) -> None:
+        """Insert records, replacing existing ones with the same id."""
+
+    @abstractmethod
+    def delete(self, collection_name: str, ids: Sequence[Any]) -> None:
+        """Delete records by id; unknown ids are ignored."""
+
+    @abstractmethod
+    def search(
+        self,
+        collection_name: str,
+        vector: np.ndarray,
+        k: int,
+        filter: Optional[dict] = None,
+        with_vectors: bool = False,
+    ) -> List[SearchHit]:
+        """Return the `k` most similar records, best first, optionally with their stored vectors."""
+
+    @abstractmethod
+    def scroll(
+        self,
+        collection_name: str,
+        filter: Optional[dict] = None,
+        limit: int = 256,
+        offset: Optional[Any] = None,
+        with_vectors: bool = True,
+    ) -> Tuple[List[VectorRecord], Optional[Any]]:
+        """Return a page of up to `limit` records matching `filter`, and the offset of the next page
+        (None after the last page)."""
+
+    def search_batch(
+        self, collection_name: str, vectors: Sequence[np.ndarray], k: int, filter: Optional[dict] = None
+    ) -> List[List[SearchHit]]:
+        """Run one search per vector."""
+        return [self.search(collection_name, vector, k, filter) for vector in vectors]
+
+    async def asearch(
+        self,
+        collection_name: str,
+        vector: np.ndarray,
+        k: int,
+        filter: Optional[dict] = None,
+        with_vectors: bool = False,
+    ) -> List[SearchHit]:
+        return await asyncio.to_thread(self.search, collection_name, vector, k, filter, with_vectors)
+
+    async def aupsert(self, collection_name: str, records: Sequence[VectorRecord]) -> None:
+        await asyncio.to_thread(self.upsert, collection_name, records)
@@ -0,0 +1,254 @@
+import heapq
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class HNSWIndex:
+    """Hierarchical Navigable Small World graph over rows of an external vector matrix.
+
+    The index stores only the graph; vectors are passed in by the caller (the local backend's
+    memory-mapped matrix of L2-normalized vectors), and similarity is their dot product. Rows are
+    added one at a time and deleted by tombstoning: deleted rows keep routing searches but are
+    never returned. Layer 0 keeps up to 2*M links per node, upper layers up to M.
+
+    Args:
+        m: Links per node on the upper layers (2*m on layer 0); higher improves recall and memory use
+        ef_construction: Candidate list size while inserting; higher builds a better graph, slower
+        ef_search: Default candidate list size while searching; higher improves recall, slower
+    """
+
+    def __init__(self, m: int = 16, ef_construction: int = 100, ef_search: int = 64, seed: int = 0) -> None:
+        self.m = m
+        self.m0 = 2 * m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._level_mult = 1 / np.log(m)
+        self._rng = np.random.default_rng(seed)
+
+        self.levels = np.full(0, -1, dtype=np.int8)
+        self.deleted = np.zeros(0, dtype=bool)
+        self.layer0 = np.full((0, self.m0), -1, dtype=np.int32)
+        self.upper: List[Dict[int, np.ndarray]] = []
+        self.entry_point = -1
+        self.max_level = -1
+
+    def __contains__(self, row: int) -> bool:
+        return row < len(self.levels) and self.levels[row] >= 0
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero((self.levels >= 0) & ~self.deleted))
+
+    # -- graph helpers -------------------------------------------------------------------------
+
+    def _grow(self, rows: int) -> None:
+        if rows <= len(self.levels):
+            return
+        capacity = max(rows, 2 * len(self.levels), 1024)
+        extra = capacity - len(self.levels)
+        self.levels = np.concatenate([self.levels, np.full(extra, -1, dtype=np.int8)])
+        self.deleted = np.concatenate([self.deleted, np.zeros(extra, dtype=bool)])
+        self.layer0 = np.concatenate([self.layer0, np.full((extra, self.m0), -1, dtype=np.int32)])
+
+    def _neighbors(self, row: int, level: int) -> np.ndarray:
+        if level == 0:
+            links = self.layer0[row]
+            return links[links >= 0]
+        return self.upper[level - 1].get(row, np.empty(0, dtype=np.int32))
+
+    def _set_neighbors(self, row: int, level: int, links: np.ndarray) -> None:
+        if level == 0:
+            self.layer0[row] = -1
+            self.layer0[row, : len(links)] = links
+        else:
+            self.upper[level - 1][row] = np.asarray(links, dtype=np.int32)
+
+    def _search_layer(
+        self, query: np.ndarray, entry_points: List[int], ef: int, level: int, vectors: np.ndarray
+    ) -> List[Tuple[float, int]]:
+        """Best-first search on one layer; returns up to `ef` (similarity, row) pairs, unordered."""
+        visited = np.zeros(len(self.levels), dtype=bool)
+        visited[entry_points] = True
+        sims = (vectors[entry_points] @ query).tolist()
+        candidates = [(-sim, row) for sim, row in zip(sims, entry_points)]
+        heapq.heapify(candidates)
+        results = [(sim, row) for sim, row in zip(sims, entry_points)]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            neg_sim, row = heapq.heappop(candidates)
+            if len(results) >= ef and -neg_sim < results[0][0]:
+                break
+            links = self._neighbors(row, level)
+            links = links[~visited[links]]
+            if not len(links):
+                continue
+            visited[links] = True
+            link_sims = vectors[links] @ query
+            if len(results) >= ef:
+                # Only links that beat the current worst result can enter the candidate list
+                better = link_sims > results[0][0]
+                links, link_sims = links[better], link_sims[better]
+            for sim, n in zip(link_sims.tolist(), links.tolist()):
+                if len(results) < ef or sim > results[0][0]:
+                    heapq.heappush(candidates, (-sim, n))
+                    heapq.heappush(results, (sim, n))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+        return results
+
+    def _select_neighbors(self, candidates: List[Tuple[float, int]], m: int, vectors: np.ndarray) -> np.ndarray:
+        """Keep up to `m` diverse neighbours: a candidate closer to an already kept neighbour than
+        to the new node is skipped, then the list is topped up with the closest skipped ones."""
+        candidates = sorted(candidates, reverse=True)
+        if len(candidates) <= m:
+            return np.array([row for _, row in candidates], dtype=np.int32)
+
+        rows = np.array([row for _, row in candidates], dtype=np.int32)
+        sims = [sim for sim, _ in candidates]
+        pairwise = vectors[rows] @ vectors[rows].T
+        # closest[i]: highest similarity of candidate i to any neighbour kept so far
+        closest = np.full(len(rows), -np.inf, dtype=np.float32)
+        selected: List[int] = []
+        skipped: List[int] = []
+        for i, sim in enumerate(sims):
+            if len(selected) >= m:
+                break
+            if closest[i] < sim:
+                selected.append(i)
+                np.maximum(closest, pairwise[i], out=closest)
+            else:
+                skipped.append(i)
+        selected.extend(skipped[: m - len(selected)])
+        return rows[selected]
+
+    # -- public API ----------------------------------------------------------------------------
+
+    def add(self, row: int, vectors: np.ndarray) -> None:
+        """Insert `row` (whose vector is `vectors[row]`) into the graph."""
+        if row in self:
+            raise ValueError(f"Row {row} is already indexed")
+        self._grow(row + 1)
+        query = np.asarray(vectors[row], dtype=np.float32)
+        level = int(-np.log(1.0 - self._rng.random()) * self._level_mult)
+        self.levels[row] = level
+        while len(self.upper) < level:
+            self.upper.append({})
+
+        if self.entry_point < 0:
+            self.entry_point, self.max_level = row, level
+            return
+
+        entry_points = [self.entry_point]
+        for current in range(self.max_level, level, -1):
+            entry_points = [max(self._search_layer(query, entry_points, 1, current, vectors))[1]]
+
+        for current in range(min(level, self.max_level), -1, -1):
+            found = self._search_layer(query, entry_points, self.ef_construction, current, vectors)
+            links = self._select_neighbors(found, self.m, vectors)
+            self._set_neighbors(row, current, links)
+
+            max_links = self.m0 if current == 0 else self.m
+            for neighbor in links.tolist():
+                existing = self._neighbors(neighbor, current)
+                if len(existing) < max_links:
+                    self._set_neighbors(neighbor, current, np.append(existing, row))
+                    continue
+                pool = np.append(existing, row)
+                pool_sims = (vectors[pool] @ vectors[neighbor]).tolist()
+                self._set_neighbors(
+                    neighbor, current, self._select_neighbors(list(zip(pool_sims, pool.tolist())), max_links, vectors)
+                )
+            entry_points = [r for _, r in found]
+
+        if level > self.max_level:
+            self.entry_point, self.max_level = row, level
+
+    def mark_deleted(self, row: int) -> None:
+        """Exclude `row` from search results; it keeps routing searches through the graph."""
+        if row in self:
+            self.deleted[row] = True
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        vectors: np.ndarray,
+        mask: Optional[np.ndarray] = None,
+        ef: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate top-k rows by similarity, best first.
+
+        Args:
+            query: L2-normalized query vector
+            k: Number of results
+            vectors: The vector matrix the graph was built on
+            mask: Optional boolean array over rows; only rows set in it are returned
+            ef: Candidate list size (defaults to `ef_search`, at least `k`)
+
+        Returns:
+            (rows, similarities); fewer than `k` when the mask or tombstones exclude candidates
+        """
+        if self.entry_point < 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        query = np.asarray(query, dtype=np.float32)
+        entry_points = [self.entry_point]
+        for current in range(self.max_level, 0, -1):
+            entry_points = [max(self._search_layer(query, entry_points, 1, current, vectors))[1]]
+
+        found = sorted(self._search_layer(query, entry_points, max(ef or self.ef_search, k), 0, vectors), reverse=True)
+        rows, sims = [], []
+        for sim, row in found:
+            if self.deleted[row] or (mask is not None and (row >= len(mask) or not mask[row])):
+                continue
+            rows.append(row)
+            sims.append(sim)
+            if len(rows) == k:
+                break
+        return np.array(rows, dtype=np.int64), np.array(sims, dtype=np.float32)
+
+    # -- persistence ---------------------------------------------------------------------------
+
+    def save(self, path: Path) -> None:
+        """Write the graph to `path` (an .npz file) atomically."""
+        upper_rows, upper_levels, upper_links = [], [], []
+        for level, layer in enumerate(self.upper, start=1):
+            for row, links in layer.items():
+                padded = np.full(self.m, -1, dtype=np.int32)
+                padded[: len(links)] = links
+                upper_rows.append(row)
+                upper_levels.append(level)
+                upper_links.append(padded)
+
+        path = Path(path)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp.npz")
+        np.savez(
+            tmp_path,
+            params=np.array([self.m, self.ef_construction, self.entry_point, self.max_level], dtype=np.int64),
+            levels=self.levels,
+            deleted=self.deleted,
+            layer0=self.layer0,
+            upper_rows=np.array(upper_rows, dtype=np.int32),
+            upper_levels=np.array(upper_levels, dtype=np.int32),
+            upper_links=np.array(upper_links, dtype=np.int32).reshape(-1, self.m),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path, ef_search: int = 64) -> "HNSWIndex":
+        """Read a graph written by `save`."""
+        with np.load(path) as data:
+            m, ef_construction, entry_point, max_level = (int(value) for value in data["params"])
+            index = cls(m=m, ef_construction=ef_construction, ef_search=ef_search)
+            index.levels = data["levels"]
+            index.deleted = data["deleted"]
+            index.layer0 = data["layer0"]
+            index.entry_point, index.max_level = entry_point, max_level
+            index.upper = [{} for _ in range(max(max_level, 0))]
+            for row, level, links in zip(data["upper_rows"], data["upper_levels"], data["upper_links"]):
+                index.upper[level - 1][int(row)] = links[links >= 0]
+        return index
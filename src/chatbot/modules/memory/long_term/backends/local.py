@@ -0,0 +1,746 @@
+import atexit
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from src.chatbot.modules.memory.long_term.backends.base import (
+    CollectionNotFoundError,
+    SearchHit,
+    VectorBackend,
+    VectorRecord,
+)
+from src.chatbot.modules.memory.long_term.backends.hnsw import HNSWIndex
+from src.chatbot.modules.memory.long_term.backends.quantization import (
+    QUANTIZATION_MODES,
+    binary_scores,
+    int8_scores,
+    quantize_binary,
+    quantize_int8,
+)
+
+_INITIAL_CAPACITY = 1024
+# Below this many candidate rows an exact scan beats walking the HNSW graph in Python
+_EXACT_SEARCH_MAX_CANDIDATES = 10_000
+_HNSW_SAVE_INTERVAL = 10_000
+# Rows of retired points are compacted away on open once they make up this share of the rows
+_COMPACT_DEAD_FRACTION = 0.25
+
+
+class _LocalCollection:
+    """One collection of the local backend, stored in its own directory.
+
+    - `meta.json` holds the vector dimension, quantization mode and HNSW parameters, fixed at
+      creation, and the payload fields to index eagerly.
+    - `vectors.f32` is a memory-mapped float32 matrix of L2-normalized vectors, grown by doubling.
+    - `codes.i8` + `scales.f32` (int8) or `codes.bin` (binary) hold quantized copies of the vectors.
+    - `payloads.jsonl` is an append-only log of puts and deletes, replayed on open and compacted
+      when it holds mostly stale entries.
+    - `hnsw.npz` holds the HNSW graph when `index_type` is "hnsw".
+
+    With quantization, exact scans run over the compact codes and only the best
+    `k * oversampling` candidates are rescored against the full-precision vectors, so the float
+    matrix no longer has to stay resident in memory.
+
+    Search is exact by default. With an HNSW index, large candidate sets are searched through the
+    graph instead, falling back to an exact scan when a filter leaves too few graph results. Graph
+    nodes cannot change their vector, so with HNSW an update moves the point to a fresh row and the
+    old one is tombstoned; with exact search rows of deleted points are reused by later inserts.
+    Tombstoned rows are reclaimed by `compact`, which moves the live points to the front of the
+    files and rebuilds the graph; it runs on open once tombstones pass _COMPACT_DEAD_FRACTION.
+
+    Several processes may share a collection (the ingestion CLI next to the server): operations
+    hold an exclusive `flock` on the `lock` file, and a process reloads the collection when another
+    one changed its payload log or metadata, so rows are never assigned twice.
+
+    Equality filters are answered from an inverted index per payload key, built on open for the
+    indexed payload fields and otherwise the first time a key is filtered on; the resulting row
+    masks are cached until the next write.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        index_type: str = "flat",
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 100,
+        hnsw_ef_search: int = 64,
+        oversampling: float = 4.0,
+    ) -> None:
+        if index_type not in ("flat", "hnsw"):
+            raise ValueError(f"Unknown local index type: {index_type}")
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self.index_type = index_type
+        self.oversampling = oversampling
+        self._default_graph_params = (hnsw_m, hnsw_ef_construction, hnsw_ef_search)
+        self._lock = threading.RLock()
+        self._lock_file = open(path / "lock", "a+b")
+        self._log = None
+        # (inode, size) of the payload log and mtime of meta.json as of our last read or write
+        self._disk_state = None
+        with self._synced():
+            pass
+
+    def _open(self) -> None:
+        """(Re)load the collection from its files, catching up with the writes of other processes."""
+        with open(self.path / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.dim = meta["dim"]
+        self.quantization = meta.get("quantization", "none")
+        hnsw_m, hnsw_ef_construction, hnsw_ef_search = self._default_graph_params
+        # Graph parameters chosen at creation take precedence over the backend defaults
+        hnsw_m = meta.get("hnsw_m") or hnsw_m
+        hnsw_ef_construction = meta.get("hnsw_ef_construction") or hnsw_ef_construction
+        self.payload_indexes: List[str] = list(meta.get("payload_indexes", []))
+
+        self.ids: List[Any] = []
+        self.payloads: List[Optional[dict]] = []
+        self.id_to_row: Dict[Any, int] = {}
+        self.free_rows: List[int] = []
+        self._index: Dict[str, Dict[Any, Set[int]]] = {}
+        self._mask_cache: Dict[str, np.ndarray] = {}
+        log_entries = self._replay()
+        for key in self.payload_indexes:
+            self._index_for(key)
+
+        self.count = len(self.payloads)
+        missing_codes = self.quantization != "none" and not (self.path / self._codes_file()).exists()
+        self._open_vectors(max(_INITIAL_CAPACITY, self.count))
+        if missing_codes:
+            for offset in range(0, self.count, _INITIAL_CAPACITY):
+                rows = np.arange(offset, min(offset + _INITIAL_CAPACITY, self.count))
+                self._write_codes(rows, np.asarray(self.vectors[rows]))
+        self.alive = np.zeros(self.capacity, dtype=bool)
+        self.alive[: self.count] = [payload is not None for payload in self.payloads]
+        self.free_rows = [row for row in range(self.count) if not self.alive[row]]
+
+        dead = self.count - len(self.id_to_row)
+        if self.index_type == "hnsw" and dead >= _INITIAL_CAPACITY and dead > _COMPACT_DEAD_FRACTION * self.count:
+            # Also compacts the payload log
+            self._compact_rows()
+        elif log_entries > 2 * len(self.id_to_row) + _INITIAL_CAPACITY:
+            self._compact_log()
+        self._log = open(self.path / "payloads.jsonl", "a", encoding="utf-8")
+
+        self.graph: Optional[HNSWIndex] = None
+        self._unsaved_graph_changes = 0
+        self._graph_params = (hnsw_m, hnsw_ef_construction, hnsw_ef_search)
+        if self.index_type == "hnsw":
+            self._open_graph(*self._graph_params)
+        elif (self.path / "hnsw.npz").exists():
+            # Exact mode reuses rows, which would silently invalidate a saved graph
+            (self.path / "hnsw.npz").unlink()
+
+    def _read_disk_state(self) -> tuple:
+        log_path = self.path / "payloads.jsonl"
+        log_stat = log_path.stat() if log_path.exists() else None
+        return (
+            (log_stat.st_ino, log_stat.st_size) if log_stat is not None else None,
+            (self.path / "meta.json").stat().st_mtime_ns,
+        )
+
+    @contextmanager
+    def _synced(self):
+        """Hold the collection's file lock, with the in-memory state caught up with the files.
+
+        Without fcntl (Windows) only the threads of one process are coordinated.
+        """
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                if self._read_disk_state() != self._disk_state:
+                    if self._disk_state is not None:
+                        self.logger.info(f"Reloading '{self.path}', changed by another process")
+                    self._close_files()
+                    self._open()
+                yield
+                if self._log is not None:
+                    self._log.flush()
+                self._disk_state = self._read_disk_state()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _close_files(self) -> None:
+        if self._log is not None:
+            self._flush()
+            self._log.close()
+            self._log = None
+        self.vectors = self.codes = self.scales = None
+
+    @classmethod
+    def create(
+        cls,
+        path: Path,
+        dim: int,
+        quantization: str = "none",
+        hnsw_m: Optional[int] = None,
+        hnsw_ef_construction: Optional[int] = None,
+        payload_indexes: Sequence[str] = (),
+        options: Optional[dict] = None,
+    ) -> "_LocalCollection":
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode: {quantization}")
+        path.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "dim": dim,
+            "quantization": quantization,
+            "hnsw_m": hnsw_m,
+            "hnsw_ef_construction": hnsw_ef_construction,
+            "payload_indexes": list(payload_indexes),
+        }
+        with open(path / "lock", "a+b") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # Another process may have created the collection meanwhile; its data stays valid
+            if not (path / "meta.json").exists():
+                tmp_path = path / "meta.json.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(meta, f)
+                os.replace(tmp_path, path / "meta.json")
+        return cls(path, **(options or {}))
+
+    def create_payload_index(self, key: str) -> None:
+        with self._synced():
+            if key in self.payload_indexes:
+                return
+            self.payload_indexes.append(key)
+            with open(self.path / "meta.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            meta["payload_indexes"] = self.payload_indexes
+            tmp_path = self.path / "meta.json.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, self.path / "meta.json")
+            self._index_for(key)
+
+    # -- storage -------------------------------------------------------------------------------
+
+    def _replay(self) -> int:
+        log_path = self.path / "payloads.jsonl"
+        if not log_path.exists():
+            return 0
+        entries = 0
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-write
+                    self.logger.warning(f"Skipping unreadable entry in '{log_path}'")
+                    continue
+                entries += 1
+                if entry["op"] == "put":
+                    row = entry["row"]
+                    while len(self.payloads) <= row:
+                        self.payloads.append(None)
+                        self.ids.append(None)
+                    old_row = self.id_to_row.get(entry["id"])
+                    if old_row is not None and old_row != row:
+                        self.payloads[old_row] = None
+                    self.payloads[row] = entry["payload"]
+                    self.ids[row] = entry["id"]
+                    self.id_to_row[entry["id"]] = row
+                else:
+                    row = self.id_to_row.pop(entry["id"], None)
+                    if row is not None:
+                        self.payloads[row] = None
+        return entries
+
+    def _open_matrix(self, name: str, dtype, shape: tuple) -> np.memmap:
+        path = self.path / name
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        with open(path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+
+    def _codes_file(self) -> str:
+        return "codes.i8" if self.quantization == "int8" else "codes.bin"
+
+    def _open_vectors(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.vectors = self._open_matrix("vectors.f32", np.float32, (capacity, self.dim))
+        if self.quantization == "int8":
+            self.codes = self._open_matrix("codes.i8", np.int8, (capacity, self.dim))
+            self.scales = self._open_matrix("scales.f32", np.float32, (capacity,))
+        elif self.quantization == "binary":
+            self.codes = self._open_matrix("codes.bin", np.uint8, (capacity, (self.dim + 7) // 8))
+
+    def _flush(self) -> None:
+        self.vectors.flush()
+        if self.quantization != "none":
+            self.codes.flush()
+        if self.quantization == "int8":
+            self.scales.flush()
+
+    def _ensure_capacity(self, rows: int) -> None:
+        if rows <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < rows:
+            capacity *= 2
+        self._flush()
+        self.vectors = self.codes = self.scales = None
+        self._open_vectors(capacity)
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: len(self.alive)] = self.alive
+        self.alive = alive
+
+    def _write_codes(self, rows, vectors: np.ndarray) -> None:
+        if self.quantization == "int8":
+            self.codes[rows], self.scales[rows] = quantize_int8(vectors)
+        elif self.quantization == "binary":
+            self.codes[rows] = quantize_binary(vectors)
+
+    def _approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        if self.quantization == "int8":
+            return int8_scores(self.codes[: self.count], self.scales[: self.count], query)
+        return binary_scores(self.codes[: self.count], query)
+
+    def _compact_log(self) -> None:
+        log_path = self.path / "payloads.jsonl"
+        tmp_path = log_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for point_id, row in self.id_to_row.items():
+                f.write(json.dumps({"op": "put", "id": point_id, "row": row, "payload": self.payloads[row]}) + "\n")
+        os.replace(tmp_path, log_path)
+
+    def _copy_rows(self, name: str, matrix: np.memmap, rows: np.ndarray, capacity: int) -> None:
+        """Write `rows` of `matrix` to the front of a fresh file replacing `name`."""
+        tmp_path = self.path / (name + ".tmp")
+        tmp_path.unlink(missing_ok=True)
+        target = np.memmap(tmp_path, dtype=matrix.dtype, mode="w+", shape=(capacity,) + matrix.shape[1:])
+        for offset in range(0, len(rows), _INITIAL_CAPACITY):
+            chunk = rows[offset : offset + _INITIAL_CAPACITY]
+            target[offset : offset + len(chunk)] = matrix[chunk]
+        target.flush()
+        del target
+        os.replace(tmp_path, self.path / name)
+
+    def _compact_rows(self) -> None:
+        """Renumber the live points to rows 0..n-1, dropping the rows of retired and deleted points.
+
+        The saved graph refers to the old rows, so it is removed and has to be rebuilt.
+        """
+        live = np.flatnonzero(self.alive[: self.count])
+        capacity = max(_INITIAL_CAPACITY, len(live))
+        self._flush()
+        matrices = [("vectors.f32", self.vectors)]
+        if self.quantization != "none":
+            matrices.append((self._codes_file(), self.codes))
+        if self.quantization == "int8":
+            matrices.append(("scales.f32", self.scales))
+        for name, matrix in matrices:
+            self._copy_rows(name, matrix, live, capacity)
+        self.vectors = self.codes = self.scales = None
+        self._open_vectors(capacity)
+
+        self.payloads = [self.payloads[row] for row in live]
+        self.ids = [self.ids[row] for row in live]
+        self.id_to_row = {point_id: row for row, point_id in enumerate(self.ids)}
+        self.count = len(live)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.alive[: self.count] = True
+        self.free_rows = []
+        self._index.clear()
+        self._mask_cache.clear()
+        for key in self.payload_indexes:
+            self._index_for(key)
+
+        self._compact_log()
+        (self.path / "hnsw.npz").unlink(missing_ok=True)
+        self.logger.info(f"Compacted '{self.path}' to {self.count} rows")
+
+    def compact(self) -> int:
+        """Reclaim the rows of retired and deleted points, rebuilding the HNSW graph.
+
+        Returns:
+            Number of rows reclaimed
+        """
+        with self._synced():
+            dead = self.count - len(self.id_to_row)
+            if dead == 0:
+                return 0
+            self._log.close()
+            self._compact_rows()
+            self._log = open(self.path / "payloads.jsonl", "a", encoding="utf-8")
+            if self.graph is not None:
+                self.graph = None
+                self._unsaved_graph_changes = 0
+                self._open_graph(*self._graph_params)
+            return dead
+
+    def _open_graph(self, m: int, ef_construction: int, ef_search: int) -> None:
+        graph_path = self.path / "hnsw.npz"
+        graph = None
+        if graph_path.exists():
+            try:
+                graph = HNSWIndex.load(graph_path, ef_search=ef_search)
+            except (OSError, ValueError, KeyError) as e:
+                self.logger.warning(f"Rebuilding unreadable HNSW graph '{graph_path}': {e}")
+            if graph is not None and graph.m != m:
+                self.logger.info(f"Rebuilding HNSW graph '{graph_path}' for M={m}")
+                graph = None
+        if graph is None:
+            graph = HNSWIndex(m=m, ef_construction=ef_construction, ef_search=ef_search)
+
+        # The graph is saved periodically but the payload log on every write: catch up with it
+        for row in np.flatnonzero(graph.levels >= 0):
+            if row >= self.count or not self.alive[row]:
+                graph.mark_deleted(row)
+                self._unsaved_graph_changes += 1
+        for row in np.flatnonzero(self.alive[: self.count]):
+            if row not in graph:
+                graph.add(int(row), self.vectors)
+                self._unsaved_graph_changes += 1
+        self.graph = graph
+        if self._unsaved_graph_changes:
+            self._save_graph()
+
+    def _save_graph(self) -> None:
+        self.graph.save(self.path / "hnsw.npz")
+        self._unsaved_graph_changes = 0
+
+    # -- payload index -------------------------------------------------------------------------
+
+    def _index_for(self, key: str) -> Dict[Any, Set[int]]:
+        index = self._index.get(key)
+        if index is None:
+            index = {}
+            for row, payload in enumerate(self.payloads):
+                if payload is not None:
+                    self._index_value(index, payload.get(key), row)
+            self._index[key] = index
+        return index
+
+    @staticmethod
+    def _index_value(index: Dict[Any, Set[int]], value, row: int) -> None:
+        if isinstance(value, (str, int, float, bool)):
+            index.setdefault(value, set()).add(row)
+
+    def _unindex(self, row: int) -> None:
+        payload = self.payloads[row]
+        for key, index in self._index.items():
+            value = payload.get(key)
+            if isinstance(value, (str, int, float, bool)) and value in index:
+                index[value].discard(row)
+
+    def _filter_mask(self, filter: Optional[dict]) -> np.ndarray:
+        cache_key = json.dumps(filter, sort_keys=True)
+        mask = self._mask_cache.get(cache_key)
+        if mask is None:
+            mask = self._mask_cache[cache_key] = self._build_filter_mask(filter)
+        return mask
+
+    def _build_filter_mask(self, filter: Optional[dict]) -> np.ndarray:
+        mask = self.alive[: self.count].copy()
+        if not filter:
+            return mask
+        unsupported = set(filter) - {"must", "must_not"}
+        if unsupported:
+            raise ValueError(f"Unsupported filter clauses for the local backend: {sorted(unsupported)}")
+
+        for clause, wanted in (("must", True), ("must_not", False)):
+            for condition in filter.get(clause) or []:
+                match = condition.get("match") or {}
+                if "value" in match:
+                    values = [match["value"]]
+                elif "any" in match:
+                    values = match["any"]
+                else:
+                    raise ValueError(f"Unsupported filter condition for the local backend: {condition}")
+                index = self._index_for(condition["key"])
+                condition_mask = np.zeros(self.count, dtype=bool)
+                for value in values:
+                    rows = index.get(value)
+                    if rows:
+                        condition_mask[np.fromiter(rows, dtype=np.int64, count=len(rows))] = True
+                mask &= condition_mask if wanted else ~condition_mask
+        return mask
+
+    # -- operations ----------------------------------------------------------------------------
+
+    def upsert(self, records: Sequence[VectorRecord]) -> None:
+        # Only the last write of an id within a batch counts
+        records = list({record.id: record for record in records}.values())
+        if not records:
+            return
+        vectors = np.asarray([record.vector for record in records], dtype=np.float32)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of size {self.dim}, got {vectors.shape[1]}")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+
+        with self._synced():
+            self._mask_cache.clear()
+            rows = []
+            for record in records:
+                row = self.id_to_row.get(record.id)
+                if row is not None:
+                    self._unindex(row)
+                    if self.graph is not None:
+                        self._retire(row)
+                        row = None
+                if row is None and self.free_rows and self.graph is None:
+                    row = self.free_rows.pop()
+                elif row is None:
+                    row = self.count
+                    self.count += 1
+                    self.payloads.append(None)
+                    self.ids.append(None)
+                rows.append(row)
+                self.id_to_row[record.id] = row
+
+            self._ensure_capacity(self.count)
+            self.vectors[rows] = vectors
+            self._write_codes(rows, vectors)
+            self._flush()
+
+            for record, row in zip(records, rows):
+                self.payloads[row] = record.payload
+                self.ids[row] = record.id
+                self.alive[row] = True
+                for key, index in self._index.items():
+                    self._index_value(index, record.payload.get(key), row)
+                self._log.write(json.dumps({"op": "put", "id": record.id, "row": row, "payload": record.payload}) + "\n")
+            self._log.flush()
+
+            if self.graph is not None:
+                for row in rows:
+                    self.graph.add(row, self.vectors)
+                self._graph_changed(len(rows))
+
+    def _retire(self, row: int) -> None:
+        self.payloads[row] = None
+        self.ids[row] = None
+        self.alive[row] = False
+        self.graph.mark_deleted(row)
+
+    def _graph_changed(self, changes: int) -> None:
+        self._unsaved_graph_changes += changes
+        if self._unsaved_graph_changes >= _HNSW_SAVE_INTERVAL:
+            self._save_graph()
+
+    def delete(self, ids: Sequence[Any]) -> None:
+        with self._synced():
+            self._mask_cache.clear()
+            for point_id in ids:
+                row = self.id_to_row.pop(point_id, None)
+                if row is None:
+                    continue
+                self._unindex(row)
+                if self.graph is not None:
+                    self._retire(row)
+                    self._graph_changed(1)
+                else:
+                    self.payloads[row] = None
+                    self.ids[row] = None
+                    self.alive[row] = False
+                    self.free_rows.append(row)
+                self._log.write(json.dumps({"op": "del", "id": point_id}) + "\n")
+            self._log.flush()
+
+    def _hit(self, row: int, score: float, with_vectors: bool) -> SearchHit:
+        return SearchHit(
+            id=self.ids[row],
+            score=float(score),
+            payload=dict(self.payloads[row]),
+            vector=np.array(self.vectors[row]) if with_vectors else None,
+        )
+
+    def search(
+        self, vector: np.ndarray, k: int, filter: Optional[dict] = None, with_vectors: bool = False
+    ) -> List[SearchHit]:
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        with self._synced():
+            mask = self._filter_mask(filter)
+            candidates = int(np.count_nonzero(mask))
+            if candidates == 0:
+                return []
+            if self.graph is not None and candidates > _EXACT_SEARCH_MAX_CANDIDATES:
+                rows, scores = self.graph.search(query, k, self.vectors, mask=mask)
+                if len(rows) >= min(k, candidates):
+                    return [self._hit(row, score, with_vectors) for row, score in zip(rows, scores)]
+
+            k = min(k, candidates)
+            if self.quantization != "none":
+                return self._quantized_search(query, k, mask, candidates, with_vectors)
+
+            # Scoring every row and masking is cheaper than gathering the matching rows first
+            scores = self.vectors[: self.count] @ query
+            if candidates < self.count:
+                scores = np.where(mask, scores, -np.inf)
+
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [self._hit(row, scores[row], with_vectors) for row in top]
+
+    def scroll(
+        self, filter: Optional[dict] = None, limit: int = 256, offset: Optional[int] = None, with_vectors: bool = True
+    ) -> Tuple[List[VectorRecord], Optional[int]]:
+        with self._synced():
+            start = offset or 0
+            rows = np.flatnonzero(self._filter_mask(filter)[start:]) + start
+            records = [
+                VectorRecord(
+                    id=self.ids[row],
+                    vector=np.array(self.vectors[row]) if with_vectors else None,
+                    payload=dict(self.payloads[row]),
+                )
+                for row in rows[:limit]
+            ]
+            return records, int(rows[limit]) if len(rows) > limit else None
+
+    def _quantized_search(
+        self, query: np.ndarray, k: int, mask: np.ndarray, candidates: int, with_vectors: bool = False
+    ) -> List[SearchHit]:
+        """Shortlist by quantized score, then rescore the shortlist with full-precision vectors."""
+        approximate = self._approximate_scores(query)
+        if candidates < self.count:
+            approximate = np.where(mask, approximate, -np.inf)
+        shortlist_size = min(candidates, max(k, int(np.ceil(k * self.oversampling))))
+        shortlist = np.argpartition(-approximate, shortlist_size - 1)[:shortlist_size]
+        shortlist.sort()  # sequential reads from the memory-mapped vectors
+        scores = self.vectors[shortlist] @ query
+        best = np.argsort(-scores)[:k]
+        return [self._hit(row, score, with_vectors) for row, score in zip(shortlist[best], scores[best])]
+
+    def close(self) -> None:
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                if self._log is None:
+                    return
+                # After another process's writes our graph is stale; the next open catches up instead
+                if self.graph is not None and self._unsaved_graph_changes:
+                    if self._read_disk_state() == self._disk_state:
+                        self._save_graph()
+                self._close_files()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+
+class LocalBackend(VectorBackend):
+    """In-process backend: memory-mapped vectors with exact or HNSW cosine search.
+
+    Needs no server and only NumPy, which makes it suitable for single-node and offline
+    deployments. Exact search is fine up to a few hundred thousand vectors; beyond that use
+    `index_type="hnsw"`. Each collection lives in a subdirectory of `root`, and pending graph
+    changes are saved when the process exits. Vectors are always memory-mapped, so a
+    collection's `on_disk` option has no effect here.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        index_type: str = "flat",
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 100,
+        hnsw_ef_search: int = 64,
+        oversampling: float = 4.0,
+    ) -> None:
+        self.root = Path(root)
+        self._options = {
+            "index_type": index_type,
+            "hnsw_m": hnsw_m,
+            "hnsw_ef_construction": hnsw_ef_construction,
+            "hnsw_ef_search": hnsw_ef_search,
+            "oversampling": oversampling,
+        }
+        self._collections: Dict[str, _LocalCollection] = {}
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _collection(self, collection_name: str) -> _LocalCollection:
+        collection = self._collections.get(collection_name)
+        if collection is not None:
+            return collection
+        with self._lock:
+            if collection_name not in self._collections:
+                path = self.root / collection_name
+                if not (path / "meta.json").exists():
+                    raise CollectionNotFoundError(collection_name)
+                self._collections[collection_name] = _LocalCollection(path, **self._options)
+            return self._collections[collection_name]
+
+    def collection_exists(self, collection_name: str) -> bool:
+        return collection_name in self._collections or (self.root / collection_name / "meta.json").exists()
+
+    def create_collection(
+        self,
+        collection_name: str,
+        dim: int,
+        quantization: str = "none",
+        hnsw_m: Optional[int] = None,
+        hnsw_ef_construction: Optional[int] = None,
+        on_disk: bool = False,
+        payload_indexes: Sequence[str] = (),
+    ) -> None:
+        with self._lock:
+            self._collections[collection_name] = _LocalCollection.create(
+                self.root / collection_name,
+                dim,
+                quantization=quantization,
+                hnsw_m=hnsw_m,
+                hnsw_ef_construction=hnsw_ef_construction,
+                payload_indexes=payload_indexes,
+                options=self._options,
+            )
+
+    def create_payload_index(self, collection_name: str, field_name: str) -> None:
+        self._collection(collection_name).create_payload_index(field_name)
+
+    def scroll(
+        self,
+        collection_name: str,
+        filter: Optional[dict] = None,
+        limit: int = 256,
+        offset: Optional[Any] = None,
+        with_vectors: bool = True,
+    ) -> Tuple[List[VectorRecord], Optional[Any]]:
+        return self._collection(collection_name).scroll(filter, limit, offset, with_vectors)
+
+    def upsert(self, collection_name: str, records: Sequence[VectorRecord]) -> None:
+        self._collection(collection_name).upsert(records)
+
+    def delete(self, collection_name: str, ids: Sequence[Any]) -> None:
+        self._collection(collection_name).delete(ids)
+
+    def compact(self, collection_name: str) -> int:
+        """Reclaim the rows of updated and deleted points of a collection; returns the rows reclaimed."""
+        return self._collection(collection_name).compact()
+
+    def search(
+        self,
+        collection_name: str,
+        vector: np.ndarray,
+        k: int,
+        filter: Optional[dict] = None,
+        with_vectors: bool = False,
+    ) -> List[SearchHit]:
+        return self._collection(collection_name).search(vector, k, filter, with_vectors)
+
+    def close(self) -> None:
+        with self._lock:
+            for collection in self._collections.values():
+                collection.close()
+            self._collections.clear()
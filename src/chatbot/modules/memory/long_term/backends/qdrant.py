@@ -0,0 +1,234 @@
+import inspect
+from functools import wraps
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http.exceptions import UnexpectedResponse
+from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Distance,
+    HnswConfigDiff,
+    PayloadSchemaType,
+    PointIdsList,
+    PointStruct,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    SearchRequest,
+    VectorParams,
+)
+
+from src.chatbot.modules.memory.long_term.backends.base import (
+    CollectionNotFoundError,
+    SearchHit,
+    VectorBackend,
+    VectorRecord,
+)
+from src.chatbot.modules.memory.long_term.backends.quantization import QUANTIZATION_MODES
+
+
+def _translate_missing(method):
+    """Turn Qdrant's 404 into CollectionNotFoundError, for sync and async methods alike."""
+
+    def translate(e: UnexpectedResponse, collection_name: str):
+        if e.status_code == 404:
+            return CollectionNotFoundError(collection_name)
+        return e
+
+    if inspect.iscoroutinefunction(method):
+
+        @wraps(method)
+        async def async_wrapper(self, collection_name, *args, **kwargs):
+            try:
+                return await method(self, collection_name, *args, **kwargs)
+            except UnexpectedResponse as e:
+                raise translate(e, collection_name) from e
+
+        return async_wrapper
+
+    @wraps(method)
+    def wrapper(self, collection_name, *args, **kwargs):
+        try:
+            return method(self, collection_name, *args, **kwargs)
+        except UnexpectedResponse as e:
+            raise translate(e, collection_name) from e
+
+    return wrapper
+
+
+def _to_points(records: Sequence[VectorRecord]) -> List[PointStruct]:
+    return [
+        PointStruct(id=record.id, vector=np.asarray(record.vector).tolist(), payload=record.payload)
+        for record in records
+    ]
+
+
+def _to_hits(results) -> List[SearchHit]:
+    return [
+        SearchHit(
+            id=hit.id,
+            score=hit.score,
+            payload=hit.payload,
+            vector=np.asarray(hit.vector, dtype=np.float32) if hit.vector is not None else None,
+        )
+        for hit in results
+    ]
+
+
+class QdrantBackend(VectorBackend):
+    """Backend talking to a Qdrant server through the sync and async clients.
+
+    Quantized collections keep their original vectors on disk and the codes in RAM; searches ask
+    Qdrant to rescore `oversampling` times more candidates with the original vectors (Qdrant
+    ignores these parameters for collections without quantization).
+    """
+
+    def __init__(self, url: str, port: int, api_key: Optional[str] = None, oversampling: Optional[float] = None) -> None:
+        self.client = QdrantClient(url=url, port=port, api_key=api_key)
+        self.async_client = AsyncQdrantClient(url=url, port=port, api_key=api_key)
+        self.search_params = (
+            SearchParams(quantization=QuantizationSearchParams(rescore=True, oversampling=oversampling))
+            if oversampling
+            else None
+        )
+
+    def collection_exists(self, collection_name: str) -> bool:
+        collections = self.client.get_collections().collections
+        return any(col.name == collection_name for col in collections)
+
+    def create_collection(
+        self,
+        collection_name: str,
+        dim: int,
+        quantization: str = "none",
+        hnsw_m: Optional[int] = None,
+        hnsw_ef_construction: Optional[int] = None,
+        on_disk: bool = False,
+        payload_indexes: Sequence[str] = (),
+    ) -> None:
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode: {quantization}")
+        quantization_config = None
+        if quantization == "int8":
+            quantization_config = ScalarQuantization(
+                scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+            )
+        elif quantization == "binary":
+            quantization_config = BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+
+        self.client.create_collection(
+            collection_name=collection_name,
+            vectors_config=VectorParams(
+                size=dim, distance=Distance.COSINE, on_disk=on_disk or quantization_config is not None
+            ),
+            hnsw_config=HnswConfigDiff(m=hnsw_m, ef_construct=hnsw_ef_construction, on_disk=on_disk),
+            quantization_config=quantization_config,
+        )
+        for field_name in payload_indexes:
+            self.create_payload_index(collection_name, field_name)
+
+    @_translate_missing
+    def create_payload_index(self, collection_name: str, field_name: str) -> None:
+        self.client.create_payload_index(
+            collection_name=collection_name, field_name=field_name, field_schema=PayloadSchemaType.KEYWORD
+        )
+
+    @_translate_missing
+    def upsert(self, collection_name: str, records: Sequence[VectorRecord]) -> None:
+        self.client.upsert(collection_name=collection_name, points=_to_points(records))
+
+    @_translate_missing
+    def delete(self, collection_name: str, ids: Sequence[Any]) -> None:
+        self.client.delete(collection_name=collection_name, points_selector=PointIdsList(points=list(ids)))
+
+    @_translate_missing
+    def search(
+        self,
+        collection_name: str,
+        vector: np.ndarray,
+        k: int,
+        filter: Optional[dict] = None,
+        with_vectors: bool = False,
+    ) -> List[SearchHit]:
+        results = self.client.search(
+            collection_name=collection_name,
+            query_vector=np.asarray(vector).tolist(),
+            query_filter=filter,
+            search_params=self.search_params,
+            with_vectors=with_vectors,
+            limit=k,
+        )
+        return _to_hits(results)
+
+    @_translate_missing
+    def scroll(
+        self,
+        collection_name: str,
+        filter: Optional[dict] = None,
+        limit: int = 256,
+        offset: Optional[Any] = None,
+        with_vectors: bool = True,
+    ) -> Tuple[List[VectorRecord], Optional[Any]]:
+        points, next_offset = self.client.scroll(
+            collection_name=collection_name,
+            scroll_filter=filter,
+            limit=limit,
+            offset=offset,
+            with_payload=True,
+            with_vectors=with_vectors,
+        )
+        records = [
+            VectorRecord(
+                id=point.id,
+                vector=np.asarray(point.vector, dtype=np.float32) if point.vector is not None else None,
+                payload=point.payload,
+            )
+            for point in points
+        ]
+        return records, next_offset
+
+    @_translate_missing
+    def search_batch(
+        self, collection_name: str, vectors: Sequence[np.ndarray], k: int, filter: Optional[dict] = None
+    ) -> List[List[SearchHit]]:
+        responses = self.client.search_batch(
+            collection_name=collection_name,
+            requests=[
+                SearchRequest(
+                    vector=np.asarray(vector).tolist(),
+                    filter=filter,
+                    params=self.search_params,
+                    limit=k,
+                    with_payload=True,
+                )
+                for vector in vectors
+            ],
+        )
+        return [_to_hits(results) for results in responses]
+
+    @_translate_missing
+    async def asearch(
+        self,
+        collection_name: str,
+        vector: np.ndarray,
+        k: int,
+        filter: Optional[dict] = None,
+        with_vectors: bool = False,
+    ) -> List[SearchHit]:
+        results = await self.async_client.search(
+            collection_name=collection_name,
+            query_vector=np.asarray(vector).tolist(),
+            query_filter=filter,
+            search_params=self.search_params,
+            with_vectors=with_vectors,
+            limit=k,
+        )
+        return _to_hits(results)
+
+    @_translate_missing
+    async def aupsert(self, collection_name: str, records: Sequence[VectorRecord]) -> None:
+        await self.async_client.upsert(collection_name=collection_name, points=_to_points(records))
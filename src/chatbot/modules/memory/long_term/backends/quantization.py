@@ -0,0 +1,61 @@
+from typing import Tuple
+
+import numpy as np
+
+QUANTIZATION_MODES = ("none", "int8", "binary")
+
+# Number of set bits in every byte value, for NumPy versions without np.bitwise_count
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint16)
+# Rows converted to float32 at a time: keeps the converted block in cache
+_INT8_BLOCK_ROWS = 1024
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Scalar-quantize vectors to int8 with one scale per vector.
+
+    Returns:
+        (codes, scales) such that vectors ~= codes * scales[:, None]
+    """
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    max_abs = np.abs(vectors).max(axis=1)
+    scales = np.where(max_abs > 0, max_abs / 127, 1).astype(np.float32)
+    codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales
+
+
+def int8_scores(codes: np.ndarray, scales: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Approximate dot products of int8-quantized vectors with a float query."""
+    query = np.asarray(query, dtype=np.float32)
+    scores = np.empty(len(codes), dtype=np.float32)
+    for offset in range(0, len(codes), _INT8_BLOCK_ROWS):
+        block = codes[offset : offset + _INT8_BLOCK_ROWS]
+        scores[offset : offset + _INT8_BLOCK_ROWS] = block.astype(np.float32) @ query
+    return scores * scales
+
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    """Keep one sign bit per dimension, packed 8 dimensions per byte."""
+    return np.packbits(np.atleast_2d(np.asarray(vectors)) > 0, axis=1)
+
+
+def binary_scores(codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Approximate similarity of binary codes to a query: the number of matching sign bits."""
+    query_bits = quantize_binary(query)
+    if codes.shape[1] % 8 == 0:
+        # Compare 64 dimensions per operation
+        codes, query_bits = codes.view(np.uint64), query_bits.view(np.uint64)
+    differing = np.bitwise_xor(codes, query_bits[0])
+    if hasattr(np, "bitwise_count"):
+        distances = np.bitwise_count(differing).sum(axis=1, dtype=np.int64)
+    else:
+        distances = _POPCOUNT[differing.view(np.uint8)].sum(axis=1, dtype=np.int64)
+    return (codes.shape[1] * codes.itemsize * 8 - distances).astype(np.float32)
+
+
+def bytes_per_vector(quantization: str, dim: int) -> int:
+    """RAM needed per vector by the search codes of a quantization mode."""
+    if quantization == "int8":
+        return dim + 4
+    if quantization == "binary":
+        return (dim + 7) // 8
+    return dim * 4
@@ -0,0 +1,208 @@
+import atexit
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.chatbot.settings import settings
+
+# Access times of cache hits are buffered in memory and written in one batch once this many are pending
+_ACCESS_FLUSH_SIZE = 1024
+
+
+def text_digest(text: str) -> str:
+    """Stable digest of a text, used as embedding cache key."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different spellings of a query share one cache entry."""
+    return " ".join(text.split())
+
+
+class QueryEmbeddingCache:
+    """Bounded, thread-safe in-memory LRU cache of query embeddings with a time-to-live.
+
+    Sits in front of the encoder so that the same text embedded several times within a turn
+    (memory lookup, RAG retrieval, duplicate check, memory write) and popular queries across
+    turns are encoded only once.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, embedding = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return embedding
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, embedding: np.ndarray) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+        }
+
+
+class EmbeddingCache:
+    """Persistent embedding cache backed by SQLite, keyed by (model name, text digest).
+
+    Vectors are stored as float32 blobs. Each hit refreshes the entry's access time, and once the
+    cache grows past `max_entries` the least recently used entries are evicted. Lookups stay
+    read-only: access times are buffered and written with the next insert, once
+    _ACCESS_FLUSH_SIZE are pending, or at exit.
+    """
+
+    def __init__(self, path: Path, max_entries: int) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._accessed: Dict[Tuple[str, str], float] = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (model, digest)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)")
+        self._conn.commit()
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        atexit.register(self.flush)
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Look up the embeddings of `texts`; missing entries are returned as None."""
+        digests = [text_digest(text) for text in texts]
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for offset in range(0, len(digests), 500):
+                batch = list(dict.fromkeys(digests[offset : offset + 500]))
+                rows = self._conn.execute(
+                    f"SELECT digest, vector FROM embeddings WHERE model = ? AND digest IN ({','.join('?' * len(batch))})",
+                    [model, *batch],
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self._accessed.update(((model, digest), now) for digest in found)
+                if len(self._accessed) >= _ACCESS_FLUSH_SIZE:
+                    self._write_access_times()
+                    self._conn.commit()
+
+            results = [
+                np.frombuffer(found[digest], dtype=np.float32).copy() if digest in found else None
+                for digest in digests
+            ]
+            hits = sum(result is not None for result in results)
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence) -> None:
+        """Store the embeddings of `texts`, evicting least recently used entries if needed."""
+        now = time.time()
+        rows = [
+            (model, text_digest(text), np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, digest, vector, last_access) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._entries += self._conn.total_changes - before
+            if self._accessed:
+                # Shares the insert's transaction, and eviction has to see the recent hits
+                self._write_access_times()
+            if self._entries > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def flush(self) -> None:
+        """Write the buffered access times of cache hits."""
+        with self._lock:
+            if self._accessed:
+                self._write_access_times()
+                self._conn.commit()
+
+    def _write_access_times(self) -> None:
+        self._conn.executemany(
+            "UPDATE embeddings SET last_access = ? WHERE model = ? AND digest = ?",
+            [(accessed, model, digest) for (model, digest), accessed in self._accessed.items()],
+        )
+        self._accessed.clear()
+
+    def _evict(self) -> None:
+        # Evict down to 90% of capacity so eviction does not run on every insert
+        excess = self._entries - int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY last_access LIMIT ?)",
+            (excess,),
+        )
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "entries": self._entries,
+            "max_entries": self.max_entries,
+        }
+
+
+@lru_cache
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Get the shared persistent embedding cache, or None if it is disabled."""
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return None
+    return EmbeddingCache(Path(settings.EMBEDDING_CACHE_PATH), settings.EMBEDDING_CACHE_MAX_ENTRIES)
@@ -0,0 +1,116 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+_STOP = object()
+
+
+class EncodingService:
+    """Dynamic micro-batching front-end for an embedding model.
+
+    Concurrent callers submit single texts; a worker thread collects requests until it has
+    `max_batch_size` texts or `max_wait_ms` elapsed since the first one arrived, encodes them with
+    one batched model call and resolves each caller's future. Under load this turns many
+    single-text encodes (serialized on the GIL) into a few efficient batched ones, while a lone
+    caller waits at most `max_wait_ms` extra.
+    """
+
+    def __init__(
+        self,
+        encode_batch: Callable[[List[str]], np.ndarray],
+        max_batch_size: int,
+        max_wait_ms: float,
+    ) -> None:
+        self._encode_batch = encode_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._requests: queue.Queue = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="encoding-service", daemon=True)
+                self._worker.start()
+
+    def submit(self, text: str) -> Future:
+        """Queue a text for encoding and return a future resolving to its embedding."""
+        self._ensure_worker()
+        future: Future = Future()
+        self._requests.put((text, future))
+        return future
+
+    def encode(self, text: str) -> np.ndarray:
+        """Encode a text, blocking until its batch has been processed."""
+        return self.submit(text).result()
+
+    def encode_many(self, texts: Sequence[str]) -> List[np.ndarray]:
+        futures = [self.submit(text) for text in texts]
+        return [future.result() for future in futures]
+
+    async def aencode(self, text: str) -> np.ndarray:
+        """Encode a text without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(text))
+
+    def close(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            self._requests.put(_STOP)
+            self._worker.join()
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+    def _collect(self, first) -> List:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._requests.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            first = self._requests.get()
+            if first is _STOP:
+                return
+
+            batch = [(text, future) for text, future in self._collect(first) if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            try:
+                embeddings = self._encode_batch([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.texts += len(batch)
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
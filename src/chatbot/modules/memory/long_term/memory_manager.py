@@ -1,5 +1,4 @@
 import logging
-import uuid
 from datetime import datetime
 from typing import List, Optional
 
@@ -48,7 +47,7 @@ class MemoryManager:
         analysis = await self._analyze_memory(message.content)
         if analysis.is_important and analysis.formatted_memory:
             # Check if similar memory exists
-            similar = self.vector_store.find_similar_memory(analysis.formatted_memory)
+            similar = await self.vector_store.afind_similar_memory(analysis.formatted_memory)
             if similar:
                 # Skip storage if we already have a similar memory
                 self.logger.info(f"Similar memory already exists: '{analysis.formatted_memory}'")
@@ -56,10 +55,10 @@ class MemoryManager:
 
             # Store new memory
             self.logger.info(f"Storing new memory: '{analysis.formatted_memory}'")
-            self.vector_store.store_memory(
+            await self.vector_store.astore_memory(
                 text=analysis.formatted_memory,
+                # No id: the vector store derives it from the text, so rewrites are idempotent
                 metadata={
-                    "id": str(uuid.uuid4()),
                     "timestamp": datetime.now().isoformat(),
                     "source": "conversation",
                 },
@@ -71,12 +70,25 @@ class MemoryManager:
             context,
             k=settings.MEMORY_TOP_K,
             filter={"must": [{"key": "source", "match": {"value": source}}]},
+            mmr_lambda=settings.MEMORY_MMR_LAMBDA,
         )
         if memories:
             for memory in memories:
                 self.logger.debug(f"Memory: '{memory.text}' (score: {memory.score:.2f})")
         return [memory.text for memory in memories]
 
+    async def aget_relevant_memories(self, context: str, source: str = "conversation") -> List[str]:
+        """Async variant of `get_relevant_memories` for use inside the graph."""
+        memories = await self.vector_store.asearch_memories(
+            context,
+            k=settings.MEMORY_TOP_K,
+            filter={"must": [{"key": "source", "match": {"value": source}}]},
+            mmr_lambda=settings.MEMORY_MMR_LAMBDA,
+        )
+        for memory in memories:
+            self.logger.debug(f"Memory: '{memory.text}' (score: {memory.score:.2f})")
+        return [memory.text for memory in memories]
+
     def format_memories_for_prompt(self, memories: List[str]) -> str:
         """Format retrieved memories as bullet points."""
         if not memories:
@@ -0,0 +1,52 @@
+from typing import List, Optional
+
+import numpy as np
+
+
+def max_marginal_relevance(
+    query: Optional[np.ndarray],
+    vectors: np.ndarray,
+    k: int,
+    lambda_mult: float,
+    relevance: Optional[np.ndarray] = None,
+) -> List[int]:
+    """Greedily pick `k` rows of `vectors` that are relevant to `query` but not to each other.
+
+    Each step selects the candidate maximizing
+    lambda_mult * sim(query, c) - (1 - lambda_mult) * max(sim(c, s) for s already selected).
+
+    Args:
+        query: Query vector; may be None when `relevance` is given
+        vectors: Candidate vectors, one per row
+        k: Number of candidates to select
+        lambda_mult: 1.0 ranks by relevance only, 0.0 by diversity only
+        relevance: Precomputed relevance of each candidate, on a scale comparable to cosine
+            similarity, used instead of sim(query, c) (e.g. normalized fused scores)
+
+    Returns:
+        Indices of the selected rows, in selection order
+    """
+    if len(vectors) == 0 or k <= 0:
+        return []
+    vectors = np.asarray(vectors, dtype=np.float32)
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    if relevance is None:
+        query = np.asarray(query, dtype=np.float32)
+        relevance = vectors @ (query / max(float(np.linalg.norm(query)), 1e-12))
+    else:
+        relevance = np.asarray(relevance, dtype=np.float32)
+    # redundancy[i]: highest similarity of candidate i to any selected one
+    redundancy = np.full(len(vectors), -np.inf, dtype=np.float32)
+    available = np.ones(len(vectors), dtype=bool)
+    selected: List[int] = []
+    for _ in range(min(k, len(vectors))):
+        if selected:
+            scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(redundancy, vectors @ vectors[best], out=redundancy)
+    return selected
@@ -1,14 +1,48 @@
+import asyncio
+import logging
 import os
+import threading
+import time
+import uuid
 from dataclasses import dataclass
 from datetime import datetime
 from functools import lru_cache
-from typing import List, Optional
+from typing import Awaitable, Callable, List, Optional, TypeVar
 
+import numpy as np
+
+from src.chatbot.modules.memory.long_term.backends import (
+    CollectionNotFoundError,
+    SearchHit,
+    VectorRecord,
+    get_vector_backend,
+)
+from src.chatbot.modules.memory.long_term.embedding_cache import (
+    QueryEmbeddingCache,
+    get_embedding_cache,
+    normalize_text,
+)
+from src.chatbot.modules.memory.long_term.encoding_service import EncodingService
+from src.chatbot.modules.memory.long_term.mmr import max_marginal_relevance
 from src.chatbot.settings import settings
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, PointStruct, VectorParams
 from sentence_transformers import SentenceTransformer
 
+T = TypeVar("T")
+
+# Namespace of content-derived point ids; changing it would give every stored point a new id
+POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "rag-chat-memory/point-id")
+
+
+def content_point_id(collection: str, text: str, document: str = "", offset: int = -1) -> str:
+    """Deterministic point id derived from where a text is stored and what it says.
+
+    A UUIDv5 (Qdrant only accepts UUIDs and integers as ids) of the collection, the source
+    document, the chunk offset within it and the text, so storing the same content again
+    overwrites its point instead of adding a copy, in any process. Memories have no document
+    or offset. All inputs are kept in the point payload, so ids can be recomputed from it.
+    """
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, "\x1f".join([collection, document, str(offset), text])))
+
 
 @dataclass
 class Memory:
@@ -28,12 +62,31 @@ class Memory:
         return datetime.fromisoformat(ts) if ts else None
 
 
+@dataclass
+class BulkStoreResult:
+    """Summary of a bulk `VectorStore.store_many` call."""
+
+    stored: int
+    skipped: int
+    elapsed: float
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.stored / self.elapsed if self.elapsed > 0 else 0.0
+
+
 class VectorStore:
-    """A class to handle vector storage operations using Qdrant."""
+    """A class to handle vector storage operations on the configured vector backend.
+
+    Conversational memories and document chunks live in separate collections (MEMORY_COLLECTION_NAME
+    and DOCUMENT_COLLECTION_NAME), each created with its own index and storage settings and with
+    keyword payload indexes on the fields the app filters on. Operations default to the memory
+    collection; pass `collection` to work on another one.
+    """
 
     REQUIRED_ENV_VARS = ["QDRANT_URL", "QDRANT_API_KEY"]
     EMBEDDING_MODEL = "all-MiniLM-L6-v2"
-    COLLECTION_NAME = "long_term_memory"
+    PAYLOAD_INDEXES = ("source", "document_name")
     SIMILARITY_THRESHOLD = 0.9  # Threshold for considering memories as similar
 
     _instance: Optional["VectorStore"] = None
@@ -48,7 +101,26 @@ class VectorStore:
         if not self._initialized:
             # self._validate_env_vars()
             self.model = SentenceTransformer(self.EMBEDDING_MODEL,device='cpu')
-            self.client = QdrantClient(url="localhost", port=settings.QDRANT_PORT)  #(url=settings.QDRANT_URL, api_key=settings.QDRANT_API_KEY)
+            self.backend = get_vector_backend()
+            self.logger = logging.getLogger(__name__)
+            self.memory_collection = settings.MEMORY_COLLECTION_NAME
+            self.document_collection = settings.DOCUMENT_COLLECTION_NAME
+            self._ready_collections = set()
+            self._collection_lock = threading.Lock()
+            self.encoder = (
+                EncodingService(
+                    self._encode_uncached,
+                    max_batch_size=settings.ENCODER_MAX_BATCH_SIZE,
+                    max_wait_ms=settings.ENCODER_MAX_WAIT_MS,
+                )
+                if settings.ENCODER_MICRO_BATCHING
+                else None
+            )
+            self.embedding_cache = get_embedding_cache()
+            self.query_cache = QueryEmbeddingCache(
+                max_size=settings.QUERY_EMBEDDING_CACHE_SIZE,
+                ttl_seconds=settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+            )
             self._initialized = True
 
     def _validate_env_vars(self) -> None:
@@ -57,88 +129,474 @@ class VectorStore:
         if missing_vars:
             raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
 
-    def _collection_exists(self) -> bool:
-        """Check if the memory collection exists."""
-        collections = self.client.get_collections().collections
-        return any(col.name == self.COLLECTION_NAME for col in collections)
+    def _collection_options(self, collection: str) -> dict:
+        """Index and storage settings a collection is created with."""
+        if collection == self.document_collection:
+            # Quantization pays off on the large document corpus; memories stay full precision
+            return {
+                "quantization": settings.VECTOR_QUANTIZATION,
+                "hnsw_m": settings.DOCUMENT_HNSW_M,
+                "hnsw_ef_construction": settings.DOCUMENT_HNSW_EF_CONSTRUCTION,
+                "on_disk": settings.DOCUMENT_VECTORS_ON_DISK,
+            }
+        return {
+            "quantization": "none",
+            "hnsw_m": settings.MEMORY_HNSW_M,
+            "hnsw_ef_construction": settings.MEMORY_HNSW_EF_CONSTRUCTION,
+            "on_disk": settings.MEMORY_VECTORS_ON_DISK,
+        }
 
-    def _create_collection(self) -> None:
-        """Create a new collection for storing memories."""
+    def _create_collection(self, collection: str) -> None:
+        """Create a new collection for storing memories or document chunks."""
         sample_embedding = self.model.encode("sample text")
-        self.client.create_collection(
-            collection_name=self.COLLECTION_NAME,
-            vectors_config=VectorParams(
-                size=len(sample_embedding),
-                distance=Distance.COSINE,
-            ),
+        self.backend.create_collection(
+            collection,
+            dim=len(sample_embedding),
+            payload_indexes=self.PAYLOAD_INDEXES,
+            **self._collection_options(collection),
         )
 
-    def find_similar_memory(self, text: str) -> Optional[Memory]:
+    def ensure_collection(self, collection: Optional[str] = None) -> None:
+        """Create a collection if needed; only the first call per collection talks to the backend.
+
+        Collections created before payload indexing get their indexes added here.
+        """
+        collection = collection or self.memory_collection
+        if collection in self._ready_collections:
+            return
+        with self._collection_lock:
+            if collection not in self._ready_collections:
+                if not self.backend.collection_exists(collection):
+                    self._create_collection(collection)
+                else:
+                    for field_name in self.PAYLOAD_INDEXES:
+                        self.backend.create_payload_index(collection, field_name)
+                self._ready_collections.add(collection)
+
+    def _run(
+        self,
+        operation: Callable[[], T],
+        on_missing: Optional[Callable[[], T]] = None,
+        collection: Optional[str] = None,
+    ) -> T:
+        """Run an operation against a collection, recovering if it was deleted behind our back.
+
+        When the backend reports the collection as missing, the cached state is invalidated and the
+        collection recreated; the operation is then retried, or `on_missing` is returned instead.
+        """
+        collection = collection or self.memory_collection
+        self.ensure_collection(collection)
+        try:
+            return operation()
+        except CollectionNotFoundError:
+            self.logger.warning(f"Collection '{collection}' is missing, recreating it")
+            self._ready_collections.discard(collection)
+            self.ensure_collection(collection)
+            return on_missing() if on_missing is not None else operation()
+
+    async def aensure_collection(self, collection: Optional[str] = None) -> None:
+        """Async variant of `ensure_collection`; the one-time check runs off the event loop."""
+        if (collection or self.memory_collection) not in self._ready_collections:
+            await asyncio.to_thread(self.ensure_collection, collection)
+
+    async def _arun(
+        self,
+        operation: Callable[[], Awaitable[T]],
+        on_missing: Optional[Callable[[], T]] = None,
+        collection: Optional[str] = None,
+    ) -> T:
+        """Async variant of `_run` for awaitable backend operations."""
+        collection = collection or self.memory_collection
+        await self.aensure_collection(collection)
+        try:
+            return await operation()
+        except CollectionNotFoundError:
+            self.logger.warning(f"Collection '{collection}' is missing, recreating it")
+            self._ready_collections.discard(collection)
+            await self.aensure_collection(collection)
+            return on_missing() if on_missing is not None else await operation()
+
+    def embed_texts(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """Encode a batch of texts, reusing cached embeddings and encoding the rest in one model call.
+
+        Args:
+            texts: The texts to encode
+            batch_size: Encoder batch size (defaults to settings.EMBEDDING_BATCH_SIZE)
+
+        Returns:
+            Array of shape (len(texts), dim)
+        """
+        batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        if self.embedding_cache is None:
+            return self.model.encode(texts, batch_size=batch_size)
+
+        embeddings = self.embedding_cache.get_many(self.EMBEDDING_MODEL, texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            encoded = self.model.encode(missing_texts, batch_size=batch_size)
+            self.embedding_cache.put_many(self.EMBEDDING_MODEL, missing_texts, encoded)
+            for i, embedding in zip(missing, encoded):
+                embeddings[i] = embedding
+        return np.vstack(embeddings).astype(np.float32, copy=False)
+
+    def _encode_uncached(self, texts: List[str]) -> np.ndarray:
+        """Encode texts with the model only.
+
+        Queries, conversation context and memories are mostly one-off texts: writing them to the
+        persistent cache would put disk writes on every turn and evict the corpus embeddings.
+        """
+        return np.asarray(self.model.encode(texts, batch_size=settings.EMBEDDING_BATCH_SIZE), dtype=np.float32)
+
+    def _encode(self, text: str) -> np.ndarray:
+        """Encode a single query or memory text, served from the in-process cache when possible."""
+        key = normalize_text(text)
+        embedding = self.query_cache.get(key)
+        if embedding is None:
+            # Concurrent sessions' encodes are coalesced into one batched model call
+            embedding = self.encoder.encode(key) if self.encoder is not None else self._encode_uncached([key])[0]
+            self.query_cache.put(key, embedding)
+        return embedding
+
+    async def _aencode(self, text: str) -> np.ndarray:
+        """Async variant of `_encode`; the model runs off the event loop."""
+        key = normalize_text(text)
+        embedding = self.query_cache.get(key)
+        if embedding is None:
+            if self.encoder is not None:
+                embedding = await self.encoder.aencode(key)
+            else:
+                embedding = (await asyncio.to_thread(self._encode_uncached, [key]))[0]
+            self.query_cache.put(key, embedding)
+        return embedding
+
+    def embed_query(self, text: str) -> np.ndarray:
+        """The embedding of a query, shared with the searches for the same text."""
+        return self._encode(text)
+
+    async def aembed_query(self, text: str) -> np.ndarray:
+        """Async variant of `embed_query`."""
+        return await self._aencode(text)
+
+    def cache_stats(self) -> dict:
+        """Hit/miss counters of the embedding caches and encoder batching statistics."""
+        return {
+            "query_embedding_cache": self.query_cache.stats(),
+            "embedding_cache": self.embedding_cache.stats() if self.embedding_cache is not None else None,
+            "encoder": self.encoder.stats() if self.encoder is not None else None,
+        }
+
+    def upsert_embeddings(
+        self,
+        texts: List[str],
+        metadatas: List[dict],
+        embeddings,
+        progress_callback: Optional[Callable[[str, int], None]] = None,
+        collection: Optional[str] = None,
+    ) -> int:
+        """Upsert already-encoded texts as one batch, without similarity checks.
+
+        Args:
+            texts: The text contents
+            metadatas: One metadata dict per text
+            embeddings: One embedding per text, as returned by `embed_texts`
+            progress_callback: Called with ("upserted", n) once the batch is written
+            collection: Target collection (defaults to the memory collection)
+
+        Returns:
+            The number of points written
+        """
+        points = [
+            self._build_point(text, metadata, embedding, collection)
+            for text, metadata, embedding in zip(texts, metadatas, embeddings)
+        ]
+        return self._upsert_points(points, progress_callback, collection)
+
+    def _build_point(self, text: str, metadata: dict, embedding, collection: Optional[str] = None) -> VectorRecord:
+        point_id = metadata.get("id") or content_point_id(
+            collection or self.memory_collection,
+            text,
+            metadata.get("document_name", ""),
+            metadata.get("start_index", -1),
+        )
+        return VectorRecord(
+            id=point_id,
+            vector=embedding,
+            payload={
+                "text": text,
+                **metadata,
+                "id": point_id,
+            },
+        )
+
+    def find_similar_memory(self, text: str, collection: Optional[str] = None) -> Optional[Memory]:
         """Find if a similar memory already exists.
 
         Args:
             text: The text to search for
+            collection: Collection to search (defaults to the memory collection)
 
         Returns:
             Optional Memory if a similar one is found
         """
-        results = self.search_memories(text, k=1)
+        results = self.search_memories(text, k=1, collection=collection)
         if results and results[0].score >= self.SIMILARITY_THRESHOLD:
             return results[0]
         return None
 
-    def store_memory(self, text: str, metadata: dict) -> None:
+    def store_memory(
+        self, text: str, metadata: dict, collection: Optional[str] = None, deduplicate: bool = True
+    ) -> None:
         """Store a new memory in the vector store or update if similar exists.
 
         Args:
             text: The text content of the memory
             metadata: Additional information about the memory (timestamp, type, etc.)
+            collection: Target collection (defaults to the memory collection)
+            deduplicate: Reuse the id of an existing similar memory instead of the point's own id
         """
-        if not self._collection_exists():
-            self._create_collection()
+        self.ensure_collection(collection)
 
         # Check if similar memory exists
-        similar_memory = self.find_similar_memory(text)
+        similar_memory = self.find_similar_memory(text, collection) if deduplicate else None
         if similar_memory and similar_memory.id:
             metadata["id"] = similar_memory.id  # Keep same ID for update
 
-        embedding = self.model.encode(text)
-        point = PointStruct(
-            id=metadata.get("id", hash(text)),
-            vector=embedding.tolist(),
-            payload={
-                "text": text,
-                **metadata,
-            },
+        embedding = self._encode(text)
+        self._upsert_points([self._build_point(text, metadata, embedding, collection)], collection=collection)
+
+    async def afind_similar_memory(self, text: str) -> Optional[Memory]:
+        """Async variant of `find_similar_memory`."""
+        results = await self.asearch_memories(text, k=1)
+        if results and results[0].score >= self.SIMILARITY_THRESHOLD:
+            return results[0]
+        return None
+
+    async def astore_memory(self, text: str, metadata: dict) -> None:
+        """Async variant of `store_memory`."""
+        await self.aensure_collection()
+
+        # Check if similar memory exists
+        similar_memory = await self.afind_similar_memory(text)
+        if similar_memory and similar_memory.id:
+            metadata["id"] = similar_memory.id  # Keep same ID for update
+
+        embedding = await self._aencode(text)
+        point = self._build_point(text, metadata, embedding)
+        await self._arun(
+            lambda: self.backend.aupsert(self.memory_collection, [point])
+        )
+
+    def store_many(
+        self,
+        texts: List[str],
+        metadatas: List[dict],
+        batch_size: Optional[int] = None,
+        deduplicate: bool = True,
+        progress_callback: Optional[Callable[[str, int], None]] = None,
+        collection: Optional[str] = None,
+    ) -> BulkStoreResult:
+        """Store many texts at once using batched encoding and batched upserts.
+
+        The collection is checked once, texts are encoded `batch_size` at a time, near-duplicates
+        of existing memories are resolved with a single batched search per encoding batch, and
+        points are upserted `settings.UPSERT_BATCH_SIZE` at a time.
+
+        Args:
+            texts: The text contents to store
+            metadatas: One metadata dict per text
+            batch_size: Number of texts encoded per model call (defaults to settings.EMBEDDING_BATCH_SIZE)
+            deduplicate: Reuse the id of an existing similar memory instead of adding a new point
+            progress_callback: Called with ("embedded", n) and ("upserted", n) as batches complete
+            collection: Target collection (defaults to the memory collection)
+
+        Returns:
+            BulkStoreResult with the number of stored/skipped texts and the elapsed time
+        """
+        if len(texts) != len(metadatas):
+            raise ValueError("texts and metadatas must have the same length")
+
+        batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        start = time.perf_counter()
+
+        self.ensure_collection(collection)
+
+        seen_texts = set()
+        pending: List[VectorRecord] = []
+        stored = skipped = 0
+
+        for offset in range(0, len(texts), batch_size):
+            batch_texts, batch_metadatas = [], []
+            for text, metadata in zip(texts[offset : offset + batch_size], metadatas[offset : offset + batch_size]):
+                # Exact duplicates within the same call would only overwrite each other
+                if text in seen_texts:
+                    skipped += 1
+                    continue
+                seen_texts.add(text)
+                batch_texts.append(text)
+                batch_metadatas.append(dict(metadata))
+
+            if not batch_texts:
+                continue
+
+            embeddings = self.embed_texts(batch_texts, batch_size=batch_size)
+            if progress_callback:
+                progress_callback("embedded", len(batch_texts))
+
+            if deduplicate:
+                similar_ids = self._find_similar_ids(embeddings, collection)
+                for metadata, similar_id in zip(batch_metadatas, similar_ids):
+                    if similar_id is not None:
+                        metadata["id"] = similar_id  # Keep same ID for update
+
+            for text, metadata, embedding in zip(batch_texts, batch_metadatas, embeddings):
+                pending.append(self._build_point(text, metadata, embedding, collection))
+
+            while len(pending) >= settings.UPSERT_BATCH_SIZE:
+                stored += self._upsert_points(pending[: settings.UPSERT_BATCH_SIZE], progress_callback, collection)
+                pending = pending[settings.UPSERT_BATCH_SIZE :]
+
+        if pending:
+            stored += self._upsert_points(pending, progress_callback, collection)
+
+        return BulkStoreResult(stored=stored, skipped=skipped, elapsed=time.perf_counter() - start)
+
+    def _find_similar_ids(self, embeddings, collection: Optional[str] = None) -> List[Optional[str]]:
+        """Return the id of an existing similar memory for each embedding, using one batched search."""
+        collection = collection or self.memory_collection
+        responses = self._run(
+            lambda: self.backend.search_batch(collection, embeddings, k=1),
+            on_missing=lambda: [[] for _ in embeddings],
+            collection=collection,
         )
+        similar_ids = []
+        for hits in responses:
+            if hits and hits[0].score >= self.SIMILARITY_THRESHOLD and hits[0].payload.get("id"):
+                similar_ids.append(hits[0].payload["id"])
+            else:
+                similar_ids.append(None)
+        return similar_ids
 
-        self.client.upsert(
-            collection_name=self.COLLECTION_NAME,
-            points=[point],
+    def _upsert_points(
+        self,
+        points: List[VectorRecord],
+        progress_callback: Optional[Callable[[str, int], None]] = None,
+        collection: Optional[str] = None,
+    ) -> int:
+        """Upsert a batch of points and return how many were written."""
+        collection = collection or self.memory_collection
+        self._run(
+            lambda: self.backend.upsert(collection, points),
+            collection=collection,
         )
+        if progress_callback:
+            progress_callback("upserted", len(points))
+        return len(points)
 
-    def search_memories(self, query: str, k: int = 5, filter: Optional[dict] = None) -> List[Memory]:
+    def delete_points(self, ids: List[str], collection: Optional[str] = None) -> None:
+        """Delete points from the vector store by id.
+
+        Args:
+            ids: The ids of the points to delete
+            collection: Collection holding the points (defaults to the memory collection)
+        """
+        collection = collection or self.memory_collection
+        for offset in range(0, len(ids), settings.UPSERT_BATCH_SIZE):
+            batch = ids[offset : offset + settings.UPSERT_BATCH_SIZE]
+            self._run(
+                lambda: self.backend.delete(collection, batch),
+                on_missing=lambda: None,
+                collection=collection,
+            )
+
+    def search_memories(
+        self,
+        query: str,
+        k: int = 5,
+        filter: Optional[dict] = None,
+        mmr_lambda: Optional[float] = None,
+        fetch_k: Optional[int] = None,
+        collection: Optional[str] = None,
+    ) -> List[Memory]:
         """Search for similar memories in the vector store.
 
         Args:
             query: Text to search for
             k: Number of results to return
-            filter: Qdrant filter to apply to the search
+            filter: Qdrant-style filter to apply to the search
+            mmr_lambda: If set (and below 1.0), over-fetch candidates and rerank them with
+                max-marginal-relevance; lower values favour diversity over relevance
+            fetch_k: Candidates to fetch for MMR (defaults to MMR_FETCH_K, at least `k`)
+            collection: Collection to search (defaults to the memory collection)
+
+        Returns:
+            List of Memory objects
+        """
+        collection = collection or self.memory_collection
+        query_embedding = self._encode(query)
+        use_mmr = self._use_mmr(mmr_lambda)
+        limit = max(fetch_k or settings.MMR_FETCH_K, k) if use_mmr else k
+        results = self._run(
+            lambda: self.backend.search(collection, query_embedding, limit, filter, with_vectors=use_mmr),
+            on_missing=lambda: [],
+            collection=collection,
+        )
+        if use_mmr:
+            results = self._rerank_mmr(query_embedding, results, k, mmr_lambda)
+
+        return self._to_memories(results)
+
+    async def asearch_memories(
+        self,
+        query: str,
+        k: int = 5,
+        filter: Optional[dict] = None,
+        mmr_lambda: Optional[float] = None,
+        fetch_k: Optional[int] = None,
+        collection: Optional[str] = None,
+    ) -> List[Memory]:
+        """Async variant of `search_memories` that does not block the event loop.
+
+        Args:
+            query: Text to search for
+            k: Number of results to return
+            filter: Qdrant-style filter to apply to the search
+            mmr_lambda: If set (and below 1.0), rerank over-fetched candidates with max-marginal-relevance
+            fetch_k: Candidates to fetch for MMR (defaults to MMR_FETCH_K, at least `k`)
+            collection: Collection to search (defaults to the memory collection)
 
         Returns:
             List of Memory objects
         """
-        if not self._collection_exists():
-            return []
-
-        query_embedding = self.model.encode(query)
-        results = self.client.search(
-            collection_name=self.COLLECTION_NAME,
-            query_vector=query_embedding.tolist(),
-            query_filter=filter,
-            limit=k,
+        collection = collection or self.memory_collection
+        query_embedding = await self._aencode(query)
+        use_mmr = self._use_mmr(mmr_lambda)
+        limit = max(fetch_k or settings.MMR_FETCH_K, k) if use_mmr else k
+        results = await self._arun(
+            lambda: self.backend.asearch(collection, query_embedding, limit, filter, with_vectors=use_mmr),
+            on_missing=lambda: [],
+            collection=collection,
+        )
+        if use_mmr:
+            results = self._rerank_mmr(query_embedding, results, k, mmr_lambda)
+        return self._to_memories(results)
+
+    @staticmethod
+    def _use_mmr(mmr_lambda: Optional[float]) -> bool:
+        return mmr_lambda is not None and mmr_lambda < 1.0
+
+    @staticmethod
+    def _rerank_mmr(query_embedding: np.ndarray, hits: List[SearchHit], k: int, mmr_lambda: float) -> List[SearchHit]:
+        """Select a diverse subset of `k` hits, keeping their similarity to the query as score."""
+        if len(hits) <= 1:
+            return hits[:k]
+        selected = max_marginal_relevance(
+            query_embedding, np.stack([hit.vector for hit in hits]), k, mmr_lambda
         )
+        return [hits[i] for i in selected]
 
+    @staticmethod
+    def _to_memories(results) -> List[Memory]:
         return [
             Memory(
                 text=hit.payload["text"],
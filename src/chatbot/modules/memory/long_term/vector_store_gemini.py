@@ -4,6 +4,8 @@ from datetime import datetime
 from functools import lru_cache
 from typing import List, Optional
 
+from src.chatbot.modules.memory.long_term.embedding_cache import get_embedding_cache
+from src.chatbot.modules.memory.long_term.vector_store import content_point_id
 from src.chatbot.settings import settings
 from qdrant_client import QdrantClient
 from qdrant_client.models import Distance, PointStruct, VectorParams
@@ -53,6 +55,7 @@ class VectorStore:
                 api_key=settings.GOOGLE_API_KEY
             )
             self.client = QdrantClient(url="localhost", port=settings.QDRANT_PORT)
+            self.embedding_cache = get_embedding_cache()
             self._initialized = True
 
     def _validate_env_vars(self) -> None:
@@ -60,6 +63,21 @@ class VectorStore:
         if missing_vars:
             raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
 
+    def _embed_query(self, text: str) -> List[float]:
+        """Embed a text with the Gemini API, reusing the persistent cache to save quota."""
+        if self.embedding_cache is None:
+            return self.model.embed_query(text)
+
+        # Query and document embeddings use different task types, so they are cached separately
+        cache_key = f"{self.EMBEDDING_MODEL}:query"
+        cached = self.embedding_cache.get_many(cache_key, [text])[0]
+        if cached is not None:
+            return cached.tolist()
+
+        embedding = self.model.embed_query(text)
+        self.embedding_cache.put_many(cache_key, [text], [embedding])
+        return embedding
+
     def _collection_exists(self) -> bool:
         collections = self.client.get_collections().collections
         return any(col.name == self.COLLECTION_NAME for col in collections)
@@ -88,9 +106,12 @@ class VectorStore:
         if similar_memory and similar_memory.id:
             metadata["id"] = similar_memory.id
 
-        embedding = self.model.embed_query(text)  # TODO: Changed .encode to .embed_query
+        embedding = self._embed_query(text)
         point = PointStruct(
-            id=metadata.get("id", hash(text)),
+            id=metadata.get("id")
+            or content_point_id(
+                self.COLLECTION_NAME, text, metadata.get("document_name", ""), metadata.get("start_index", -1)
+            ),
             vector=embedding,
             payload={
                 "text": text,
@@ -107,7 +128,7 @@ class VectorStore:
         if not self._collection_exists():
             return []
 
-        query_embedding = self.model.embed_query(query)  # TODO: Changed .encode to .embed_query
+        query_embedding = self._embed_query(query)
         results = self.client.search(
             collection_name=self.COLLECTION_NAME,
             query_vector=query_embedding,
@@ -0,0 +1,210 @@
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.chatbot.settings import settings
+
+# Words, plus codes such as "ERR-404", "v2.1.3" or "pkg/module_name" kept whole
+_TOKEN_PATTERN = re.compile(r"\w+(?:[-./:]\w+)*")
+_PART_PATTERN = re.compile(r"[-./:_]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase tokens; compound codes are indexed both whole and by their parts."""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+        parts = [part for part in _PART_PATTERN.split(token) if part]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+class BM25Index:
+    """In-process BM25 keyword index over document chunks, keyed by vector store point id.
+
+    Complements dense retrieval for exact-term queries (product codes, error strings) that
+    embeddings tend to miss. Chunks are added and removed incrementally during ingestion. The
+    index is persisted as an append-only JSONL log, compacted on load. Other processes (e.g. the
+    ingestion CLI next to the server) append to the same log, and their changes are picked up
+    before each search.
+    """
+
+    def __init__(self, path: Path, k1: float = 1.5, b: float = 0.75) -> None:
+        self.path = Path(path)
+        self.k1 = k1
+        self.b = b
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        self._reset()
+        self._load()
+
+    def _reset(self) -> None:
+        self.documents: Dict[str, Tuple[str, dict]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+        self._offset = 0
+        self._log_entries = 0
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def __contains__(self, point_id: str) -> bool:
+        self._refresh()
+        return point_id in self.documents
+
+    def contains_all(self, point_ids: Iterable[str]) -> bool:
+        self._refresh()
+        with self._lock:
+            return all(point_id in self.documents for point_id in point_ids)
+
+    # -- persistence ---------------------------------------------------------------------------
+
+    def _load(self) -> None:
+        with self._lock:
+            self._reset()
+            self._read_log()
+            if self._log_entries > 2 * len(self.documents) + 1000:
+                self._compact()
+
+    def _read_log(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            while True:
+                line = f.readline()
+                if not line or not line.endswith(b"\n"):
+                    # Stop before a line another process is still writing
+                    break
+                self._offset = f.tell()
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    self.logger.warning(f"Skipping unreadable entry in '{self.path}'")
+                    continue
+                self._log_entries += 1
+                if entry["op"] == "add":
+                    for point_id, text, metadata in entry["documents"]:
+                        self._add(point_id, text, metadata)
+                else:
+                    for point_id in entry["ids"]:
+                        self._remove(point_id)
+
+    def _refresh(self) -> None:
+        """Apply entries appended by other processes, or reload after a compaction."""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        with self._lock:
+            if size < self._offset:
+                self._load()
+            elif size > self._offset:
+                self._read_log()
+
+    def _append(self, entry: dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write((json.dumps(entry) + "\n").encode("utf-8"))
+            self._offset = f.tell()
+        self._log_entries += 1
+
+    def _compact(self) -> None:
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            documents = [[point_id, text, metadata] for point_id, (text, metadata) in self.documents.items()]
+            for offset in range(0, len(documents), 1000):
+                entry = {"op": "add", "documents": documents[offset : offset + 1000]}
+                f.write((json.dumps(entry) + "\n").encode("utf-8"))
+            offset = f.tell()
+        os.replace(tmp_path, self.path)
+        self._offset = offset
+        self._log_entries = math.ceil(len(documents) / 1000)
+
+    # -- updates -------------------------------------------------------------------------------
+
+    def _add(self, point_id: str, text: str, metadata: dict) -> None:
+        if point_id in self.documents:
+            self._remove(point_id)
+        term_counts = Counter(tokenize(text))
+        self.documents[point_id] = (text, metadata)
+        self._lengths[point_id] = sum(term_counts.values())
+        self._total_length += self._lengths[point_id]
+        for term, count in term_counts.items():
+            self._postings.setdefault(term, {})[point_id] = count
+
+    def _remove(self, point_id: str) -> None:
+        document = self.documents.pop(point_id, None)
+        if document is None:
+            return
+        self._total_length -= self._lengths.pop(point_id)
+        for term in set(tokenize(document[0])):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(point_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def add_many(self, documents: List[Tuple[str, str, dict]]) -> None:
+        """Index (point_id, text, metadata) triples, replacing existing ones with the same id."""
+        if not documents:
+            return
+        self._refresh()
+        with self._lock:
+            for point_id, text, metadata in documents:
+                self._add(point_id, text, metadata)
+            self._append({"op": "add", "documents": [list(document) for document in documents]})
+
+    def remove(self, point_ids: List[str]) -> None:
+        """Remove chunks by point id; unknown ids are ignored."""
+        if not point_ids:
+            return
+        self._refresh()
+        with self._lock:
+            for point_id in point_ids:
+                self._remove(point_id)
+            self._append({"op": "remove", "ids": list(point_ids)})
+
+    # -- search --------------------------------------------------------------------------------
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Return up to `k` (point_id, score) pairs, best first."""
+        self._refresh()
+        terms = set(tokenize(query))
+        with self._lock:
+            if not self.documents or not terms:
+                return []
+            n = len(self.documents)
+            average_length = self._total_length / n
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for point_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[point_id] / average_length)
+                    scores[point_id] = scores.get(point_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def get(self, point_id: str) -> Optional[Tuple[str, dict]]:
+        """The (text, metadata) of an indexed chunk."""
+        with self._lock:
+            return self.documents.get(point_id)
+
+
+@lru_cache
+def get_bm25_index() -> Optional[BM25Index]:
+    """Get the shared BM25 index, or None if hybrid search is disabled."""
+    if not settings.RAG_HYBRID_SEARCH:
+        return None
+    return BM25Index(Path(settings.BM25_INDEX_PATH))
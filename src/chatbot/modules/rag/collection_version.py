@@ -0,0 +1,58 @@
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from src.chatbot.settings import settings
+
+
+class CollectionVersion:
+    """Version counter of the document collection, stored in a small file.
+
+    Ingestion bumps it whenever documents are added, replaced or removed; caches of retrieval
+    results compare it to the version their entries were computed at. Keeping it in a file lets the
+    ingestion CLI invalidate the caches of a running server. Reads only stat the file unless it
+    was replaced since the last read.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._stat_key = None
+        self._value = 0
+
+    def _read(self) -> int:
+        try:
+            return int(self.path.read_text(encoding="utf-8").strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def current(self) -> int:
+        """The current version; 0 if nothing was ever ingested."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return 0
+        # bump() replaces the file, so its inode changes even when size and mtime do not
+        stat_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if stat_key != self._stat_key:
+                self._value = self._read()
+                self._stat_key = stat_key
+            return self._value
+
+    def bump(self) -> int:
+        """Increment the version and return the new value."""
+        with self._lock:
+            value = self._read() + 1
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(str(value), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+            return value
+
+
+@lru_cache
+def get_collection_version() -> CollectionVersion:
+    """Get the shared document collection version."""
+    return CollectionVersion(Path(settings.COLLECTION_VERSION_PATH))
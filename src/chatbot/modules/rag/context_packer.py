@@ -0,0 +1,122 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+from src.chatbot.modules.memory.long_term.vector_store import Memory
+
+# Rough characters-per-token ratio for English text; avoids a tokenizer round trip per turn
+CHARS_PER_TOKEN = 4
+CONTEXT_SEPARATOR = "\n\n---\n\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the number of prompt tokens in `text`."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+@dataclass
+class Passage:
+    """A contiguous span of a document assembled from one or more retrieved chunks."""
+
+    text: str
+    rank: int  # Best retrieval rank among the merged chunks, 0 being the best
+    document_name: str = ""
+    start: int = -1
+    chunk_ids: List[str] = field(default_factory=list)
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.text)
+
+
+def _merge(passage: Passage, chunk: Passage) -> bool:
+    """Extend `passage` with `chunk` if they overlap in the source document.
+
+    Chunks are exact substrings of the page they were split from, so an overlap is only merged
+    when the shared span matches; chunks from different pages of the same file can carry the
+    same offsets and are left apart.
+    """
+    overlap = passage.end - chunk.start
+    if overlap <= 0:
+        return False
+    if chunk.end <= passage.end:
+        contained = passage.text[chunk.start - passage.start :].startswith(chunk.text)
+        if contained:
+            passage.rank = min(passage.rank, chunk.rank)
+            passage.chunk_ids.extend(chunk.chunk_ids)
+        return contained
+    if not passage.text.endswith(chunk.text[:overlap]):
+        return False
+    passage.text += chunk.text[overlap:]
+    passage.rank = min(passage.rank, chunk.rank)
+    passage.chunk_ids.extend(chunk.chunk_ids)
+    return True
+
+
+def merge_chunks(chunks: Sequence[Memory]) -> List[Passage]:
+    """Collapse retrieved chunks into passages, best ranked first.
+
+    Chunks from the same document whose character ranges overlap (the splitter's chunk overlap)
+    are stitched into one passage so the shared text is sent once; exact duplicates are dropped.
+
+    Args:
+        chunks: Retrieved chunks, best first, with `document_name`/`start_index` metadata
+
+    Returns:
+        Passages ordered by the best rank of the chunks they contain
+    """
+    passages: List[Passage] = []
+    by_document: Dict[str, List[Passage]] = {}
+    seen_texts = set()
+    for rank, chunk in enumerate(chunks):
+        if chunk.text in seen_texts:
+            continue
+        seen_texts.add(chunk.text)
+        passage = Passage(
+            text=chunk.text,
+            rank=rank,
+            document_name=chunk.metadata.get("document_name", ""),
+            start=chunk.metadata.get("start_index", -1),
+            chunk_ids=[chunk.id] if chunk.id else [],
+        )
+        if passage.document_name and passage.start >= 0:
+            by_document.setdefault(passage.document_name, []).append(passage)
+        else:
+            passages.append(passage)
+
+    for document_passages in by_document.values():
+        merged: List[Passage] = []
+        for passage in sorted(document_passages, key=lambda p: p.start):
+            if not any(_merge(existing, passage) for existing in reversed(merged)):
+                merged.append(passage)
+        passages.extend(merged)
+
+    return sorted(passages, key=lambda p: p.rank)
+
+
+def pack_context(chunks: Sequence[Memory], token_budget: int) -> List[str]:
+    """Deduplicate, merge and trim retrieved chunks to fit a prompt token budget.
+
+    Passages are added best ranked first; one that does not fit is skipped in favour of smaller,
+    lower ranked ones. If not even the best passage fits, it is truncated to the budget.
+
+    Args:
+        chunks: Retrieved chunks, best first
+        token_budget: Maximum estimated tokens for the packed context (0 or less disables the limit)
+
+    Returns:
+        Passage texts to place in the prompt, best first
+    """
+    passages = merge_chunks(chunks)
+    if token_budget <= 0:
+        return [passage.text for passage in passages]
+
+    separator_tokens = estimate_tokens(CONTEXT_SEPARATOR)
+    packed, used = [], 0
+    for passage in passages:
+        tokens = estimate_tokens(passage.text) + (separator_tokens if packed else 0)
+        if used + tokens <= token_budget:
+            packed.append(passage.text)
+            used += tokens
+    if not packed and passages:
+        packed.append(passages[0].text[: token_budget * CHARS_PER_TOKEN])
+    return packed
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import List, Optional
+
+from langchain_core.documents import Document
+
+from src.chatbot.settings import settings
+
+
+class DocumentCache:
+    """On-disk, content-addressed cache of extracted pages and chunks.
+
+    Pages are keyed by the file's content hash and the loader that produced them; chunks are
+    additionally keyed by the splitter settings. Source paths are not part of the key (or of the
+    stored metadata), so renamed or moved files still hit the cache. Entries are written atomically,
+    so an ingestion that crashes half-way keeps the files it already parsed.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.logger = logging.getLogger(__name__)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(*parts) -> str:
+        return hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+    def _path(self, kind: str, key: str) -> Path:
+        return self.root / kind / key[:2] / f"{key}.json"
+
+    def _read(self, path: Path, file_path: Path) -> Optional[List[Document]]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable cache entry '{path}': {e}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return [
+            Document(page_content=entry["page_content"], metadata={**entry["metadata"], "source": str(file_path)})
+            for entry in entries
+        ]
+
+    def _write(self, path: Path, documents: List[Document]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                [
+                    {
+                        "page_content": document.page_content,
+                        "metadata": {k: v for k, v in document.metadata.items() if k != "source"},
+                    }
+                    for document in documents
+                ],
+                f,
+            )
+        os.replace(tmp_path, path)
+
+    def get_pages(self, file_path: Path, content_hash: str, loader: str) -> Optional[List[Document]]:
+        """Return the cached pages of a file, or None if it has not been parsed with this loader."""
+        return self._read(self._path("pages", self._key(content_hash, loader)), file_path)
+
+    def put_pages(self, content_hash: str, loader: str, pages: List[Document]) -> None:
+        self._write(self._path("pages", self._key(content_hash, loader)), pages)
+
+    def get_chunks(
+        self, file_path: Path, content_hash: str, loader: str, chunk_size: int, chunk_overlap: int
+    ) -> Optional[List[Document]]:
+        """Return the cached chunks of a file for these splitter settings, or None."""
+        return self._read(
+            self._path("chunks", self._key(content_hash, loader, chunk_size, chunk_overlap)), file_path
+        )
+
+    def put_chunks(
+        self, content_hash: str, loader: str, chunk_size: int, chunk_overlap: int, chunks: List[Document]
+    ) -> None:
+        self._write(self._path("chunks", self._key(content_hash, loader, chunk_size, chunk_overlap)), chunks)
+
+
+def get_document_cache() -> Optional[DocumentCache]:
+    """Get the configured document cache, or None if caching is disabled."""
+    if not settings.DOCUMENT_CACHE_ENABLED:
+        return None
+    return DocumentCache(Path(settings.DOCUMENT_CACHE_DIR))
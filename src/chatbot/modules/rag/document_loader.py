@@ -0,0 +1,231 @@
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from langchain_community.document_loaders import (
+    PyPDFLoader,
+    UnstructuredMarkdownLoader,
+)
+from langchain_core.documents import Document
+from pypdf import PdfReader
+
+from src.chatbot.modules.rag.document_cache import DocumentCache
+from src.chatbot.modules.rag.ingestion_manifest import file_sha256
+from src.chatbot.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Supported file loaders
+FILE_LOADERS = {
+    ".pdf": PyPDFLoader,
+    ".md": UnstructuredMarkdownLoader,
+}
+
+# Cache key loader name of PDFs split into page ranges: their pages are read with PdfReader directly
+# and carry only source/page/total_pages metadata, so they must not pass for PyPDFLoader output
+PDF_PAGES_LOADER = "PdfReaderPages"
+
+# A unit of parsing work: a file, optionally restricted to a [start, end) page range
+LoadTask = Tuple[str, Optional[Tuple[int, int]]]
+
+
+@dataclass
+class LoadResult:
+    """The documents parsed from one file, or the error that prevented it.
+
+    `loader` names the loader that produced the documents, as used in document cache keys.
+    """
+
+    file_path: Path
+    loader: str
+    documents: List[Document] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def list_source_files(data_dir: Path) -> List[Path]:
+    """List the supported documents in the data directory, in a stable order."""
+    return sorted(file_path for file_path in data_dir.iterdir() if file_path.suffix in FILE_LOADERS)
+
+
+def loader_name(file_path: Path) -> str:
+    """Name of the loader used for a file, as used in document cache keys."""
+    return FILE_LOADERS[file_path.suffix].__name__
+
+
+def load_file(file_path: Path) -> List[Document]:
+    """Load a single supported document."""
+    loader_class = FILE_LOADERS[file_path.suffix]
+    return loader_class(str(file_path)).load()
+
+
+def load_pdf_pages(file_path: Path, start: int, end: int) -> List[Document]:
+    """Load pages [start, end) of a PDF, one Document per page."""
+    reader = PdfReader(str(file_path))
+    total_pages = len(reader.pages)
+    return [
+        Document(
+            page_content=reader.pages[page].extract_text(),
+            metadata={"source": str(file_path), "page": page, "total_pages": total_pages},
+        )
+        for page in range(start, min(end, total_pages))
+    ]
+
+
+def _plan_tasks(file_path: Path, pages_per_task: int) -> List[LoadTask]:
+    """Split large PDFs into page ranges; everything else is parsed as a whole."""
+    if file_path.suffix != ".pdf":
+        return [(str(file_path), None)]
+    try:
+        total_pages = len(PdfReader(str(file_path)).pages)
+    except Exception:
+        # Let the worker report the parse error for this file
+        return [(str(file_path), None)]
+    if total_pages <= pages_per_task:
+        return [(str(file_path), None)]
+    return [(str(file_path), (start, start + pages_per_task)) for start in range(0, total_pages, pages_per_task)]
+
+
+def _run_task(task: LoadTask) -> Tuple[List[Document], Optional[str]]:
+    """Process-pool entry point: never raises, so one corrupt file cannot break the pool."""
+    file_path, page_range = task
+    try:
+        if page_range is None:
+            return load_file(Path(file_path)), None
+        return load_pdf_pages(Path(file_path), *page_range), None
+    except Exception as e:
+        return [], str(e)
+
+
+def iter_load_results(
+    file_paths: Sequence[Path],
+    workers: Optional[int] = None,
+    pages_per_task: Optional[int] = None,
+    cache: Optional[DocumentCache] = None,
+) -> Iterator[LoadResult]:
+    """Parse files, yielding one LoadResult per file in the order of `file_paths`.
+
+    With more than one worker, files (and page ranges of large PDFs) are parsed in a process pool.
+    At most `2 * workers` tasks are in flight, so memory stays bounded when the consumer is slower.
+    Files whose pages are already in `cache` are not parsed again; newly parsed files are added to it.
+
+    Args:
+        file_paths: The files to parse
+        workers: Number of parser processes (defaults to settings.INGEST_LOAD_WORKERS, 1 = in-process)
+        pages_per_task: Page range size for splitting large PDFs (defaults to settings.PDF_PAGES_PER_TASK)
+        cache: Optional document cache consulted before parsing
+    """
+    content_hashes = {}
+
+    def cached_pages(file_path: Path, loader: str) -> Optional[List[Document]]:
+        if cache is None:
+            return None
+        content_hashes[file_path] = file_sha256(file_path)
+        return cache.get_pages(file_path, content_hashes[file_path], loader)
+
+    def finish(result: LoadResult, from_cache: bool) -> LoadResult:
+        if cache is not None and not from_cache and result.error is None:
+            cache.put_pages(content_hashes[result.file_path], result.loader, result.documents)
+        return result
+
+    workers = workers or settings.INGEST_LOAD_WORKERS
+    if workers <= 1:
+        for file_path in file_paths:
+            loader = loader_name(file_path)
+            pages = cached_pages(file_path, loader)
+            if pages is not None:
+                yield LoadResult(file_path, loader, pages)
+                continue
+            documents, error = _run_task((str(file_path), None))
+            yield finish(LoadResult(file_path, loader, documents, error), from_cache=False)
+        return
+
+    pages_per_task = pages_per_task or settings.PDF_PAGES_PER_TASK
+
+    def plan():
+        for file_path in file_paths:
+            file_tasks = _plan_tasks(file_path, pages_per_task)
+            # Split PDFs are cached under their own loader name, as their pages differ from PyPDFLoader's
+            loader = PDF_PAGES_LOADER if file_tasks[0][1] is not None else loader_name(file_path)
+            pages = cached_pages(file_path, loader)
+            if pages is not None:
+                yield file_path, loader, None, pages
+                continue
+            for task in file_tasks:
+                yield file_path, loader, task, None
+
+    tasks = plan()
+
+    # "spawn" keeps workers independent of the threads running in the parent (e.g. the ingestion pipeline)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        in_flight = deque()
+        current: Optional[LoadResult] = None
+        current_from_cache = False
+
+        def fill() -> None:
+            while len(in_flight) < 2 * workers:
+                try:
+                    file_path, loader, task, pages = next(tasks)
+                except StopIteration:
+                    return
+                if pages is not None:
+                    future = Future()
+                    future.set_result((pages, None))
+                    in_flight.append((file_path, loader, future, True))
+                else:
+                    in_flight.append((file_path, loader, executor.submit(_run_task, task), False))
+
+        fill()
+        while in_flight:
+            file_path, loader, future, from_cache = in_flight.popleft()
+            fill()
+            documents, error = future.result()
+
+            if current is not None and current.file_path != file_path:
+                yield finish(current, current_from_cache)
+                current = None
+            if current is None:
+                current = LoadResult(file_path, loader)
+                current_from_cache = from_cache
+
+            if current.error is None:
+                if error is None:
+                    current.documents.extend(documents)
+                else:
+                    current.error = error
+                    current.documents = []
+
+        if current is not None:
+            yield finish(current, current_from_cache)
+
+
+def load_documents(
+    data_dir: Path,
+    workers: Optional[int] = None,
+    pages_per_task: Optional[int] = None,
+    cache: Optional[DocumentCache] = None,
+) -> List[Document]:
+    """Load all supported documents from the data directory.
+
+    Args:
+        data_dir: Directory containing the source documents
+        workers: Number of parser processes (defaults to settings.INGEST_LOAD_WORKERS, 1 = serial)
+        pages_per_task: Page range size for splitting large PDFs across workers
+        cache: Optional document cache of extracted pages, consulted before parsing
+
+    Returns:
+        The parsed documents, in file order; files that fail to parse are logged and skipped
+    """
+    documents = []
+    for result in iter_load_results(
+        list_source_files(data_dir), workers=workers, pages_per_task=pages_per_task, cache=cache
+    ):
+        if result.error is not None:
+            logger.error(f"Failed to load '{result.file_path.name}': {result.error}")
+            continue
+        documents.extend(result.documents)
+        logger.info(f"Successfully loaded '{result.file_path.name}'")
+    return documents
@@ -0,0 +1,22 @@
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Hashable]], k: int = 60) -> List[Tuple[Hashable, float]]:
+    """Merge ranked result lists with reciprocal rank fusion.
+
+    Each item scores sum(1 / (k + rank)) over the lists it appears in (rank starting at 1), so
+    items ranked well by several retrievers rise to the top without having to calibrate their
+    raw scores against each other.
+
+    Args:
+        rankings: Lists of item ids, best first
+        k: Damping constant; larger values flatten the difference between top and lower ranks
+
+    Returns:
+        (id, fused score) pairs, best first
+    """
+    scores: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,204 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, List, Optional
+
+from src.chatbot.core.exceptions import IngestionCancelledError
+from src.chatbot.settings import settings
+
+
+class JobStatus(str, Enum):
+    """Lifecycle states of an ingestion job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class IngestionProgress:
+    """Thread-safe progress counters of a running ingestion, with cooperative cancellation.
+
+    The ingestion pipeline reports into this object from its worker thread; every report is
+    also a cancellation point, so a cancelled job stops at the next file or batch boundary.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()
+        self.files_total = 0
+        self.files_done = 0
+        self.chunks_embedded = 0
+        self.chunks_upserted = 0
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self) -> None:
+        """Raise IngestionCancelledError if cancellation was requested."""
+        if self._cancel_event.is_set():
+            raise IngestionCancelledError("Ingestion job was cancelled")
+
+    def set_files_total(self, count: int) -> None:
+        with self._lock:
+            self.files_total = count
+        self.check_cancelled()
+
+    def file_done(self) -> None:
+        with self._lock:
+            self.files_done += 1
+        self.check_cancelled()
+
+    def update(self, stage: str, count: int) -> None:
+        """Record `count` chunks that finished `stage` ("embedded" or "upserted")."""
+        with self._lock:
+            if stage == "embedded":
+                self.chunks_embedded += count
+            elif stage == "upserted":
+                self.chunks_upserted += count
+        self.check_cancelled()
+
+
+@dataclass
+class IngestionJob:
+    """A background ingestion run triggered by an upload."""
+
+    id: str
+    filename: Optional[str]
+    status: JobStatus = JobStatus.QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    progress: IngestionProgress = field(default_factory=IngestionProgress)
+    future: Optional[Future] = field(default=None, repr=False)
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    @property
+    def chunks_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.progress.chunks_upserted / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "filename": self.filename,
+            "status": self.status.value,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "files_total": self.progress.files_total,
+            "files_done": self.progress.files_done,
+            "chunks_embedded": self.progress.chunks_embedded,
+            "chunks_upserted": self.progress.chunks_upserted,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "chunks_per_second": round(self.chunks_per_second, 2),
+        }
+
+
+class IngestionJobManager:
+    """Runs ingestion jobs on a bounded thread pool, off the event loop."""
+
+    def __init__(
+        self,
+        run_ingestion: Callable[[IngestionProgress], None],
+        max_workers: Optional[int] = None,
+        max_history: Optional[int] = None,
+    ) -> None:
+        self.logger = logging.getLogger(__name__)
+        self._run_ingestion = run_ingestion
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.INGEST_MAX_WORKERS,
+            thread_name_prefix="ingestion",
+        )
+        self._max_history = max_history or settings.INGEST_JOB_HISTORY
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, filename: Optional[str] = None) -> IngestionJob:
+        """Queue a new ingestion job and return it immediately."""
+        job = IngestionJob(id=str(uuid.uuid4()), filename=filename)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[IngestionJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job. Returns False if the job is unknown or already finished."""
+        job = self.get(job_id)
+        if job is None or job.status not in (JobStatus.QUEUED, JobStatus.RUNNING):
+            return False
+
+        job.progress.cancel()
+        if job.future is not None and job.future.cancel():
+            # Never started: the worker will not pick it up
+            job.status = JobStatus.CANCELLED
+            job.finished_at = time.time()
+        return True
+
+    def shutdown(self) -> None:
+        for job in self.list():
+            job.progress.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: IngestionJob) -> None:
+        if job.progress.cancelled:
+            job.status = JobStatus.CANCELLED
+            job.finished_at = time.time()
+            return
+
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        self.logger.info(f"Ingestion job {job.id} started for '{job.filename}'")
+        try:
+            self._run_ingestion(job.progress)
+            job.status = JobStatus.COMPLETED
+        except IngestionCancelledError:
+            job.status = JobStatus.CANCELLED
+            self.logger.info(f"Ingestion job {job.id} cancelled")
+        except Exception as e:
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            self.logger.error(f"Ingestion job {job.id} failed: {e}")
+        finally:
+            job.finished_at = time.time()
+
+        self.logger.info(
+            f"Ingestion job {job.id} {job.status.value}: {job.progress.chunks_upserted} chunks "
+            f"in {job.elapsed:.2f}s ({job.chunks_per_second:.1f} chunks/sec)"
+        )
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond the history limit."""
+        finished = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.status not in (JobStatus.QUEUED, JobStatus.RUNNING)
+        ]
+        for job_id in finished[: max(0, len(self._jobs) - self._max_history)]:
+            del self._jobs[job_id]
@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    """Compute the SHA-256 digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    """Ingestion record of a single source file."""
+
+    content_hash: str
+    chunk_size: int
+    chunk_overlap: int
+    point_ids: List[str] = field(default_factory=list)
+
+    def matches(self, content_hash: str, chunk_size: int, chunk_overlap: int) -> bool:
+        """Whether the file was already ingested with this content and these chunking parameters."""
+        return (
+            self.content_hash == content_hash
+            and self.chunk_size == chunk_size
+            and self.chunk_overlap == chunk_overlap
+        )
+
+
+class IngestionManifest:
+    """Persistent record of which files have been ingested, and the points they produced."""
+
+    VERSION = 1
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._entries: Dict[str, ManifestEntry] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self._entries = {name: ManifestEntry(**entry) for name, entry in data.get("files", {}).items()}
+
+    @property
+    def files(self) -> List[str]:
+        return list(self._entries)
+
+    def get(self, name: str) -> Optional[ManifestEntry]:
+        return self._entries.get(name)
+
+    def update(self, name: str, entry: ManifestEntry) -> None:
+        self._entries[name] = entry
+
+    def remove(self, name: str) -> Optional[ManifestEntry]:
+        return self._entries.pop(name, None)
+
+    def save(self) -> None:
+        """Atomically write the manifest to disk."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": self.VERSION, "files": {name: asdict(entry) for name, entry in self._entries.items()}},
+                f,
+                indent=2,
+            )
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,238 @@
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Collection, Iterable, Iterator, List, Optional, Tuple
+
+from src.chatbot.modules.memory.long_term.vector_store import VectorStore
+from src.chatbot.modules.rag.ingestion_jobs import IngestionProgress
+from src.chatbot.settings import settings
+
+# A source file: its key and a lazy iterator over its (text, metadata) chunks
+FileSource = Tuple[str, Iterator[Tuple[str, dict]]]
+
+
+@dataclass
+class _ChunkBatch:
+    file_key: str
+    texts: List[str]
+    metadatas: List[dict]
+    embeddings: Any = None
+
+
+@dataclass
+class _FileDone:
+    file_key: str
+
+
+@dataclass
+class _FileFailed:
+    file_key: str
+    error: Exception
+
+
+_END = object()
+
+
+@dataclass
+class PipelineResult:
+    """Summary of a streaming ingestion run."""
+
+    files_done: int = 0
+    files_failed: int = 0
+    chunks_upserted: int = 0
+    elapsed: float = 0.0
+    failed_files: List[str] = field(default_factory=list)
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks_upserted / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class _Stopped(Exception):
+    """Raised inside a stage when another stage has failed."""
+
+
+class StreamingIngestionPipeline:
+    """Bounded-memory ingestion: parse/chunk -> embed -> upsert, each stage on its own thread.
+
+    Stages are connected by queues holding at most `max_in_flight` micro-batches, so memory stays
+    flat regardless of corpus size, and embedding overlaps with document parsing and vector store
+    I/O. Files flow through in order; `on_file_done(file_key, point_ids)` is called from the calling
+    thread once every chunk of a file has been upserted. Chunks are written to the document
+    collection unless another `collection` is given.
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        batch_size: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        progress: Optional[IngestionProgress] = None,
+        collection: Optional[str] = None,
+    ) -> None:
+        self.logger = logging.getLogger(__name__)
+        self.vector_store = vector_store
+        self.collection = collection or vector_store.document_collection
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        self.max_in_flight = max_in_flight or settings.INGEST_MAX_IN_FLIGHT
+        self.progress = progress
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+
+    def run(
+        self,
+        sources: Iterable[FileSource],
+        on_file_done: Callable[[str, List[str]], None],
+        on_file_failed: Optional[Callable[[str, Exception], None]] = None,
+        keep_ids: Optional[Callable[[str], Collection[str]]] = None,
+    ) -> PipelineResult:
+        """Run the pipeline over `sources` until every file is upserted or a stage fails.
+
+        A file whose chunks cannot be produced is reported through `on_file_failed` after the
+        points already written for it are deleted; the remaining files are still ingested.
+        Point ids are content-derived, so a new version of a file rewrites the points of its
+        unchanged chunks in place: `keep_ids(file_key)` returns the ids its previous version
+        still owns, which are kept when the file fails.
+        """
+        result = PipelineResult()
+        start = time.perf_counter()
+        self.vector_store.ensure_collection(self.collection)
+
+        chunk_queue: queue.Queue = queue.Queue(maxsize=self.max_in_flight)
+        embedded_queue: queue.Queue = queue.Queue(maxsize=self.max_in_flight)
+        workers = [
+            threading.Thread(target=self._guard, args=(self._parse_stage, sources, chunk_queue), daemon=True),
+            threading.Thread(target=self._guard, args=(self._embed_stage, chunk_queue, embedded_queue), daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+
+        try:
+            self._upsert_stage(embedded_queue, result, on_file_done, on_file_failed, keep_ids)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            self._errors.append(e)
+            self._stop.set()
+        finally:
+            for worker in workers:
+                worker.join()
+            result.elapsed = time.perf_counter() - start
+
+        if self._errors:
+            raise self._errors[0]
+        return result
+
+    def _guard(self, stage: Callable, *args) -> None:
+        try:
+            stage(*args)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            self._errors.append(e)
+            self._stop.set()
+
+    def _put(self, q: queue.Queue, item) -> None:
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q: queue.Queue):
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def _parse_stage(self, sources: Iterable[FileSource], out: queue.Queue) -> None:
+        for file_key, chunks in sources:
+            texts: List[str] = []
+            metadatas: List[dict] = []
+            try:
+                for text, metadata in chunks:
+                    texts.append(text)
+                    metadatas.append(metadata)
+                    if len(texts) >= self.batch_size:
+                        self._put(out, _ChunkBatch(file_key, texts, metadatas))
+                        texts, metadatas = [], []
+            except _Stopped:
+                raise
+            except Exception as e:
+                self._put(out, _FileFailed(file_key, e))
+                continue
+
+            if texts:
+                self._put(out, _ChunkBatch(file_key, texts, metadatas))
+            self._put(out, _FileDone(file_key))
+        self._put(out, _END)
+
+    def _embed_stage(self, inbox: queue.Queue, out: queue.Queue) -> None:
+        while True:
+            item = self._get(inbox)
+            if isinstance(item, _ChunkBatch):
+                item.embeddings = self.vector_store.embed_texts(item.texts, batch_size=self.batch_size)
+                if self.progress:
+                    self.progress.update("embedded", len(item.texts))
+            self._put(out, item)
+            if item is _END:
+                return
+
+    def _upsert_stage(
+        self,
+        inbox: queue.Queue,
+        result: PipelineResult,
+        on_file_done: Callable[[str, List[str]], None],
+        on_file_failed: Optional[Callable[[str, Exception], None]],
+        keep_ids: Optional[Callable[[str], Collection[str]]],
+    ) -> None:
+        file_ids: List[str] = []
+        file_key: Optional[str] = None
+        try:
+            while True:
+                item = self._get(inbox)
+                if item is _END:
+                    return
+
+                if isinstance(item, _ChunkBatch):
+                    file_key = item.file_key
+                    file_ids.extend(metadata["id"] for metadata in item.metadatas)
+                    result.chunks_upserted += self.vector_store.upsert_embeddings(
+                        item.texts,
+                        item.metadatas,
+                        item.embeddings,
+                        progress_callback=self.progress.update if self.progress else None,
+                        collection=self.collection,
+                    )
+                elif isinstance(item, _FileDone):
+                    on_file_done(item.file_key, list(dict.fromkeys(file_ids)))
+                    result.files_done += 1
+                    file_ids = []
+                elif isinstance(item, _FileFailed):
+                    self._discard(item.file_key, file_ids, keep_ids)
+                    self.logger.error(f"Failed to ingest '{item.file_key}': {item.error}")
+                    if on_file_failed:
+                        on_file_failed(item.file_key, item.error)
+                    result.files_failed += 1
+                    result.failed_files.append(item.file_key)
+                    file_ids = []
+        except BaseException:
+            # Do not leave a half-ingested file behind
+            if file_ids:
+                self._discard(file_key, file_ids, keep_ids)
+            raise
+
+    def _discard(
+        self, file_key: str, file_ids: List[str], keep_ids: Optional[Callable[[str], Collection[str]]]
+    ) -> None:
+        """Delete the points written for an unfinished file, except those its previous version owns."""
+        kept = set(keep_ids(file_key)) if keep_ids is not None else set()
+        self.vector_store.delete_points([i for i in file_ids if i not in kept], collection=self.collection)
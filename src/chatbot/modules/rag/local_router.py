@@ -0,0 +1,166 @@
+import asyncio
+import json
+import logging
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from src.chatbot.modules.memory.long_term.vector_store import VectorStore, get_vector_store
+from src.chatbot.settings import settings
+
+_LOG_LOCK = threading.Lock()
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def append_router_decision(log_path: Path, query: str, requires_rag: bool) -> None:
+    """Append a decision of the LLM router to the JSONL log the local router is trained from.
+
+    Blocking file I/O: call it through `asyncio.to_thread` from async code.
+    """
+    with _LOG_LOCK:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"query": query, "requires_rag": requires_rag}) + "\n")
+
+
+class CentroidRouter:
+    """Nearest-centroid classifier of `requires_rag` over normalized query embeddings.
+
+    The score of a query is its cosine similarity to the RAG centroid minus that to the
+    conversational centroid. Scores within `margin` of zero, or any query before both classes
+    have `min_examples` examples, are left undecided.
+    """
+
+    def __init__(self, margin: float, min_examples: int) -> None:
+        self.margin = margin
+        self.min_examples = min_examples
+        self._sums = {True: None, False: None}
+        self._counts = {True: 0, False: 0}
+        self._centroids = None
+
+    @property
+    def counts(self) -> dict:
+        return {"rag": self._counts[True], "conversation": self._counts[False]}
+
+    @property
+    def trained(self) -> bool:
+        return min(self._counts.values()) >= self.min_examples
+
+    def add(self, embeddings: np.ndarray, labels: Iterable[bool]) -> None:
+        """Add labelled examples; `embeddings` has one row per label."""
+        embeddings = _unit(np.atleast_2d(embeddings))
+        labels = np.fromiter((bool(label) for label in labels), dtype=bool, count=len(embeddings))
+        for label in (True, False):
+            rows = embeddings[labels == label]
+            if len(rows):
+                total = rows.sum(axis=0)
+                self._sums[label] = total if self._sums[label] is None else self._sums[label] + total
+                self._counts[label] += len(rows)
+        self._centroids = None
+
+    def score(self, embedding: np.ndarray) -> float:
+        """Positive when the query is closer to past RAG queries, negative when closer to conversation."""
+        centroids = self._centroids
+        if centroids is None:
+            centroids = self._centroids = _unit(np.stack([self._sums[True], self._sums[False]]))
+        similarities = centroids @ _unit(embedding)
+        return float(similarities[0] - similarities[1])
+
+    def decide(self, embedding: np.ndarray) -> Optional[bool]:
+        """`requires_rag` for the query, or None if the LLM router has to decide."""
+        if not self.trained:
+            return None
+        score = self.score(embedding)
+        if abs(score) < self.margin:
+            return None
+        return score > 0
+
+
+class LocalRAGRouter:
+    """Decides `requires_rag` locally from the query embedding, falling back to the LLM router.
+
+    Trained from the LLM router's own decisions: each one is appended to a JSONL log and added to
+    the classifier, and the log is replayed by `load`, which the server runs at startup (other
+    interfaces load it off the event loop on the first turn). Query embeddings come from the vector
+    store's caches, so a locally routed turn costs milliseconds and the embedding is reused by
+    retrieval afterwards.
+    """
+
+    def __init__(self, vector_store: VectorStore, log_path: Path, margin: float, min_examples: int) -> None:
+        self.logger = logging.getLogger(__name__)
+        self.vector_store = vector_store
+        self.log_path = Path(log_path)
+        self.classifier = CentroidRouter(margin, min_examples)
+        self.local_decisions = 0
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def load(self) -> None:
+        """Train the classifier from the logged decisions; blocking, and a no-op once loaded."""
+        with self._lock:
+            if self._loaded:
+                return
+            queries, labels = [], []
+            if self.log_path.exists():
+                with open(self.log_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            # A line cut short by a crash
+                            continue
+                        queries.append(entry["query"])
+                        labels.append(entry["requires_rag"])
+            if queries:
+                self.classifier.add(self.vector_store.embed_texts(queries), labels)
+            self._loaded = True
+            self.logger.info(f"Local RAG router loaded {len(queries)} logged decisions: {self.classifier.counts}")
+
+    async def adecide(self, query: str) -> Optional[bool]:
+        """`requires_rag` for the query, or None if the LLM router has to decide."""
+        if not self._loaded:
+            await asyncio.to_thread(self.load)
+        decision = self.classifier.decide(await self.vector_store.aembed_query(query))
+        # The counters are only updated on the event loop
+        if decision is None:
+            self.fallbacks += 1
+        else:
+            self.local_decisions += 1
+        return decision
+
+    async def arecord(self, query: str, requires_rag: bool) -> None:
+        """Log a decision of the LLM router and learn from it."""
+        self.classifier.add(await self.vector_store.aembed_query(query), [requires_rag])
+        await asyncio.to_thread(append_router_decision, self.log_path, query, requires_rag)
+
+    def stats(self) -> dict:
+        total = self.local_decisions + self.fallbacks
+        return {
+            "local_decisions": self.local_decisions,
+            "llm_fallbacks": self.fallbacks,
+            "local_rate": round(self.local_decisions / total, 4) if total else 0.0,
+            "trained": self.classifier.trained,
+            "examples": self.classifier.counts,
+        }
+
+
+@lru_cache
+def get_local_router() -> Optional[LocalRAGRouter]:
+    """Get the shared local RAG router, or None if it is disabled."""
+    if not settings.LOCAL_ROUTER_ENABLED:
+        return None
+    return LocalRAGRouter(
+        get_vector_store(),
+        Path(settings.ROUTER_LOG_PATH),
+        settings.LOCAL_ROUTER_MARGIN,
+        settings.LOCAL_ROUTER_MIN_EXAMPLES,
+    )
@@ -1,31 +1,150 @@
+import asyncio
 import logging
-from typing import List
+import time
+from functools import lru_cache
+from typing import List, Tuple
 
-from src.chatbot.modules.memory.long_term.vector_store import get_vector_store
+import numpy as np
+
+from src.chatbot.modules.memory.long_term.embedding_cache import normalize_text
+from src.chatbot.modules.memory.long_term.mmr import max_marginal_relevance
+from src.chatbot.modules.memory.long_term.vector_store import Memory, VectorStore, get_vector_store
+from src.chatbot.modules.rag.bm25 import get_bm25_index
+from src.chatbot.modules.rag.collection_version import get_collection_version
+from src.chatbot.modules.rag.context_packer import CONTEXT_SEPARATOR, pack_context
+from src.chatbot.modules.rag.fusion import reciprocal_rank_fusion
+from src.chatbot.modules.rag.retrieval_cache import get_retrieval_cache
 from src.chatbot.settings import settings
 
 
 class RAGManager:
-    """Manages the Retrieval-Augmented Generation process."""
+    """Manages the Retrieval-Augmented Generation process.
+
+    With hybrid search enabled, dense results are merged with BM25 keyword results using
+    reciprocal rank fusion, so exact-term queries (product codes, error strings) are found even
+    when their embeddings are not close to the query's. With RAG_MMR_LAMBDA set, the final
+    RAG_TOP_K chunks are picked from the fused candidates with max-marginal-relevance, so
+    near-duplicate chunks do not crowd out other evidence. The retrieved chunks are then packed
+    into passages within RAG_CONTEXT_TOKEN_BUDGET, with overlapping neighbours merged.
+
+    Results are cached per normalized query until ingestion bumps the collection version.
+    """
 
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.vector_store = get_vector_store()
+        self.bm25 = get_bm25_index()
+        self.cache = get_retrieval_cache()
+        self.collection_version = get_collection_version()
 
-    def get_relevant_documents(self, query: str) -> List[str]:
-        """Retrieve relevant document chunks from the vector store."""
-        document_filter = {"must": [{"key": "source", "match": {"value": "document"}}]}
+    def _cache_key(self, query: str) -> Tuple[str, str, int]:
+        # The embedding model and the BM25 tokenizer are both case-insensitive
+        return normalize_text(query).lower(), self.vector_store.document_collection, settings.RAG_TOP_K
+
+    def _candidates(self) -> int:
+        if self.bm25 is not None or VectorStore._use_mmr(settings.RAG_MMR_LAMBDA):
+            return max(settings.RAG_CANDIDATES, settings.RAG_TOP_K)
+        return settings.RAG_TOP_K
+
+    def _fuse(self, query: str, dense: List[Memory], keyword: list) -> List[Tuple[Memory, float]]:
+        """Merge dense and keyword results into one ranked candidate list of (chunk, relevance)."""
+        if self.bm25 is None:
+            return [(memory, memory.score) for memory in dense]
+
+        chunks = {memory.id or memory.text: memory for memory in dense}
+        for point_id, score in keyword:
+            if point_id not in chunks:
+                document = self.bm25.get(point_id)
+                if document is not None:
+                    chunks[point_id] = Memory(text=document[0], metadata=document[1], score=score)
+
+        fused = reciprocal_rank_fusion(
+            [[memory.id or memory.text for memory in dense], [point_id for point_id, _ in keyword]],
+            k=settings.RRF_K,
+        )
+        self.logger.debug(f"Hybrid search for '{query}': {len(dense)} dense, {len(keyword)} keyword candidates")
+        return [(chunks[key], score) for key, score in fused if key in chunks]
+
+    def _select(self, candidates: List[Tuple[Memory, float]]) -> List[Memory]:
+        """Pick the final RAG_TOP_K chunks from the ranked candidates, diversified with MMR if enabled."""
+        chunks = [memory for memory, _ in candidates]
+        if not VectorStore._use_mmr(settings.RAG_MMR_LAMBDA) or len(chunks) <= settings.RAG_TOP_K:
+            return chunks[: settings.RAG_TOP_K]
+        # Chunk embeddings are cache hits from ingestion; BM25-only chunks have no vector in the results
+        vectors = self.vector_store.embed_texts([memory.text for memory in chunks])
+        # Scale the fused scores so the best candidate has relevance 1, like a cosine similarity
+        relevance = np.array([score for _, score in candidates], dtype=np.float32)
+        relevance /= max(float(relevance.max()), 1e-12)
+        selected = max_marginal_relevance(None, vectors, settings.RAG_TOP_K, settings.RAG_MMR_LAMBDA, relevance)
+        return [chunks[i] for i in selected]
+
+    def _pack(self, chunks: List[Memory]) -> List[str]:
+        documents = pack_context(chunks, settings.RAG_CONTEXT_TOKEN_BUDGET)
+        self.logger.info(
+            f"Retrieved {len(chunks)} document chunks for RAG, packed into {len(documents)} passages "
+            f"({sum(len(document) for document in documents)} of {sum(len(chunk.text) for chunk in chunks)} chars)."
+        )
+        return documents
+
+    def _retrieve(self, query: str) -> List[str]:
         results = self.vector_store.search_memories(
-            query, k=settings.RAG_TOP_K, filter=document_filter
+            query, k=self._candidates(), collection=self.vector_store.document_collection
+        )
+        keyword = self.bm25.search(query, self._candidates()) if self.bm25 is not None else []
+        return self._pack(self._select(self._fuse(query, results, keyword)))
+
+    async def _aretrieve(self, query: str) -> List[str]:
+        dense = self.vector_store.asearch_memories(
+            query, k=self._candidates(), collection=self.vector_store.document_collection
         )
-        self.logger.info(f"Retrieved {len(results)} document chunks for RAG.")
-        return [memory.text for memory in results]
+        if self.bm25 is not None:
+            results, keyword = await asyncio.gather(
+                dense, asyncio.to_thread(self.bm25.search, query, self._candidates())
+            )
+        else:
+            results, keyword = await dense, []
+        chunks = await asyncio.to_thread(self._select, self._fuse(query, results, keyword))
+        return self._pack(chunks)
+
+    def get_relevant_documents(self, query: str) -> List[str]:
+        """Retrieve relevant document chunks and pack them into prompt-ready passages."""
+        if self.cache is None:
+            return self._retrieve(query)
+        # Read the version first, so results racing with an ingestion are cached under the old one
+        version, key = self.collection_version.current(), self._cache_key(query)
+        documents = self.cache.get(key, version)
+        if documents is not None:
+            self.logger.info(f"Retrieval cache hit for '{query}'.")
+            return documents
+        start = time.perf_counter()
+        documents = self._retrieve(query)
+        self.cache.put(key, version, documents, time.perf_counter() - start)
+        return documents
+
+    async def aget_relevant_documents(self, query: str) -> List[str]:
+        """Async variant of `get_relevant_documents` for use inside the graph."""
+        if self.cache is None:
+            return await self._aretrieve(query)
+        version, key = self.collection_version.current(), self._cache_key(query)
+        documents = self.cache.get(key, version)
+        if documents is not None:
+            self.logger.info(f"Retrieval cache hit for '{query}'.")
+            return documents
+        start = time.perf_counter()
+        documents = await self._aretrieve(query)
+        self.cache.put(key, version, documents, time.perf_counter() - start)
+        return documents
+
+    def cache_stats(self) -> dict:
+        """Hit rate and saved retrieval time of the retrieval cache."""
+        return self.cache.stats() if self.cache is not None else {"enabled": False}
 
     def format_context(self, documents: List[str]) -> str:
-        """Format the document chunks into a single context string."""
-        return "\n\n---\n\n".join(documents)
+        """Format the document passages into a single context string."""
+        return CONTEXT_SEPARATOR.join(documents)
 
 
+@lru_cache
 def get_rag_manager() -> RAGManager:
-    """Get a RAGManager instance."""
+    """Get the shared RAGManager instance."""
     return RAGManager()
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Hashable, List, Optional
+
+from src.chatbot.settings import settings
+
+
+class RetrievalCache:
+    """Bounded, thread-safe LRU cache of retrieval results with a time-to-live.
+
+    Entries are tagged with the document collection version they were computed at. A lookup with
+    a newer version drops the whole cache, so results never outlive the documents they came from.
+    Each entry remembers how long its retrieval took, which is counted as saved time on every hit.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.saved_seconds = 0.0
+        self._version = None
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_version(self, version: int) -> None:
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key: Hashable, version: int) -> Optional[List[str]]:
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, documents, elapsed = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    self.saved_seconds += elapsed
+                    return list(documents)
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, version: int, documents: List[str], elapsed: float) -> None:
+        """Store `documents` retrieved at collection `version` in `elapsed` seconds."""
+        with self._lock:
+            if version != self._version:
+                # Computed against an older collection, or the first entry after a bump
+                if self._version is not None and version < self._version:
+                    return
+                self._check_version(version)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, tuple(documents), elapsed)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "avg_saved_ms": round(1000 * self.saved_seconds / self.hits, 2) if self.hits else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "collection_version": self._version,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+        }
+
+
+@lru_cache
+def get_retrieval_cache() -> Optional[RetrievalCache]:
+    """Get the shared retrieval result cache, or None if it is disabled."""
+    if not settings.RETRIEVAL_CACHE_ENABLED:
+        return None
+    return RetrievalCache(settings.RETRIEVAL_CACHE_SIZE, settings.RETRIEVAL_CACHE_TTL_SECONDS)
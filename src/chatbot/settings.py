@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
+from typing import Literal
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=Path(__file__).parent.parent.parent/".env", extra="ignore", env_file_encoding="utf-8")
@@ -13,6 +14,24 @@ class Settings(BaseSettings):
     QDRANT_URL: str
     QDRANT_PORT: str = "6333"
     # QDRANT_HOST: str | None = None
+    VECTOR_BACKEND: str = "qdrant"  # "qdrant" or "local"
+    LOCAL_INDEX_PATH: str = "vector_index"
+    LOCAL_INDEX_TYPE: str = "flat"  # "flat" (exact) or "hnsw"
+    HNSW_M: int = 16  # Graph defaults for collections created without their own settings
+    HNSW_EF_CONSTRUCTION: int = 100
+    HNSW_EF_SEARCH: int = 64
+    # Quantization of the document collection: "none", "int8" or "binary"; applied when it is created
+    VECTOR_QUANTIZATION: str = "none"
+    QUANTIZATION_OVERSAMPLING: float = 4.0
+    MEMORY_COLLECTION_NAME: str = "long_term_memory"
+    DOCUMENT_COLLECTION_NAME: str = "documents"
+    # Per-collection index and storage settings, applied when the collection is created
+    DOCUMENT_HNSW_M: int = 16
+    DOCUMENT_HNSW_EF_CONSTRUCTION: int = 100
+    DOCUMENT_VECTORS_ON_DISK: bool = False
+    MEMORY_HNSW_M: int = 16
+    MEMORY_HNSW_EF_CONSTRUCTION: int = 100
+    MEMORY_VECTORS_ON_DISK: bool = False
 
 
     TEXT_MODEL_NAME: str = "gemini-2.0-flash"
@@ -24,11 +43,67 @@ class Settings(BaseSettings):
 
     MEMORY_TOP_K: int = 3
     RAG_TOP_K: int = 3
+    RAG_HYBRID_SEARCH: bool = True
+    RAG_CANDIDATES: int = 20  # Candidates per retriever before rank fusion
+    RRF_K: int = 60
+    BM25_INDEX_PATH: str = "bm25_index.jsonl"
+    # Max-marginal-relevance reranking: None or 1.0 disables it, lower values favour diverse results.
+    # For documents it picks the final RAG_TOP_K chunks from the fused RAG_CANDIDATES.
+    RAG_MMR_LAMBDA: float | None = None
+    MEMORY_MMR_LAMBDA: float | None = None
+    MMR_FETCH_K: int = 20  # Candidates fetched with their vectors before MMR reranking
+    # Reply on RAG turns by "regenerate"-ing the reply in conversation_node from the best candidate
+    # answer, or, when the candidate is sufficient, "reuse" it as is or "stylize" it in the
+    # character's voice with a short LLM pass
+    RAG_ANSWER_MODE: Literal["regenerate", "reuse", "stylize"] = "regenerate"
+    # Limits of the answer-evaluate-rewrite loop; the best candidate so far is kept when one is hit
+    RAG_MAX_ATTEMPTS: int = 3
+    RAG_LATENCY_BUDGET_SECONDS: float = 20.0
+    RAG_CONTEXT_TOKEN_BUDGET: int = 1500  # Estimated prompt tokens for retrieved passages; 0 disables the limit
+    RETRIEVAL_CACHE_ENABLED: bool = True
+    RETRIEVAL_CACHE_SIZE: int = 1024
+    RETRIEVAL_CACHE_TTL_SECONDS: float = 3600
+    COLLECTION_VERSION_PATH: str = "collection_version"  # Bumped by ingestion to invalidate retrieval caches
     ROUTER_MESSAGES_TO_ANALYZE: int = 3
+    # Run memory injection and the RAG routing check side by side at the start of each turn
+    PARALLEL_PREPROCESSING: bool = True
+    # Start document retrieval alongside the RAG router call; the result is dropped if RAG is not needed
+    SPECULATIVE_RETRIEVAL: bool = True
+    # Embedding-based RAG router trained from logged LLM router decisions; the LLM decides within the margin.
+    # Off until LOCAL_ROUTER_MARGIN is calibrated on the logged decisions with src.benchmarks.eval_local_router
+    LOCAL_ROUTER_ENABLED: bool = False
+    # Log LLM router decisions while the local router is off, to calibrate it. Opt-in: the log holds
+    # user messages in plaintext
+    ROUTER_LOG_ENABLED: bool = False
+    ROUTER_LOG_PATH: str = "router_decisions.jsonl"
+    LOCAL_ROUTER_MARGIN: float = 0.05
+    LOCAL_ROUTER_MIN_EXAMPLES: int = 20  # Logged decisions per class before routing locally
     TOTAL_MESSAGES_SUMMARY_TRIGGER: int = 20
     TOTAL_MESSAGES_AFTER_SUMMARY: int = 5
 
     SHORT_TERM_MEMORY_DB_PATH: str = "memory.db"
 
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = "embedding_cache.db"
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 500_000
+    QUERY_EMBEDDING_CACHE_SIZE: int = 2048
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: float = 3600
+    ENCODER_MICRO_BATCHING: bool = True
+    ENCODER_MAX_BATCH_SIZE: int = 32
+    ENCODER_MAX_WAIT_MS: float = 5.0
+    UPSERT_BATCH_SIZE: int = 256
+
+    CHUNK_SIZE: int = 1000
+    CHUNK_OVERLAP: int = 200
+    INGEST_MANIFEST_PATH: str = "ingest_manifest.json"
+    DOCUMENT_CACHE_ENABLED: bool = True
+    DOCUMENT_CACHE_DIR: str = ".ingest_cache"
+    INGEST_MAX_IN_FLIGHT: int = 4
+    INGEST_LOAD_WORKERS: int = 1
+    PDF_PAGES_PER_TASK: int = 32
+    INGEST_MAX_WORKERS: int = 1
+    INGEST_JOB_HISTORY: int = 100
+
 
 settings = Settings()
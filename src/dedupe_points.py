@@ -0,0 +1,154 @@
+"""Re-key stored points to their content-derived ids and drop duplicate copies.
+
+Points used to get a random id on every write, so re-ingesting a document or storing the same
+memory twice added copies instead of overwriting. This recomputes the deterministic id of every
+point from its payload (text, document name and chunk offset), writes each distinct content once
+under that id and deletes the legacy ids in batches. The ingestion manifest and the BM25 index
+are remapped to the new ids. Points already stored under their content id are left alone, so the
+script can be re-run after an interruption.
+
+To run this script, execute `python src/dedupe_points.py` from the project root directory.
+"""
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.chatbot.modules.memory.long_term.backends import VectorRecord
+from src.chatbot.modules.memory.long_term.vector_store import content_point_id, get_vector_store
+from src.chatbot.modules.rag.bm25 import get_bm25_index
+from src.chatbot.modules.rag.collection_version import get_collection_version
+from src.chatbot.modules.rag.ingestion_manifest import IngestionManifest
+from src.chatbot.settings import settings
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def expected_id(collection: str, payload: dict) -> str:
+    """The content-derived id of a point with this payload."""
+    return content_point_id(
+        collection,
+        payload.get("text", ""),
+        payload.get("document_name", ""),
+        payload.get("start_index", -1),
+    )
+
+
+def dedupe_collection(collection: str, batch_size: int, dry_run: bool) -> Dict[str, str]:
+    """Re-key the points of one collection.
+
+    Args:
+        collection: Name of the collection
+        batch_size: Points read, written and deleted per round trip
+        dry_run: Only compute the remapping
+
+    Returns:
+        Mapping of every legacy id to its content-derived id
+    """
+    backend = get_vector_store().backend
+    if not backend.collection_exists(collection):
+        logging.info(f"Collection '{collection}' does not exist, skipping.")
+        return {}
+
+    remap: Dict[str, str] = {}
+    written = set()
+    offset = None
+    while True:
+        # Legacy points are only deleted after the scan, so the scroll offsets stay valid
+        records, offset = backend.scroll(
+            collection, None, limit=batch_size, offset=offset, with_vectors=not dry_run
+        )
+        upserts: List[VectorRecord] = []
+        for record in records:
+            new_id = expected_id(collection, record.payload)
+            if str(record.id) == new_id:
+                written.add(new_id)
+                continue
+            remap[str(record.id)] = new_id
+            if new_id not in written:
+                written.add(new_id)
+                upserts.append(VectorRecord(id=new_id, vector=record.vector, payload={**record.payload, "id": new_id}))
+        if upserts and not dry_run:
+            backend.upsert(collection, upserts)
+        if offset is None:
+            break
+
+    logging.info(
+        f"'{collection}': {len(remap)} legacy points, {len(set(remap.values()))} distinct contents"
+        f"{' would be' if dry_run else ''} re-keyed"
+    )
+    if not dry_run:
+        legacy_ids = list(remap)
+        for start in range(0, len(legacy_ids), batch_size):
+            backend.delete(collection, legacy_ids[start : start + batch_size])
+    return remap
+
+
+def remap_manifest(remap: Dict[str, str]) -> int:
+    """Point the ingestion manifest at the new ids; returns the number of files changed."""
+    manifest = IngestionManifest(Path(settings.INGEST_MANIFEST_PATH))
+    changed = 0
+    for name in manifest.files:
+        entry = manifest.get(name)
+        point_ids = list(dict.fromkeys(remap.get(point_id, point_id) for point_id in entry.point_ids))
+        if point_ids != entry.point_ids:
+            entry.point_ids = point_ids
+            manifest.update(name, entry)
+            changed += 1
+    if changed:
+        manifest.save()
+    return changed
+
+
+def remap_bm25(remap: Dict[str, str]) -> int:
+    """Re-key the BM25 index entries; returns the number of entries moved."""
+    bm25 = get_bm25_index()
+    if bm25 is None:
+        return 0
+    moved = {}
+    for old_id, new_id in remap.items():
+        document = bm25.get(old_id)
+        if document is not None and new_id not in moved:
+            text, metadata = document
+            moved[new_id] = (new_id, text, {**metadata, "id": new_id})
+    bm25.remove([old_id for old_id in remap if old_id in bm25])
+    bm25.add_many([document for new_id, document in moved.items() if new_id not in bm25])
+    return len(moved)
+
+
+def dedupe(batch_size: int = 256, dry_run: bool = False) -> int:
+    """Re-key the memory and document collections.
+
+    Args:
+        batch_size: Points per round trip
+        dry_run: Only count the points that would be re-keyed
+
+    Returns:
+        The number of legacy points re-keyed (or that would be)
+    """
+    vector_store = get_vector_store()
+    remap: Dict[str, str] = {}
+    for collection in (vector_store.memory_collection, vector_store.document_collection):
+        remap.update(dedupe_collection(collection, batch_size, dry_run))
+
+    if remap and not dry_run:
+        files = remap_manifest(remap)
+        entries = remap_bm25(remap)
+        # Cached retrievals may still name the legacy points
+        get_collection_version().bump()
+        logging.info(f"Remapped {files} manifest files and {entries} BM25 entries.")
+    logging.info(f"Dedupe complete: {len(remap)} legacy points{' would be' if dry_run else ''} re-keyed.")
+    return len(remap)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-key stored points to content-derived ids.")
+    parser.add_argument("--batch-size", type=int, default=256, help="Points per batch.")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the points that would be re-keyed.")
+    args = parser.parse_args()
+    dedupe(batch_size=args.batch_size, dry_run=args.dry_run)
@@ -1,18 +1,31 @@
+import argparse
 import asyncio
 import logging
 import os
 import sys
+import threading
+import time
 # Add the project root directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-import uuid
 from pathlib import Path
-from typing import List
+from typing import Collection, Dict, Iterator, List, Optional, Tuple
 
-from src.chatbot.modules.memory.long_term.vector_store import get_vector_store
-from langchain_community.document_loaders import (
-    PyPDFLoader,
-    UnstructuredMarkdownLoader,
+from src.chatbot.modules.memory.long_term.vector_store import content_point_id, get_vector_store
+from src.chatbot.modules.rag.bm25 import get_bm25_index
+from src.chatbot.modules.rag.collection_version import get_collection_version
+from src.chatbot.modules.rag.ingestion_jobs import IngestionProgress
+from src.chatbot.modules.rag.ingestion_manifest import IngestionManifest, ManifestEntry, file_sha256
+from src.chatbot.modules.rag.ingestion_pipeline import StreamingIngestionPipeline
+from src.chatbot.settings import settings
+from src.chatbot.modules.rag.document_cache import DocumentCache, get_document_cache
+from src.chatbot.modules.rag.document_loader import (
+    FILE_LOADERS,
+    LoadResult,
+    iter_load_results,
+    list_source_files,
+    load_file,
+    loader_name,
 )
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -23,73 +36,397 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 # Define the path to the data directory
 DATA_DIR = Path(__file__).parent/"chatbot/data"
 
-# Supported file loaders
-FILE_LOADERS = {
-    ".pdf": PyPDFLoader,
-    ".md": UnstructuredMarkdownLoader,
-}
+# Serializes ingestion runs, which share the manifest
+_INGEST_LOCK = threading.Lock()
 
 
-def load_documents(data_dir: Path) -> List[Document]:
-    """Load all supported documents from the data directory."""
-    documents = []
-    for file_path in data_dir.iterdir():
-        if file_path.suffix in FILE_LOADERS:
-            loader_class = FILE_LOADERS[file_path.suffix]
-            loader = loader_class(str(file_path))
-            try:
-                documents.extend(loader.load())
-                logging.info(f"Successfully loaded '{file_path.name}'")
-            except Exception as e:
-                logging.error(f"Failed to load '{file_path.name}': {e}")
-    return documents
+def _get_text_splitter() -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
+        chunk_size=settings.CHUNK_SIZE,
+        chunk_overlap=settings.CHUNK_OVERLAP,
+        add_start_index=True,
+    )
 
 
 def chunk_documents(documents: List[Document]) -> List[Document]:
     """Split documents into smaller chunks."""
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        add_start_index=True,
-    )
-    return text_splitter.split_documents(documents)
+    return _get_text_splitter().split_documents(documents)
+
+
+def iter_file_chunks(
+    file_path: Path, content_hash: Optional[str] = None, cache: Optional[DocumentCache] = None
+) -> Iterator[Tuple[str, dict]]:
+    """Lazily load a document page by page and yield its chunks with their payload metadata.
+
+    With a cache, previously computed chunks (same content and splitter settings) are replayed
+    without parsing, and previously extracted pages are re-chunked without parsing.
+    """
+    if cache is None or content_hash is None:
+        loader = FILE_LOADERS[file_path.suffix](str(file_path))
+        text_splitter = _get_text_splitter()
+        for page in loader.lazy_load():
+            for chunk in text_splitter.split_documents([page]):
+                yield chunk.page_content, _chunk_metadata(chunk)
+        return
+
+    loader = loader_name(file_path)
+    chunks = cache.get_chunks(file_path, content_hash, loader, settings.CHUNK_SIZE, settings.CHUNK_OVERLAP)
+    if chunks is not None:
+        for chunk in chunks:
+            yield chunk.page_content, _chunk_metadata(chunk)
+        return
+
+    cached_pages = cache.get_pages(file_path, content_hash, loader)
+    if cached_pages is None:
+        pages = FILE_LOADERS[file_path.suffix](str(file_path)).lazy_load()
+    else:
+        pages = cached_pages
+
+    text_splitter = _get_text_splitter()
+    seen_pages, chunks = [], []
+    for page in pages:
+        seen_pages.append(page)
+        for chunk in text_splitter.split_documents([page]):
+            chunks.append(chunk)
+            yield chunk.page_content, _chunk_metadata(chunk)
+
+    # Only reached once the whole file was chunked, so partial files are never cached
+    if cached_pages is None:
+        cache.put_pages(content_hash, loader, seen_pages)
+    cache.put_chunks(content_hash, loader, settings.CHUNK_SIZE, settings.CHUNK_OVERLAP, chunks)
 
 
-def store_chunks(chunks: List[Document]):
-    """Store document chunks in the vector store."""
+def iter_result_chunks(
+    result: LoadResult, content_hash: Optional[str] = None, cache: Optional[DocumentCache] = None
+) -> Iterator[Tuple[str, dict]]:
+    """Yield the chunks of an already-parsed file, or raise its parse error."""
+    if result.error is not None:
+        raise RuntimeError(result.error)
+
+    chunks = None
+    if cache is not None and content_hash is not None:
+        loader = result.loader
+        chunks = cache.get_chunks(
+            result.file_path, content_hash, loader, settings.CHUNK_SIZE, settings.CHUNK_OVERLAP
+        )
+        if chunks is None:
+            chunks = chunk_documents(result.documents)
+            cache.put_chunks(content_hash, loader, settings.CHUNK_SIZE, settings.CHUNK_OVERLAP, chunks)
+    if chunks is None:
+        chunks = chunk_documents(result.documents)
+
+    for chunk in chunks:
+        yield chunk.page_content, _chunk_metadata(chunk)
+
+
+def _chunk_metadata(chunk: Document) -> dict:
+    """Build the vector store payload metadata for a document chunk.
+
+    The id is derived from the document, offset and text, so re-ingesting a chunk overwrites it.
+    """
+    document_name = chunk.metadata.get("source", "Unknown")
+    start_index = chunk.metadata.get("start_index", -1)
+    return {
+        "id": content_point_id(settings.DOCUMENT_COLLECTION_NAME, chunk.page_content, document_name, start_index),
+        "source": "document",
+        "document_name": document_name,
+        "start_index": start_index,
+    }
+
+
+def store_chunks(
+    chunks: List[Document],
+    bulk: bool = True,
+    deduplicate: bool = True,
+    progress: Optional[IngestionProgress] = None,
+    keep_ids: Collection[str] = (),
+) -> List[str]:
+    """Store document chunks in the vector store.
+
+    If storing fails or is cancelled part-way, the chunks already written are deleted again,
+    except `keep_ids`.
+
+    Args:
+        chunks: The document chunks to store
+        bulk: Use the batched `store_many` path instead of one `store_memory` call per chunk
+        deduplicate: Merge chunks into similar existing points instead of adding new ones
+        progress: Optional progress tracker of the running ingestion job
+        keep_ids: Ids owned by the previous version of the document; unchanged chunks are
+            rewritten in place under the same id and must survive a failure
+
+    Returns:
+        The ids of the stored points, one per chunk
+    """
     vector_store = get_vector_store()
     logging.info(f"Storing {len(chunks)} document chunks...")
 
-    for chunk in chunks:
-        metadata = {
-            "id": str(uuid.uuid4()),
-            "source": "document",
-            "document_name": chunk.metadata.get("source", "Unknown"),
-            "start_index": chunk.metadata.get("start_index", -1),
-        }
-        vector_store.store_memory(text=chunk.page_content, metadata=metadata)
-        logging.debug(f"Stored chunk from '{metadata['document_name']}'")
+    metadatas = [_chunk_metadata(chunk) for chunk in chunks]
+    start = time.perf_counter()
+    try:
+        if bulk:
+            result = vector_store.store_many(
+                texts=[chunk.page_content for chunk in chunks],
+                metadatas=metadatas,
+                deduplicate=deduplicate,
+                progress_callback=progress.update if progress else None,
+                collection=vector_store.document_collection,
+            )
+            stored = result.stored
+            if result.skipped:
+                logging.info(f"Skipped {result.skipped} duplicate chunks.")
+        else:
+            for chunk, metadata in zip(chunks, metadatas):
+                vector_store.store_memory(
+                    text=chunk.page_content,
+                    metadata=metadata,
+                    collection=vector_store.document_collection,
+                    deduplicate=deduplicate,
+                )
+                logging.debug(f"Stored chunk from '{metadata['document_name']}'")
+                if progress:
+                    progress.update("embedded", 1)
+                    progress.update("upserted", 1)
+            stored = len(chunks)
+    except BaseException:
+        if not deduplicate:
+            kept = set(keep_ids)
+            vector_store.delete_points(
+                [metadata["id"] for metadata in metadatas if metadata["id"] not in kept],
+                collection=vector_store.document_collection,
+            )
+        raise
+
+    elapsed = time.perf_counter() - start
+    rate = stored / elapsed if elapsed > 0 else 0.0
+    logging.info(
+        f"Document chunks stored successfully: {stored} chunks in {elapsed:.2f}s "
+        f"({rate:.1f} chunks/sec, {'bulk' if bulk else 'per-chunk'} path)."
+    )
+    return [metadata["id"] for metadata in metadatas]
 
-    logging.info("Document chunks stored successfully.")
 
+def ingest(
+    data_dir: Path,
+    bulk: bool = True,
+    force: bool = False,
+    progress: Optional[IngestionProgress] = None,
+    max_in_flight: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> None:
+    """Incrementally ingest the data directory.
 
-async def main():
+    Only files that are new, or whose content or chunking parameters changed since the last run
+    (according to the ingestion manifest) are loaded and embedded. The chunks previously stored
+    for changed or removed files are deleted from the vector store. The BM25 keyword index used
+    by hybrid search is kept in sync with the vector store; files missing from it are re-ingested.
+    Every stored or removed file bumps the collection version, invalidating cached retrievals.
+
+    Args:
+        data_dir: Directory containing the source documents
+        bulk: Use the streaming batched pipeline instead of one `store_memory` call per chunk
+        force: Re-ingest every file regardless of the manifest
+        progress: Optional progress tracker; cancelling it stops the run at the next batch
+        max_in_flight: Micro-batches buffered between pipeline stages (defaults to settings.INGEST_MAX_IN_FLIGHT)
+        workers: Parser processes (defaults to settings.INGEST_LOAD_WORKERS, 1 = parse in-process page by page)
+    """
+    with _INGEST_LOCK:
+        _ingest(data_dir, bulk, force, progress, max_in_flight, workers)
+
+
+def _ingest(
+    data_dir: Path,
+    bulk: bool,
+    force: bool,
+    progress: Optional[IngestionProgress],
+    max_in_flight: Optional[int],
+    workers: Optional[int],
+) -> None:
+    vector_store = get_vector_store()
+    bm25 = get_bm25_index()
+    collection_version = get_collection_version()
+    manifest = IngestionManifest(Path(settings.INGEST_MANIFEST_PATH))
+    source_files = {file_path.name: file_path for file_path in list_source_files(data_dir)}
+    if progress:
+        progress.set_files_total(len(source_files))
+
+    for name in manifest.files:
+        if name not in source_files:
+            entry = manifest.remove(name)
+            vector_store.delete_points(entry.point_ids, collection=vector_store.document_collection)
+            if bm25 is not None:
+                bm25.remove(entry.point_ids)
+            manifest.save()
+            collection_version.bump()
+            logging.info(f"Removed {len(entry.point_ids)} chunks of deleted file '{name}'")
+
+    content_hashes = {}
+    for name, file_path in source_files.items():
+        content_hash = file_sha256(file_path)
+        previous = manifest.get(name)
+        if (
+            not force
+            and previous is not None
+            and previous.matches(content_hash, settings.CHUNK_SIZE, settings.CHUNK_OVERLAP)
+            and (bm25 is None or bm25.contains_all(previous.point_ids))
+        ):
+            logging.debug(f"Skipping unchanged file '{name}'")
+            if progress:
+                progress.file_done()
+            continue
+        content_hashes[name] = content_hash
+
+    # Chunks of the files in flight, added to the keyword index once the file is fully stored
+    keyword_chunks: Dict[str, List[Tuple[str, str, dict]]] = {}
+
+    def remember_chunks(name: str, chunks: Iterator[Tuple[str, dict]]) -> Iterator[Tuple[str, dict]]:
+        pending = keyword_chunks.setdefault(name, [])
+        for text, metadata in chunks:
+            pending.append((metadata["id"], text, metadata))
+            yield text, metadata
+
+    def previous_ids(name: str) -> List[str]:
+        previous = manifest.get(name)
+        return previous.point_ids if previous is not None else []
+
+    def on_file_done(name: str, point_ids: List[str]) -> None:
+        # Unchanged chunks were rewritten under the same content-derived ids; drop only the rest
+        current = set(point_ids)
+        stale_ids = [point_id for point_id in previous_ids(name) if point_id not in current]
+        if stale_ids:
+            vector_store.delete_points(stale_ids, collection=vector_store.document_collection)
+            logging.info(f"Removed {len(stale_ids)} stale chunks of '{name}'")
+        if bm25 is not None:
+            bm25.remove(stale_ids)
+            bm25.add_many(keyword_chunks.pop(name, []))
+        manifest.update(
+            name,
+            ManifestEntry(
+                content_hash=content_hashes[name],
+                chunk_size=settings.CHUNK_SIZE,
+                chunk_overlap=settings.CHUNK_OVERLAP,
+                point_ids=point_ids,
+            ),
+        )
+        manifest.save()
+        collection_version.bump()
+        logging.info(f"Ingested '{name}' ({len(point_ids)} chunks)")
+        if progress:
+            progress.file_done()
+
+    def on_file_failed(name: str, error: Exception) -> None:
+        keyword_chunks.pop(name, None)
+        logging.error(f"Failed to load '{name}': {error}")
+        if progress:
+            progress.file_done()
+
+    cache = get_document_cache()
+    if bulk:
+        workers = workers or settings.INGEST_LOAD_WORKERS
+        if workers > 1:
+            sources = (
+                (
+                    result.file_path.name,
+                    remember_chunks(
+                        result.file_path.name,
+                        iter_result_chunks(result, content_hashes[result.file_path.name], cache),
+                    ),
+                )
+                for result in iter_load_results(
+                    [source_files[name] for name in content_hashes], workers=workers, cache=cache
+                )
+            )
+        else:
+            sources = (
+                (name, remember_chunks(name, iter_file_chunks(source_files[name], content_hashes[name], cache)))
+                for name in content_hashes
+            )
+
+        pipeline = StreamingIngestionPipeline(vector_store, max_in_flight=max_in_flight, progress=progress)
+        result = pipeline.run(
+            sources,
+            on_file_done=on_file_done,
+            on_file_failed=on_file_failed,
+            keep_ids=previous_ids,
+        )
+        logging.info(
+            f"Streamed {result.chunks_upserted} chunks in {result.elapsed:.2f}s "
+            f"({result.chunks_per_second:.1f} chunks/sec)."
+        )
+    else:
+        for name in content_hashes:
+            try:
+                documents = load_file(source_files[name])
+            except Exception as e:
+                on_file_failed(name, e)
+                continue
+            chunks = chunk_documents(documents)
+            # Manifest-tracked chunks must keep their own ids so they can be replaced later
+            point_ids = store_chunks(
+                chunks, bulk=False, deduplicate=False, progress=progress, keep_ids=previous_ids(name)
+            )
+            keyword_chunks[name] = [
+                (point_id, chunk.page_content, {**_chunk_metadata(chunk), "id": point_id})
+                for point_id, chunk in zip(point_ids, chunks)
+            ]
+            on_file_done(name, point_ids)
+
+    if vector_store.embedding_cache is not None:
+        logging.info(f"Embedding cache: {vector_store.embedding_cache.stats()}")
+    if not source_files:
+        logging.warning("No documents found to ingest.")
+    logging.info(
+        f"Processed {len(content_hashes)} new or changed files, "
+        f"skipped {len(source_files) - len(content_hashes)} unchanged files."
+    )
+
+
+async def main(
+    bulk: bool = True,
+    force: bool = False,
+    max_in_flight: Optional[int] = None,
+    workers: Optional[int] = None,
+):
     """Main function to run the document ingestion pipeline."""
     if not DATA_DIR.exists():
         logging.error(f"Data directory not found: {DATA_DIR}")
         return
 
     logging.info("Starting document ingestion...")
-    documents = load_documents(DATA_DIR)
-    if not documents:
-        logging.warning("No documents found to ingest.")
-        return
-
-    chunks = chunk_documents(documents)
-    store_chunks(chunks)
+    ingest(DATA_DIR, bulk=bulk, force=force, max_in_flight=max_in_flight, workers=workers)
     logging.info("Ingestion process complete.")
 
 
 if __name__ == "__main__":
     # To run this script, execute `python src/ingest_documents.py` from the project root directory.
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Ingest documents into the vector store.")
+    parser.add_argument(
+        "--per-chunk",
+        action="store_true",
+        help="Store chunks one at a time (the legacy path) instead of in batches.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-ingest every file, even if the manifest says it is unchanged.",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=None,
+        help="Micro-batches buffered between pipeline stages; lower it on small ingestion nodes.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of processes used to parse documents in parallel.",
+    )
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            bulk=not args.per_chunk,
+            force=args.force,
+            max_in_flight=args.max_in_flight,
+            workers=args.workers,
+        )
+    )
@@ -0,0 +1,89 @@
+"""Move document chunks out of the shared long-term memory collection.
+
+Document chunks used to be stored next to the conversational memories, told apart only by their
+`source` payload. This moves every point with source="document" from the memory collection to the
+document collection in batches: each batch is copied first and deleted afterwards, so an
+interrupted run can simply be restarted. Point ids and payloads are kept, so the ingestion
+manifest and the BM25 index stay valid. Both collections get their payload indexes.
+
+To run this script, execute `python src/migrate_collections.py` from the project root directory.
+"""
+import argparse
+import logging
+import os
+import sys
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.chatbot.modules.memory.long_term.vector_store import get_vector_store
+from src.chatbot.modules.rag.collection_version import get_collection_version
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+DOCUMENT_FILTER = {"must": [{"key": "source", "match": {"value": "document"}}]}
+
+
+def count_documents(collection: str, batch_size: int) -> int:
+    """Count the document points left in `collection`."""
+    backend = get_vector_store().backend
+    total, offset = 0, None
+    while True:
+        records, offset = backend.scroll(
+            collection, DOCUMENT_FILTER, limit=batch_size, offset=offset, with_vectors=False
+        )
+        total += len(records)
+        if offset is None:
+            return total
+
+
+def migrate(batch_size: int = 256, dry_run: bool = False) -> int:
+    """Move document points from the memory collection to the document collection.
+
+    Args:
+        batch_size: Points copied and deleted per round trip
+        dry_run: Only count the points that would be moved
+
+    Returns:
+        The number of points moved (or that would be moved)
+    """
+    vector_store = get_vector_store()
+    backend = vector_store.backend
+    source, target = vector_store.memory_collection, vector_store.document_collection
+    if not backend.collection_exists(source):
+        logging.info(f"Collection '{source}' does not exist, nothing to migrate.")
+        return 0
+
+    if dry_run:
+        pending = count_documents(source, batch_size)
+        logging.info(f"{pending} document chunks would be moved from '{source}' to '{target}'.")
+        return pending
+
+    # Adds the payload indexes to the existing collection and creates the new one
+    vector_store.ensure_collection(source)
+    vector_store.ensure_collection(target)
+
+    moved = 0
+    while True:
+        # Moved points disappear from the source, so every page starts from the beginning
+        records, _ = backend.scroll(source, DOCUMENT_FILTER, limit=batch_size, with_vectors=True)
+        if not records:
+            break
+        backend.upsert(target, records)
+        backend.delete(source, [record.id for record in records])
+        moved += len(records)
+        logging.info(f"Moved {moved} document chunks to '{target}'")
+
+    if moved:
+        # Cached retrievals were computed against the old layout
+        get_collection_version().bump()
+    logging.info(f"Migration complete: {moved} document chunks moved from '{source}' to '{target}'.")
+    return moved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Split document chunks into their own collection.")
+    parser.add_argument("--batch-size", type=int, default=256, help="Points moved per batch.")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the points that would be moved.")
+    args = parser.parse_args()
+    migrate(batch_size=args.batch_size, dry_run=args.dry_run)
@@ -1,22 +1,36 @@
+import asyncio
 import json
 import os
-from fastapi import FastAPI, WebSocket, UploadFile, File
+import time
+from fastapi import FastAPI, HTTPException, WebSocket, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from datetime import datetime
 from .cust_logger import logger, set_files_message_color
 import shutil
+import tempfile
 from .settings import settings
 from pathlib import Path
 
-from langchain_core.messages import AIMessageChunk, HumanMessage
+from langchain_core.messages import HumanMessage
 from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from src.chatbot.graph import graph_builder
+from src.chatbot.graph.utils.speculation import get_speculation_stats
+from src.chatbot.graph.utils.streaming import stream_reply
+from src.chatbot.graph.utils.timing import get_node_timings
+from src.chatbot.modules.memory.long_term.vector_store import get_vector_store
+from src.chatbot.modules.rag.ingestion_jobs import IngestionJobManager
+from src.chatbot.modules.rag.local_router import get_local_router
+from src.chatbot.modules.rag.rag_manager import get_rag_manager
 from src.chatbot.settings import settings as ai_settings
-from src.ingest_documents import main
+from src.ingest_documents import DATA_DIR, ingest
 
 app = FastAPI()
 
+# Uploads only enqueue ingestion; the jobs run on a bounded thread pool off the event loop
+ingestion_jobs = IngestionJobManager(lambda progress: ingest(DATA_DIR, progress=progress))
+
 # Set log message color for all logs from this file to 'purple' for easier identification in logs
 set_files_message_color('purple')
 
@@ -33,19 +47,108 @@ async def process_input(content: str, user_uuid: str):
         messages = [HumanMessage(content=content)]
 
         collected_chunks = ""
-        async for chunk in graph.astream(
-            {"messages": messages},
+        turn_started_at = time.time()
+        async for token in stream_reply(
+            graph,
+            {"messages": messages, "turn_started_at": turn_started_at},
             {"configurable": {"thread_id": user_uuid}},
-            stream_mode="messages",
         ):
-            if chunk[1]["langgraph_node"] == "conversation_node" and isinstance(chunk[0], AIMessageChunk):
-                collected_chunks += chunk[0].content
+            if not collected_chunks:
+                get_node_timings().record("first_token", time.time() - turn_started_at)
+            collected_chunks += token
+        get_node_timings().record("turn", time.time() - turn_started_at)
 
         output_state = await graph.aget_state(config={"configurable": {"thread_id": user_uuid}})
         return output_state, collected_chunks
 
 
 
+@app.on_event("startup")
+async def load_local_router():
+    """Train the local RAG router from the logged decisions before the first turn."""
+    local_router = get_local_router()
+    if local_router is not None:
+        await asyncio.to_thread(local_router.load)
+
+
+@app.on_event("shutdown")
+async def shutdown_ingestion_jobs():
+    """Cancel queued and running ingestion jobs when the server stops."""
+    ingestion_jobs.shutdown()
+
+
+def _save_upload(source, destination: Path) -> None:
+    """Write an upload next to its destination, then move it into place in one step.
+
+    The temporary name has no document suffix, so a running ingestion job never sees, hashes or
+    parses a half-written file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=destination.parent, prefix=f".{destination.name}.", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            shutil.copyfileobj(source, buffer)
+        os.replace(tmp_path, destination)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+@app.post("/api/upload-pdf")
+async def upload_pdf(file: UploadFile = File(...)):
+    """
+    Save an uploaded PDF and enqueue a background ingestion job for it.
+
+    Returns:
+    --------
+    dict
+        The upload message and the id of the ingestion job, to be polled at /api/ingestion-jobs/{job_id}.
+    """
+    file_location = Path(__file__).parent/os.path.join(settings.DATA_DIR, file.filename)
+    # Blocking file I/O stays off the event loop, so uploads do not stall the chats
+    await run_in_threadpool(_save_upload, file.file, file_location)
+
+    job = ingestion_jobs.submit(file.filename)
+    return {
+        "message": f"File '{file.filename}' uploaded successfully!",
+        "job_id": job.id,
+        "status": job.status.value,
+    }
+
+# The API routes below must be registered before the catch-all frontend route
+@app.get("/api/ingestion-jobs")
+async def list_ingestion_jobs():
+    """List the known ingestion jobs with their progress."""
+    return {"jobs": [job.to_dict() for job in ingestion_jobs.list()]}
+
+@app.get("/api/ingestion-jobs/{job_id}")
+async def get_ingestion_job(job_id: str):
+    """Report the status and progress (files, chunks embedded/upserted, throughput) of an ingestion job."""
+    job = ingestion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingestion job '{job_id}'")
+    return job.to_dict()
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """Report cache metrics of the retrieval stack and graph node latencies."""
+    return {
+        "vector_store": get_vector_store().cache_stats(),
+        "retrieval_cache": get_rag_manager().cache_stats(),
+        "graph_latency": get_node_timings().stats(),
+        "speculative_retrieval": get_speculation_stats().stats(),
+        "rag_router": get_local_router().stats() if get_local_router() is not None else None,
+    }
+
+@app.post("/api/ingestion-jobs/{job_id}/cancel")
+async def cancel_ingestion_job(job_id: str):
+    """Request cancellation of a queued or running ingestion job."""
+    if ingestion_jobs.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingestion job '{job_id}'")
+    if not ingestion_jobs.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Ingestion job '{job_id}' has already finished")
+    return ingestion_jobs.get(job_id).to_dict()
+
+
 @app.get("/")
 async def serve_root():
     """
@@ -168,15 +271,6 @@ async def websocket_endpoint(websocket: WebSocket):
                 "op": f"WebSocket close error: {e}"
             }))
 
-@app.post("/api/upload-pdf")
-async def upload_pdf(file: UploadFile = File(...)):
-    file_location = Path(__file__).parent/os.path.join(settings.DATA_DIR, file.filename)
-    with open(file_location, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    await main()
-    return {"message": f"File '{file.filename}' uploaded successfully!"}
-
 # Entry point to run the FastAPI app when executing this file directly
 # Uses uvicorn ASGI server with host 0.0.0.0 and port 8000, minimizing uvicorn default verbosity
 if __name__ == "__main__":
@@ -0,0 +1,184 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+import src.chatbot.modules.memory.long_term.backends.local as local
+from src.chatbot.modules.memory.long_term.backends.base import VectorRecord
+from src.chatbot.modules.memory.long_term.backends.hnsw import HNSWIndex
+from src.chatbot.modules.memory.long_term.backends.local import LocalBackend
+
+DIM = 16
+
+
+def random_vectors(rng, count):
+    vectors = rng.normal(size=(count, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def records(ids, vectors, **payload):
+    return [
+        VectorRecord(id=point_id, vector=vector, payload={"n": point_id, **payload})
+        for point_id, vector in zip(ids, vectors)
+    ]
+
+
+def all_ids(backend, filter=None):
+    ids, offset = [], None
+    while True:
+        page, offset = backend.scroll("c", filter=filter, limit=64, offset=offset, with_vectors=False)
+        ids.extend(record.id for record in page)
+        if offset is None:
+            return sorted(ids)
+
+
+def test_round_trip_survives_reopen():
+    rng = np.random.default_rng(0)
+    for index_type in ("flat", "hnsw"):
+        for quantization in ("none", "int8", "binary"):
+            with tempfile.TemporaryDirectory() as root, mock.patch.object(local, "_EXACT_SEARCH_MAX_CANDIDATES", 0):
+                backend = LocalBackend(Path(root), index_type=index_type)
+                backend.create_collection("c", DIM, quantization=quantization)
+                vectors = random_vectors(rng, 50)
+                backend.upsert("c", records(range(50), vectors))
+                # Update (a retired row with HNSW, rewritten in place with exact search), then delete
+                updated = random_vectors(rng, 10)
+                backend.upsert("c", records(range(10), updated, version=2))
+                backend.delete("c", list(range(40, 50)))
+                backend.close()
+
+                backend = LocalBackend(Path(root), index_type=index_type)
+                assert all_ids(backend) == list(range(40)), (index_type, quantization)
+                hit = backend.search("c", updated[3], 1, with_vectors=True)[0]
+                assert hit.id == 3 and hit.payload["version"] == 2
+                np.testing.assert_allclose(hit.vector, updated[3], atol=1e-6)
+                assert backend.search("c", vectors[45], 1)[0].id != 45
+                backend.close()
+
+
+def test_hnsw_recall_against_exact_search():
+    rng = np.random.default_rng(1)
+    vectors = random_vectors(rng, 2000)
+    queries = random_vectors(rng, 50)
+    index = HNSWIndex(m=16, ef_construction=100, ef_search=64)
+    for row in range(len(vectors)):
+        index.add(row, vectors)
+
+    found = 0
+    for query in queries:
+        exact = np.argsort(-(vectors @ query))[:10]
+        rows, _ = index.search(query, 10, vectors)
+        found += len(set(rows) & set(exact))
+    assert found / (10 * len(queries)) >= 0.9
+
+
+def test_hnsw_graph_round_trips_through_save():
+    rng = np.random.default_rng(2)
+    vectors = random_vectors(rng, 300)
+    index = HNSWIndex(m=8)
+    for row in range(len(vectors)):
+        index.add(row, vectors)
+    index.mark_deleted(7)
+    with tempfile.TemporaryDirectory() as root:
+        index.save(Path(root) / "hnsw.npz")
+        loaded = HNSWIndex.load(Path(root) / "hnsw.npz")
+
+    assert len(loaded) == 299 and 7 in loaded
+    for query in vectors[:20]:
+        np.testing.assert_array_equal(loaded.search(query, 5, vectors)[0], index.search(query, 5, vectors)[0])
+    assert 7 not in loaded.search(vectors[7], 5, vectors)[0]
+
+
+def test_filter_masks():
+    rng = np.random.default_rng(3)
+    with tempfile.TemporaryDirectory() as root:
+        backend = LocalBackend(Path(root))
+        backend.create_collection("c", DIM, payload_indexes=["source"])
+        vectors = random_vectors(rng, 30)
+        backend.upsert(
+            "c", [VectorRecord(id=i, vector=vectors[i], payload={"source": f"s{i % 3}", "n": i}) for i in range(30)]
+        )
+
+        assert all_ids(backend, {"must": [{"key": "source", "match": {"value": "s1"}}]}) == list(range(1, 30, 3))
+        assert all_ids(backend, {"must": [{"key": "source", "match": {"any": ["s0", "s2"]}}]}) == [
+            i for i in range(30) if i % 3 != 1
+        ]
+        # A key without an eager index is indexed on first use
+        assert all_ids(backend, {"must_not": [{"key": "n", "match": {"any": list(range(5, 30))}}]}) == list(range(5))
+
+        # Cached masks are dropped on writes
+        only_s1 = {"must": [{"key": "source", "match": {"value": "s1"}}]}
+        backend.upsert("c", [VectorRecord(id=1, vector=vectors[1], payload={"source": "s0", "n": 1})])
+        backend.delete("c", [4])
+        assert all_ids(backend, only_s1) == [i for i in range(1, 30, 3) if i not in (1, 4)]
+        hits = backend.search("c", vectors[1], 30, only_s1)
+        assert {hit.payload["source"] for hit in hits} == {"s1"} and len(hits) == 8
+        backend.close()
+
+
+def test_compaction_on_open():
+    rng = np.random.default_rng(4)
+    with tempfile.TemporaryDirectory() as root, mock.patch.object(local, "_INITIAL_CAPACITY", 16):
+        backend = LocalBackend(Path(root), index_type="hnsw")
+        backend.create_collection("c", DIM, quantization="int8", payload_indexes=["n"])
+        for _ in range(3):
+            vectors = random_vectors(rng, 40)
+            backend.upsert("c", records(range(40), vectors))
+        backend.delete("c", list(range(30, 40)))
+        assert backend._collection("c").count == 120
+        backend.close()
+
+        backend = LocalBackend(Path(root), index_type="hnsw")
+        collection = backend._collection("c")
+        assert collection.count == 30 and len(collection.graph) == 30
+        assert all_ids(backend) == list(range(30))
+        assert all_ids(backend, {"must": [{"key": "n", "match": {"value": 12}}]}) == [12]
+        with mock.patch.object(local, "_EXACT_SEARCH_MAX_CANDIDATES", 0):
+            assert [hit.id for hit in backend.search("c", vectors[12], 1)] == [12]
+        backend.close()
+
+        # The compacted files reopen as they are
+        backend = LocalBackend(Path(root), index_type="hnsw")
+        assert backend._collection("c").count == 30
+        assert backend.search("c", vectors[5], 1)[0].id == 5
+        backend.close()
+
+
+def test_writers_sharing_a_collection_see_each_other():
+    # Two backends on one directory stand in for the server and the ingestion CLI
+    rng = np.random.default_rng(5)
+    for index_type in ("flat", "hnsw"):
+        with tempfile.TemporaryDirectory() as root:
+            server = LocalBackend(Path(root), index_type=index_type)
+            server.create_collection("c", DIM)
+            vectors = random_vectors(rng, 30)
+            server.upsert("c", records(range(10), vectors[:10]))
+            server.delete("c", [0])
+
+            cli = LocalBackend(Path(root), index_type=index_type)
+            cli.upsert("c", records(range(10, 20), vectors[10:20]))
+            cli.close()
+
+            assert server.search("c", vectors[15], 1)[0].id == 15
+            server.upsert("c", records(range(20, 30), vectors[20:30]))
+            assert all_ids(server) == list(range(1, 30))
+            server.close()
+
+            reopened = LocalBackend(Path(root), index_type=index_type)
+            assert all_ids(reopened) == list(range(1, 30))
+            assert all(reopened.search("c", vectors[i], 1)[0].id == i for i in range(1, 30))
+            reopened.close()
+
+
+if __name__ == "__main__":
+    for test in (
+        test_round_trip_survives_reopen,
+        test_hnsw_recall_against_exact_search,
+        test_hnsw_graph_round_trips_through_save,
+        test_filter_masks,
+        test_compaction_on_open,
+        test_writers_sharing_a_collection_see_each_other,
+    ):
+        test()
+        print(f"{test.__name__}: ok")
@@ -0,0 +1,153 @@
+import asyncio
+from contextlib import ExitStack
+from types import SimpleNamespace
+from unittest import mock
+
+from langchain_core.messages import AIMessageChunk, HumanMessage
+from langchain_core.runnables import RunnableLambda
+
+import src.chatbot.graph.nodes as nodes
+from src.chatbot.graph.graph import create_workflow_graph
+from src.chatbot.graph.utils.streaming import ANSWER_TOKEN
+from src.chatbot.settings import settings
+
+
+class FakeRAGManager:
+    def __init__(self):
+        self.queries = []
+
+    async def aget_relevant_documents(self, query):
+        self.queries.append(query)
+        return [f"passage for {query}"]
+
+    def format_context(self, documents):
+        return "\n".join(documents)
+
+
+class FakeMemoryManager:
+    async def aget_relevant_memories(self, context):
+        return []
+
+    def format_memories_for_prompt(self, memories):
+        return ""
+
+    async def extract_and_store_memories(self, message):
+        pass
+
+
+def run_turn(evaluations, answer_mode="regenerate", max_attempts=3, styled_chunks=()):
+    """Run one RAG turn through the compiled graph with the evaluator returning `evaluations` in order.
+
+    Returns the final state, the retrieval queries and the reply tokens written to the custom stream.
+    """
+    rag_manager = FakeRAGManager()
+    verdicts = iter(evaluations)
+
+    async def evaluate(inputs):
+        is_sufficient, corrected_query, confidence = next(verdicts)
+        return SimpleNamespace(is_sufficient=is_sufficient, corrected_query=corrected_query, confidence=confidence)
+
+    async def route(inputs):
+        return SimpleNamespace(requires_rag=True)
+
+    async def answer(inputs):
+        return f"answer from {inputs['context']}"
+
+    def character_chain(summary="", with_rag_answer=False, rag_answer_sufficient=True):
+        async def regenerate(inputs):
+            draft = "draft" if rag_answer_sufficient else "incomplete draft"
+            return f"regenerated from {draft} {inputs['rag_answer']}"
+
+        return RunnableLambda(regenerate)
+
+    async def stylize(inputs):
+        for chunk in styled_chunks:
+            yield AIMessageChunk(content=chunk)
+
+    async def run(graph):
+        state, tokens = None, []
+        graph_input = {"messages": [HumanMessage(content="How do I reset the N4?")]}
+        async for mode, chunk in graph.astream(graph_input, stream_mode=["custom", "values"]):
+            if mode == "values":
+                state = chunk
+            else:
+                tokens.append(chunk[ANSWER_TOKEN])
+        return state, tokens
+
+    patches = [
+        (settings, "RAG_ANSWER_MODE", answer_mode),
+        (settings, "RAG_MAX_ATTEMPTS", max_attempts),
+        (settings, "SPECULATIVE_RETRIEVAL", False),
+        (settings, "ROUTER_LOG_ENABLED", False),
+        (nodes, "get_local_router", lambda: None),
+        (nodes, "get_rag_manager", lambda: rag_manager),
+        (nodes, "get_memory_manager", lambda: FakeMemoryManager()),
+        (nodes, "get_rag_router_chain", lambda: RunnableLambda(route)),
+        (nodes, "get_rag_chain", lambda: RunnableLambda(answer)),
+        (nodes, "get_answer_evaluator_chain", lambda: RunnableLambda(evaluate)),
+        (nodes, "get_character_response_chain", character_chain),
+        (nodes, "get_answer_styling_chain", lambda: RunnableLambda(stylize)),
+    ]
+    with ExitStack() as stack:
+        for target, name, value in patches:
+            stack.enter_context(mock.patch.object(target, name, value))
+        # The edges read settings at run time, so the cached builder serves every mode
+        graph = create_workflow_graph().compile()
+        state, tokens = asyncio.run(run(graph))
+    return state, rag_manager.queries, tokens
+
+
+def test_max_attempts_exit_regenerates_from_best_candidate():
+    # Even in "reuse" mode an insufficient candidate is not sent as is
+    state, queries, _ = run_turn(
+        [(False, "reset N4 admin password", 0.4), (False, "N4 reset button", 0.7), (False, "N4 factory reset", 0.2)],
+        answer_mode="reuse",
+    )
+
+    assert queries == ["How do I reset the N4?", "reset N4 admin password", "N4 reset button"]
+    assert state["rag_attempts"] == 3
+    assert state["best_candidate"] == "answer from passage for reset N4 admin password"
+    assert state["messages"][-1].content == f"regenerated from incomplete draft {state['best_candidate']}"
+
+
+def test_repeated_query_exit_regenerates_from_best_candidate():
+    state, queries, _ = run_turn([(False, "N4 reset button", 0.3), (False, "n4 RESET button", 0.6)], answer_mode="stylize")
+
+    assert queries == ["How do I reset the N4?", "N4 reset button"]
+    assert state["messages"][-1].content == "regenerated from incomplete draft answer from passage for N4 reset button"
+
+
+def test_regenerate_mode_passes_sufficient_candidate_to_conversation():
+    state, _, _ = run_turn([(False, "N4 reset button", 0.3), (True, "", 0.9)])
+
+    assert state["messages"][-1].content == "regenerated from draft answer from passage for N4 reset button"
+
+
+def test_reuse_mode_replies_with_sufficient_candidate():
+    state, _, tokens = run_turn([(False, "N4 reset button", 0.3), (True, "", 0.9)], answer_mode="reuse")
+
+    assert state["messages"][-1].content == "answer from passage for N4 reset button"
+    assert "".join(tokens) == state["messages"][-1].content
+
+
+def test_stylize_mode_streams_the_stored_reply():
+    state, _, tokens = run_turn(
+        [(True, "", 0.9)],
+        answer_mode="stylize",
+        styled_chunks=[" *adjusts gl", "asses* Hold the ", "reset button *", "smiles*", " for ten seconds. *waves"],
+    )
+
+    assert state["messages"][-1].content == "Hold the reset button  for ten seconds. *waves"
+    assert "".join(tokens) == state["messages"][-1].content
+
+
+if __name__ == "__main__":
+    for test in (
+        test_max_attempts_exit_regenerates_from_best_candidate,
+        test_repeated_query_exit_regenerates_from_best_candidate,
+        test_regenerate_mode_passes_sufficient_candidate_to_conversation,
+        test_reuse_mode_replies_with_sufficient_candidate,
+        test_stylize_mode_streams_the_stored_reply,
+    ):
+        test()
+        print(f"{test.__name__}: ok")